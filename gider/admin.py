@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Gider, GiderKategori
+from .models import AylikGiderOzeti, Gider, GiderKategori
 
 
 @admin.register(GiderKategori)
@@ -19,6 +19,7 @@ class GiderAdmin(admin.ModelAdmin):
     list_editable = ['aktif']
     date_hierarchy = 'tarih'
     ordering = ['-tarih', '-olusturma_tarihi']
+    readonly_fields = ['tekrar_sablonu', 'tekrar_donemi', 'tekrar_son_donem']
     
     fieldsets = (
         ('Temel Bilgiler', {
@@ -33,7 +34,7 @@ class GiderAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         }),
         ('Tekrarlayan Gider', {
-            'fields': ('tekrarlayan', 'tekrar_periyodu'),
+            'fields': ('tekrarlayan', 'tekrar_periyodu', 'tekrar_son_donem', 'tekrar_sablonu', 'tekrar_donemi'),
             'classes': ('collapse',)
         }),
         ('Sistem Bilgileri', {
@@ -46,3 +47,11 @@ class GiderAdmin(admin.ModelAdmin):
         if not change:  # Yeni kayıt ise
             obj.olusturan = request.user
         super().save_model(request, obj, form, change)
+
+
+@admin.register(AylikGiderOzeti)
+class AylikGiderOzetiAdmin(admin.ModelAdmin):
+    list_display = ['ay', 'kategori', 'odeme_yontemi', 'toplam', 'adet']
+    list_filter = ['kategori', 'odeme_yontemi']
+    date_hierarchy = 'ay'
+    ordering = ['-ay', 'kategori']
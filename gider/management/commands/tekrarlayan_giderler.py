@@ -0,0 +1,28 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from gider.tekrar import tekrarlari_olustur
+
+
+class Command(BaseCommand):
+    help = 'Tekrarlayan giderlerin vadesi gelen dönemlerini oluşturur (her gün çalıştırılabilir)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--gun',
+            type=int,
+            default=0,
+            help='Bugünden kaç gün sonrasına kadarki dönemler oluşturulsun (varsayılan 0)',
+        )
+
+    def handle(self, *args, **options):
+        ufuk = timezone.localdate() + timedelta(days=max(options['gun'], 0))
+        giderler = tekrarlari_olustur(ufuk)
+        toplam = sum((gider.tutar for gider in giderler), 0)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'{ufuk.strftime("%d.%m.%Y")} tarihine kadar {len(giderler)} gider oluşturuldu ({toplam} ₺)'
+            )
+        )
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.5 on 2026-10-19 13:37
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gider', '0002_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='gider',
+            name='tekrar_donemi',
+            field=models.DateField(blank=True, null=True, verbose_name='Tekrar Dönemi'),
+        ),
+        migrations.AddField(
+            model_name='gider',
+            name='tekrar_sablonu',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='tekrarlar', to='gider.gider', verbose_name='Tekrar Şablonu'),
+        ),
+        migrations.AddField(
+            model_name='gider',
+            name='tekrar_son_donem',
+            field=models.DateField(blank=True, editable=False, null=True, verbose_name='Son Oluşturulan Dönem'),
+        ),
+        migrations.AddConstraint(
+            model_name='gider',
+            constraint=models.UniqueConstraint(condition=models.Q(('tekrar_sablonu__isnull', False)), fields=('tekrar_sablonu', 'tekrar_donemi'), name='gider_tekrar_donem_benzersiz'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.5 on 2026-10-19 13:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gider', '0003_gider_tekrar_donemi_gider_tekrar_sablonu_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AylikGiderOzeti',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ay', models.DateField(help_text='Ayın ilk günü', verbose_name='Ay')),
+                ('odeme_yontemi', models.CharField(choices=[('nakit', 'Nakit'), ('kart', 'Kredi/Banka Kartı'), ('havale', 'Havale/EFT'), ('cek', 'Çek'), ('diger', 'Diğer')], max_length=20, verbose_name='Ödeme Yöntemi')),
+                ('toplam', models.DecimalField(decimal_places=2, default=0, max_digits=15, verbose_name='Toplam')),
+                ('adet', models.IntegerField(default=0, verbose_name='Gider Sayısı')),
+                ('kategori', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='aylik_ozetler', to='gider.giderkategori', verbose_name='Kategori')),
+            ],
+            options={
+                'verbose_name': 'Aylık Gider Özeti',
+                'verbose_name_plural': 'Aylık Gider Özetleri',
+                'ordering': ['-ay', 'kategori'],
+                'constraints': [models.UniqueConstraint(fields=('ay', 'kategori', 'odeme_yontemi'), name='gider_aylik_ozet_benzersiz')],
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.5 on 2026-10-19 13:43
+
+import stoktakip.depolama
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gider', '0004_aylikgiderozeti'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='gider',
+            name='ek_belge',
+            field=models.FileField(blank=True, null=True, storage=stoktakip.depolama.IcerikDeposu(), upload_to='giderler/belgeler/', verbose_name='Ek Belge'),
+        ),
+        migrations.AlterField(
+            model_name='gider',
+            name='fatura_fotografi',
+            field=models.ImageField(blank=True, null=True, storage=stoktakip.depolama.IcerikDeposu(), upload_to='giderler/faturalar/', verbose_name='Fatura/Fiş Fotoğrafı'),
+        ),
+    ]
@@ -3,6 +3,8 @@ from django.conf import settings
 from django.core.validators import MinValueValidator
 from decimal import Decimal
 
+from stoktakip.depolama import icerik_deposu, resim_boyutu_dogrula
+
 
 class GiderKategori(models.Model):
     """Gider kategorileri"""
@@ -48,9 +50,9 @@ class Gider(models.Model):
     tedarikci = models.CharField(max_length=200, blank=True, null=True, verbose_name="Tedarikçi/Firma")
     
     # Belge ekleri
-    fatura_fotografi = models.ImageField(upload_to='giderler/faturalar/', blank=True, null=True,
+    fatura_fotografi = models.ImageField(upload_to='giderler/faturalar/', storage=icerik_deposu, validators=[resim_boyutu_dogrula], blank=True, null=True,
                                         verbose_name="Fatura/Fiş Fotoğrafı")
-    ek_belge = models.FileField(upload_to='giderler/belgeler/', blank=True, null=True,
+    ek_belge = models.FileField(upload_to='giderler/belgeler/', storage=icerik_deposu, validators=[resim_boyutu_dogrula], blank=True, null=True,
                                verbose_name="Ek Belge")
     
     # Tekrarlayan gider özellikleri
@@ -62,6 +64,13 @@ class Gider(models.Model):
                                          ('aylik', 'Aylık'),
                                          ('yillik', 'Yıllık'),
                                      ], verbose_name="Tekrar Periyodu")
+    # Tekrarlayan giderden (şablon) otomatik oluşturulan kayıtlar
+    tekrar_sablonu = models.ForeignKey('self', on_delete=models.PROTECT, blank=True, null=True,
+                                       related_name='tekrarlar', verbose_name="Tekrar Şablonu")
+    tekrar_donemi = models.DateField(blank=True, null=True, verbose_name="Tekrar Dönemi")
+    # Şablon için en son oluşturulan dönem (bkz. gider.tekrar)
+    tekrar_son_donem = models.DateField(blank=True, null=True, editable=False,
+                                        verbose_name="Son Oluşturulan Dönem")
     
     # Meta bilgiler
     aktif = models.BooleanField(default=True, verbose_name="Aktif")
@@ -78,6 +87,13 @@ class Gider(models.Model):
             models.Index(fields=['kategori']),
             models.Index(fields=['olusturan']),
         ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['tekrar_sablonu', 'tekrar_donemi'],
+                condition=models.Q(tekrar_sablonu__isnull=False),
+                name='gider_tekrar_donem_benzersiz',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.baslik} - {self.tutar} ₺ ({self.tarih})"
@@ -92,5 +108,94 @@ class Gider(models.Model):
         """Kategori ikon sınıfını döndürür"""
         return self.kategori.ikon if self.kategori else "fas fa-money-bill"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Tarih değişirse eski günün raporları da geçersiz kılınmalı
+        instance._kayitli_tarih = instance.__dict__.get('tarih')
+        from rapor.pano import ozet_sakla
+        from log.fark import onceki_durumu_sakla
+        ozet_sakla(instance, ('tarih', 'tutar', 'aktif'))
+        onceki_durumu_sakla(instance, field_names, values)
+        if not instance.get_deferred_fields() & {'tarih', 'tutar', 'aktif', 'kategori_id', 'odeme_yontemi'}:
+            instance._aylik_onceki = instance._aylik_ozeti()
+        return instance
+
+    def _pano_ozeti(self):
+        """Giderin günlük dashboard sayaçlarına katkısı"""
+        if not self.aktif:
+            return None
+        return (self.tarih, {'gider': self.tutar})
+
+    def _aylik_ozeti(self):
+        """Giderin aylık gider özetine katkısı"""
+        if not self.aktif:
+            return None
+        return ((self.tarih.replace(day=1), self.kategori_id, self.odeme_yontemi), self.tutar)
+
+    def _kayitli_aylik_ozet(self):
+        if hasattr(self, '_aylik_onceki'):
+            return self._aylik_onceki
+        if self._state.adding or self.pk is None:
+            return None
+        kayitli = Gider._base_manager.filter(pk=self.pk).first()
+        return kayitli._aylik_ozeti() if kayitli else None
+
     def save(self, *args, **kwargs):
+        from rapor.pano import kayitli_ozet, gunluk_sayaclari_guncelle
+        from log.fark import kayitli_durum, degisiklik_kaydet
+        from .ozet import aylik_ozet_guncelle
+        eski = kayitli_ozet(self)
+        eski_aylik = self._kayitli_aylik_ozet()
+        eski_durum = kayitli_durum(self)
+        
         super().save(*args, **kwargs)
+        degisiklik_kaydet(self, eski_durum)
+        
+        # Eski tarihli giderler kapanmış günlerin raporlarını etkiler
+        from rapor.onbellek import rapor_gunlerini_gecersiz_kil
+        rapor_gunlerini_gecersiz_kil(self.tarih, getattr(self, '_kayitli_tarih', None))
+        self._kayitli_tarih = self.tarih
+        
+        gunluk_sayaclari_guncelle(eski, self._pano_ozeti())
+        self._pano_onceki = self._pano_ozeti()
+        aylik_ozet_guncelle(eski_aylik, self._aylik_ozeti())
+        self._aylik_onceki = self._aylik_ozeti()
+
+    def delete(self, *args, **kwargs):
+        from rapor.pano import kayitli_ozet, gunluk_sayaclari_guncelle
+        from log.fark import kayitli_durum, silme_kaydet
+        from .ozet import aylik_ozet_guncelle
+        eski = kayitli_ozet(self)
+        eski_aylik = self._kayitli_aylik_ozet()
+        eski_durum = kayitli_durum(self)
+        tarih, pk = self.tarih, self.pk
+        sonuc = super().delete(*args, **kwargs)
+        silme_kaydet(self, pk, eski_durum)
+        
+        from rapor.onbellek import rapor_gunlerini_gecersiz_kil
+        rapor_gunlerini_gecersiz_kil(tarih)
+        gunluk_sayaclari_guncelle(eski, None)
+        aylik_ozet_guncelle(eski_aylik, None)
+        return sonuc
+
+
+class AylikGiderOzeti(models.Model):
+    """Ay, kategori ve ödeme yöntemi bazında aktif gider toplamı (bkz. gider.ozet)"""
+    ay = models.DateField(verbose_name="Ay", help_text="Ayın ilk günü")
+    kategori = models.ForeignKey(GiderKategori, on_delete=models.CASCADE, related_name='aylik_ozetler',
+                                 verbose_name="Kategori")
+    odeme_yontemi = models.CharField(max_length=20, choices=Gider.ODEME_YONTEMLERI, verbose_name="Ödeme Yöntemi")
+    toplam = models.DecimalField(max_digits=15, decimal_places=2, default=0, verbose_name="Toplam")
+    adet = models.IntegerField(default=0, verbose_name="Gider Sayısı")
+
+    class Meta:
+        verbose_name = "Aylık Gider Özeti"
+        verbose_name_plural = "Aylık Gider Özetleri"
+        ordering = ['-ay', 'kategori']
+        constraints = [
+            models.UniqueConstraint(fields=['ay', 'kategori', 'odeme_yontemi'], name='gider_aylik_ozet_benzersiz'),
+        ]
+
+    def __str__(self):
+        return f"{self.ay:%m.%Y} - {self.kategori} - {self.toplam} ₺"
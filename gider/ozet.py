@@ -0,0 +1,102 @@
+"""
+Aylık gider özeti.
+
+Raporlar gider tablosunu taramak yerine AylikGiderOzeti kayıtlarını okur:
+her kayıt bir ay, kategori ve ödeme yöntemi için aktif giderlerin toplamı
+ve sayısıdır. Özetler Gider.save/delete içinde, kaydın önceki ve yeni
+katkısı arasındaki fark kadar F() ile güncellenir (bkz. rapor.pano).
+
+Özet tablosu boşsa ilk ihtiyaç anında mevcut giderlerden bir kez
+oluşturulur; toplu işlemlerden sonra `pano_sayaclarini_olustur` komutuyla
+yeniden hesaplanabilir.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncMonth
+
+from .models import AylikGiderOzeti, Gider
+
+
+def ay_basi(tarih):
+    return tarih.replace(day=1)
+
+
+def _farklar(eski, yeni):
+    """Katkılar arasındaki farkı {(ay, kategori_id, odeme_yontemi): (tutar, adet)} olarak döndür"""
+    farklar = defaultdict(lambda: [Decimal('0'), 0])
+    for isaret, katki in ((-1, eski), (1, yeni)):
+        if not katki:
+            continue
+        anahtar, tutar = katki
+        farklar[anahtar][0] += isaret * Decimal(tutar)
+        farklar[anahtar][1] += isaret
+    return {anahtar: fark for anahtar, fark in farklar.items() if any(fark)}
+
+
+def _artir(anahtar, tutar, adet):
+    ay, kategori_id, odeme_yontemi = anahtar
+    return bool(AylikGiderOzeti.objects.filter(
+        ay=ay, kategori_id=kategori_id, odeme_yontemi=odeme_yontemi,
+    ).update(toplam=F('toplam') + tutar, adet=F('adet') + adet))
+
+
+def _uygula(farklar):
+    for anahtar, (tutar, adet) in farklar.items():
+        if _artir(anahtar, tutar, adet):
+            continue
+
+        if not AylikGiderOzeti.objects.exists():
+            # Özetler hiç oluşturulmamış: mevcut giderlerden bir kez hesapla
+            # (bu kaydın etkisi de veritabanında olduğu için dahil olur)
+            aylik_ozetleri_yeniden_olustur()
+            return
+
+        ay, kategori_id, odeme_yontemi = anahtar
+        try:
+            with transaction.atomic():
+                AylikGiderOzeti.objects.create(
+                    ay=ay, kategori_id=kategori_id, odeme_yontemi=odeme_yontemi,
+                    toplam=tutar, adet=adet,
+                )
+        except IntegrityError:
+            # Aynı anda başka bir işlem oluşturdu
+            _artir(anahtar, tutar, adet)
+
+
+def aylik_ozet_guncelle(eski, yeni):
+    """Bir giderin aylık özete katkısı eski'den yeni'ye değişti"""
+    _uygula(_farklar(eski, yeni))
+
+
+def giderleri_ozete_ekle(giderler):
+    """Toplu oluşturulan (save'i çağrılmamış) giderleri özete ekle"""
+    farklar = defaultdict(lambda: [Decimal('0'), 0])
+    for gider in giderler:
+        katki = gider._aylik_ozeti()
+        if katki:
+            farklar[katki[0]][0] += katki[1]
+            farklar[katki[0]][1] += 1
+    _uygula(farklar)
+
+
+def aylik_ozetleri_yeniden_olustur():
+    """Özetleri aktif giderlerden tek gruplu sorguyla yeniden hesapla; kayıt sayısını döndür"""
+    satirlar = Gider.objects.filter(aktif=True).annotate(
+        ay=TruncMonth('tarih'),
+    ).values('ay', 'kategori_id', 'odeme_yontemi').annotate(
+        toplam=Sum('tutar'), adet=Count('id'),
+    ).order_by()
+    with transaction.atomic():
+        AylikGiderOzeti.objects.all().delete()
+        AylikGiderOzeti.objects.bulk_create([AylikGiderOzeti(**satir) for satir in satirlar], batch_size=500)
+    return AylikGiderOzeti.objects.count()
+
+
+def aylik_ozetler(baslangic, bitis):
+    """`baslangic` ve `bitis` aylarını kapsayan özet kayıtları"""
+    if not AylikGiderOzeti.objects.exists() and Gider.objects.filter(aktif=True).exists():
+        aylik_ozetleri_yeniden_olustur()
+    return AylikGiderOzeti.objects.filter(ay__gte=ay_basi(baslangic), ay__lte=ay_basi(bitis))
@@ -0,0 +1,169 @@
+"""
+Tekrarlayan giderler.
+
+Tekrarlayan olarak işaretlenen gider bir şablondur ve ilk dönemi kendisidir.
+Sonraki dönemler `tekrarlari_olustur` ile ufuk tarihine kadar Gider kaydı
+olarak oluşturulur; kasa çıkışları tek `kaydet` çağrısıyla yazılır.
+
+Her şablon en son oluşturduğu dönemi (tekrar_son_donem) saklar, böylece
+her çalıştırma sadece yeni dönemlere bakar. (tekrar_sablonu, tekrar_donemi)
+benzersiz olduğundan aynı dönem iki kez oluşturulamaz.
+"""
+import calendar
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from kasa.defter import GIDER_KASA_TIPLERI, kasa_bul, kaydet
+from kasa.models import KasaHareket
+
+from .models import Gider
+from .ozet import giderleri_ozete_ekle
+
+
+PERIYOT_GUNLERI = {
+    'gunluk': 1,
+    'haftalik': 7,
+}
+PERIYOT_AYLARI = {
+    'aylik': 1,
+    'yillik': 12,
+}
+
+
+def donem_tarihi(baslangic, periyot, sira):
+    """Şablonun `sira`. dönemi (0 şablonun kendisi); ay sonları korunur"""
+    if periyot in PERIYOT_GUNLERI:
+        return baslangic + timedelta(days=PERIYOT_GUNLERI[periyot] * sira)
+    yil, ay = divmod(baslangic.month - 1 + PERIYOT_AYLARI[periyot] * sira, 12)
+    yil += baslangic.year
+    gun = min(baslangic.day, calendar.monthrange(yil, ay + 1)[1])
+    return baslangic.replace(year=yil, month=ay + 1, day=gun)
+
+
+def _donem_sirasi(baslangic, periyot, tarih):
+    """`tarih`ten önceki ya da ona denk gelen son dönemin sırası"""
+    if periyot in PERIYOT_GUNLERI:
+        return (tarih - baslangic).days // PERIYOT_GUNLERI[periyot]
+    aylar = (tarih.year - baslangic.year) * 12 + tarih.month - baslangic.month
+    sira = aylar // PERIYOT_AYLARI[periyot]
+    if donem_tarihi(baslangic, periyot, sira) > tarih:
+        sira -= 1
+    return sira
+
+
+def yeni_donemler(sablon, ufuk):
+    """Şablonun henüz oluşturulmamış, `ufuk` dahil önceki dönemleri"""
+    periyot = sablon.tekrar_periyodu
+    son = sablon.tekrar_son_donem or sablon.tarih
+    donemler = []
+    sira = max(_donem_sirasi(sablon.tarih, periyot, son), 0) + 1
+    while True:
+        donem = donem_tarihi(sablon.tarih, periyot, sira)
+        if donem > ufuk:
+            return donemler
+        donemler.append(donem)
+        sira += 1
+
+
+def _hareket_tarihi(donem):
+    return timezone.make_aware(datetime.combine(donem, time.min))
+
+
+def tekrarlari_olustur(ufuk=None):
+    """
+    Tekrarlayan giderlerin `ufuk` tarihine (varsayılan bugün) kadarki
+    dönemlerini oluştur; oluşan giderleri döndürür.
+    """
+    from log.fark import degisiklik_kaydet
+    from rapor.onbellek import rapor_gunlerini_gecersiz_kil
+    from rapor.pano import gunluk_sayaclari_guncelle
+
+    ufuk = ufuk or timezone.localdate()
+    periyotlar = list(PERIYOT_GUNLERI) + list(PERIYOT_AYLARI)
+
+    with transaction.atomic():
+        # Aynı anda çalışan iki işlem aynı şablonları sırayla işler
+        sablonlar = list(
+            Gider.objects.select_for_update().filter(
+                Q(tekrar_son_donem__lt=ufuk) | Q(tekrar_son_donem__isnull=True, tarih__lt=ufuk),
+                tekrarlayan=True,
+                aktif=True,
+                tekrar_sablonu__isnull=True,
+                tekrar_periyodu__in=periyotlar,
+            ).order_by('pk')
+        )
+        plan = [(sablon, yeni_donemler(sablon, ufuk)) for sablon in sablonlar]
+        plan = [(sablon, donemler) for sablon, donemler in plan if donemler]
+        if not plan:
+            return []
+
+        # İmleç kaybolmuş olsa bile var olan dönemler tekrar oluşturulmaz
+        mevcut = set(
+            Gider.objects.filter(
+                tekrar_sablonu_id__in=[sablon.pk for sablon, _ in plan],
+                tekrar_donemi__gte=min(donemler[0] for _, donemler in plan),
+            ).values_list('tekrar_sablonu_id', 'tekrar_donemi')
+        )
+
+        giderler = Gider.objects.bulk_create(
+            [
+                Gider(
+                    baslik=sablon.baslik,
+                    aciklama=sablon.aciklama,
+                    kategori_id=sablon.kategori_id,
+                    tutar=sablon.tutar,
+                    odeme_yontemi=sablon.odeme_yontemi,
+                    tarih=donem,
+                    tedarikci=sablon.tedarikci,
+                    tekrar_sablonu=sablon,
+                    tekrar_donemi=donem,
+                    olusturan_id=sablon.olusturan_id,
+                )
+                for sablon, donemler in plan
+                for donem in donemler
+                if (sablon.pk, donem) not in mevcut
+            ],
+            batch_size=500,
+        )
+
+        # Gider ekranıyla aynı şekilde kasadan çıkış (bakiye kontrolü yok)
+        kasalar = {}
+        hareketler = []
+        for gider in giderler:
+            if gider.odeme_yontemi not in kasalar:
+                kasalar[gider.odeme_yontemi] = kasa_bul(GIDER_KASA_TIPLERI.get(gider.odeme_yontemi))
+            kasa = kasalar[gider.odeme_yontemi]
+            if kasa:
+                hareketler.append(KasaHareket(
+                    kasa=kasa,
+                    tip='cikis',
+                    kaynak='gider',
+                    tutar=gider.tutar,
+                    aciklama=f'Gider - {gider.baslik}',
+                    gider_id=gider.id,
+                    kullanici_id=gider.olusturan_id,
+                    tarih=_hareket_tarihi(gider.tarih),
+                ))
+        kaydet(hareketler, bakiye_kontrolu=False)
+
+        for sablon, donemler in plan:
+            sablon.tekrar_son_donem = donemler[-1]
+        Gider.objects.bulk_update([sablon for sablon, _ in plan], ['tekrar_son_donem'])
+
+        # bulk_create Gider.save'i çağırmadığı için sayaçlar, aylık özet
+        # ve denetim logu burada güncellenir
+        giderleri_ozete_ekle(giderler)
+        for gider in giderler:
+            degisiklik_kaydet(gider, None)
+        gunluk = defaultdict(int)
+        for gider in giderler:
+            gunluk[gider.tarih] += gider.tutar
+        for gun, toplam in gunluk.items():
+            gunluk_sayaclari_guncelle(None, (gun, {'gider': toplam}))
+
+    rapor_gunlerini_gecersiz_kil(*gunluk)
+    return giderler
@@ -3,14 +3,17 @@ from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.http import JsonResponse
 from django.core.paginator import Paginator
+from django.db import transaction
 from django.db.models import Q, Sum, Count
 from django.db.models.functions import TruncMonth, TruncDay
 from datetime import date, datetime, timedelta
 from decimal import Decimal
 from .models import Gider, GiderKategori
+from .ozet import aylik_ozetler
 from .forms import GiderForm, GiderKategoriForm, GiderAramaForm
-from kasa.models import Kasa, KasaHareket
-from log.models import AktiviteLog
+from kasa.models import KasaHareket
+from kasa.defter import GIDER_KASA_TIPLERI, kasa_bul, kaydet
+from rapor.onbellek import rapor_onbellegi
 
 
 # @login_required  # Geçici olarak kaldırıldı - test için
@@ -80,37 +83,23 @@ def gider_ekle(request):
         if form.is_valid():
             gider = form.save(commit=False)
             gider.olusturan = request.user if request.user.is_authenticated else None
-            gider.save()
             
-            # Kasa hareketi oluştur
-            kasa = None
-            if gider.odeme_yontemi == 'nakit':
-                kasa = Kasa.objects.filter(tip='nakit', aktif=True).first()
-            elif gider.odeme_yontemi == 'kredi_karti':
-                kasa = Kasa.objects.filter(tip='kart', aktif=True).first()
-            elif gider.odeme_yontemi == 'banka_havalesi':
-                kasa = Kasa.objects.filter(tip='banka', aktif=True).first()
-            
-            if kasa:
-                KasaHareket.objects.create(
-                    kasa=kasa,
-                    tip='cikis',
-                    kaynak='gider',
-                    tutar=gider.tutar,
-                    aciklama=f'Gider - {gider.baslik}',
-                    gider_id=gider.id,
-                    kullanici=request.user if request.user.is_authenticated else None
-                )
-            
-            # Aktivite logu
-            if request.user.is_authenticated:
-                AktiviteLog.objects.create(
-                    kullanici=request.user,
-                    aktivite_tipi='ekleme',
-                    baslik='Gider Eklendi',
-                    aciklama=f'{gider.baslik} gideri eklendi ({gider.tutar} ₺)',
-                    content_object=gider
-                )
+            with transaction.atomic():
+                gider.save()
+                
+                # Kasa hareketi oluştur (gider sonradan girilebildiği için
+                # bakiye kontrolü yapılmaz)
+                kasa = kasa_bul(GIDER_KASA_TIPLERI.get(gider.odeme_yontemi))
+                if kasa:
+                    kaydet([KasaHareket(
+                        kasa=kasa,
+                        tip='cikis',
+                        kaynak='gider',
+                        tutar=gider.tutar,
+                        aciklama=f'Gider - {gider.baslik}',
+                        gider_id=gider.id,
+                        kullanici=request.user if request.user.is_authenticated else None
+                    )], bakiye_kontrolu=False)
             
             messages.success(request, f'✅ {gider.baslik} gideri başarıyla eklendi!')
             return redirect('gider:liste')
@@ -136,16 +125,6 @@ def gider_duzenle(request, pk):
         if form.is_valid():
             gider = form.save()
             
-            # Aktivite logu
-            if request.user.is_authenticated:
-                AktiviteLog.objects.create(
-                    kullanici=request.user,
-                    aktivite_tipi='duzenleme',
-                    baslik='Gider Düzenlendi',
-                    aciklama=f'{gider.baslik} gideri düzenlendi',
-                    content_object=gider
-                )
-            
             messages.success(request, f'✅ {gider.baslik} gideri başarıyla güncellendi!')
             return redirect('gider:liste')
     else:
@@ -171,15 +150,6 @@ def gider_sil(request, pk):
         gider.aktif = False  # Soft delete
         gider.save()
         
-        # Aktivite logu
-        if request.user.is_authenticated:
-            AktiviteLog.objects.create(
-                kullanici=request.user,
-                aktivite_tipi='silme',
-                baslik='Gider Silindi',
-                aciklama=f'{baslik} gideri silindi',
-            )
-        
         messages.success(request, f'✅ {baslik} gideri başarıyla silindi!')
         return redirect('gider:liste')
     
@@ -224,45 +194,58 @@ def gider_rapor(request):
     else:
         bitis_tarihi = datetime.strptime(bitis_tarihi, '%Y-%m-%d').date()
     
-    # Giderleri filtrele
-    giderler = Gider.objects.filter(
-        aktif=True,
-        tarih__gte=baslangic_tarihi,
-        tarih__lte=bitis_tarihi
-    ).select_related('kategori')
-    
-    # Genel istatistikler
-    toplam_tutar = giderler.aggregate(toplam=Sum('tutar'))['toplam'] or Decimal('0')
-    toplam_gider = giderler.count()
-    ortalama_gider = toplam_tutar / toplam_gider if toplam_gider > 0 else Decimal('0')
-    
-    # Kategoriye göre dağılım
-    kategori_dagilim = giderler.values('kategori__ad', 'kategori__renk').annotate(
-        toplam=Sum('tutar'),
-        adet=Count('id')
-    ).order_by('-toplam')
-    
-    # Günlük trend (son 30 gün)
-    gunluk_trend = giderler.filter(
-        tarih__gte=date.today() - timedelta(days=30)
-    ).annotate(
-        gun=TruncDay('tarih')
-    ).values('gun').annotate(
-        toplam=Sum('tutar')
-    ).order_by('gun')
-    
-    # En büyük giderler
-    en_buyuk_giderler = giderler.order_by('-tutar')[:10]
+    def hesapla():
+        # Giderleri filtrele
+        giderler = Gider.objects.filter(
+            aktif=True,
+            tarih__gte=baslangic_tarihi,
+            tarih__lte=bitis_tarihi
+        ).select_related('kategori')
+        
+        # Genel istatistikler
+        toplam_tutar = giderler.aggregate(toplam=Sum('tutar'))['toplam'] or Decimal('0')
+        toplam_gider = giderler.count()
+        ortalama_gider = toplam_tutar / toplam_gider if toplam_gider > 0 else Decimal('0')
+        
+        # Kategoriye göre dağılım
+        kategori_dagilim = giderler.values('kategori__ad', 'kategori__renk').annotate(
+            toplam=Sum('tutar'),
+            adet=Count('id')
+        ).order_by('-toplam')
+        
+        # Günlük trend (bitiş tarihine kadarki son 30 gün)
+        gunluk_trend = giderler.filter(
+            tarih__gte=bitis_tarihi - timedelta(days=30)
+        ).annotate(
+            gun=TruncDay('tarih')
+        ).values('gun').annotate(
+            toplam=Sum('tutar')
+        ).order_by('gun')
+        
+        # En büyük giderler (id olarak saklanır, kategori adı değişirse bayatlamasın)
+        en_buyuk_giderler = giderler.order_by('-tutar').values_list('pk', flat=True)[:10]
+        
+        return {
+            'toplam_tutar': toplam_tutar,
+            'toplam_gider': toplam_gider,
+            'ortalama_gider': ortalama_gider,
+            'kategori_dagilim': list(kategori_dagilim),
+            'gunluk_trend': list(gunluk_trend),
+            'en_buyuk_gider_idleri': list(en_buyuk_giderler),
+        }
+    
+    rapor = rapor_onbellegi('gider_rapor_ozeti', {}, baslangic_tarihi, bitis_tarihi, hesapla)
+    rapor = dict(rapor)
+    sira = {pk: i for i, pk in enumerate(rapor.pop('en_buyuk_gider_idleri'))}
+    rapor['en_buyuk_giderler'] = sorted(
+        Gider.objects.filter(pk__in=sira).select_related('kategori'),
+        key=lambda gider: sira[gider.pk],
+    )
     
     context = {
         'baslangic_tarihi': baslangic_tarihi,
         'bitis_tarihi': bitis_tarihi,
-        'toplam_tutar': toplam_tutar,
-        'toplam_gider': toplam_gider,
-        'ortalama_gider': ortalama_gider,
-        'kategori_dagilim': kategori_dagilim,
-        'gunluk_trend': gunluk_trend,
-        'en_buyuk_giderler': en_buyuk_giderler,
+        **rapor,
         'title': 'Gider Raporları',
     }
     
@@ -338,14 +321,14 @@ def rapor(request):
         tarih=bugün, aktif=True
     ).aggregate(toplam=Sum('tutar'))['toplam'] or Decimal('0')
     
-    bu_ay_giderleri = Gider.objects.filter(
-        tarih__gte=bu_ay_başı, aktif=True
-    ).aggregate(toplam=Sum('tutar'))['toplam'] or Decimal('0')
+    # Aylık toplamlar gider tablosu yerine aylık gider özetinden okunur
+    bu_ay_ozetleri = aylik_ozetler(bu_ay_başı, bu_ay_başı)
+    bu_ay_giderleri = bu_ay_ozetleri.aggregate(toplam=Sum('toplam'))['toplam'] or Decimal('0')
     
     # Kategori bazında istatistikler
     kategori_istatistikleri = GiderKategori.objects.annotate(
-        bu_ay_toplam=Sum('gider__tutar', filter=Q(gider__tarih__gte=bu_ay_başı, gider__aktif=True)),
-        gider_adedi=Count('gider', filter=Q(gider__aktif=True))
+        bu_ay_toplam=Sum('aylik_ozetler__toplam', filter=Q(aylik_ozetler__ay=bu_ay_başı)),
+        gider_adedi=Sum('aylik_ozetler__adet', default=0)
     ).order_by('-bu_ay_toplam')
     
     # Günlük trend (son 30 gün)
@@ -358,13 +341,10 @@ def rapor(request):
     ).order_by('tarih')
     
     # Ödeme yöntemi dağılımı
-    ödeme_dağılımı = Gider.objects.filter(
-        tarih__gte=bu_ay_başı,
-        aktif=True
-    ).values('odeme_yontemi').annotate(
-        toplam=Sum('tutar'),
-        adet=Count('id')
-    ).order_by('-toplam')
+    ödeme_dağılımı = bu_ay_ozetleri.values('odeme_yontemi').annotate(
+        toplam=Sum('toplam'),
+        adet=Sum('adet')
+    ).filter(adet__gt=0).order_by('-toplam')
     
     context = {
         'title': 'Gider Raporları',
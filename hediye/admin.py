@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import HediyeCeki, HediyeCekiKullanim
+from .models import HediyeCeki, HediyeCekiKullanim, HediyeYukumlulukOzeti
 
 
 @admin.register(HediyeCeki)
@@ -36,3 +36,10 @@ class HediyeCekiKullanimAdmin(admin.ModelAdmin):
     list_filter = ['kullanim_tarihi', 'kullanan']
     search_fields = ['hediye_ceki__kod', 'satis_id']
     readonly_fields = ['kullanim_tarihi']
+
+
+@admin.register(HediyeYukumlulukOzeti)
+class HediyeYukumlulukOzetiAdmin(admin.ModelAdmin):
+    list_display = ['tarih', 'toplam_kalan', 'cek_sayisi', 'hesaplanma_tarihi']
+    date_hierarchy = 'tarih'
+    ordering = ['-tarih']
@@ -0,0 +1,130 @@
+"""
+Hediye çeki kullanımı.
+
+Çek bakiyeleri koşullu F() güncellemesiyle düşülür: bakiye sadece çek
+kullanılabilir durumdaysa ve kalan tutar yetiyorsa azalır, böylece aynı çeki
+aynı anda kullanan iki kasadan biri başarısız olur. Bir satışta kullanılan
+tüm çekler tek UPDATE (CASE) ile birlikte düşülür; çeklerden biri
+kullanılamıyorsa hiçbirinin bakiyesi değişmez.
+"""
+from decimal import Decimal
+from functools import reduce
+from operator import or_
+
+from django.db import transaction
+from django.db.models import Case, DecimalField, F, Q, Value, When
+from django.utils import timezone
+
+from .models import HediyeCeki, HediyeCekiKullanim
+
+
+class HediyeCekiKullanilamaz(ValueError):
+    """Hediye çeki bulunamadı, kullanılamaz durumda ya da bakiyesi yetersiz"""
+
+
+def _topla(kullanimlar):
+    """[(kod, tutar)] listesini {kod: toplam tutar} sözlüğüne çevir"""
+    from .uretim import kod_hatali_mi
+
+    toplam = {}
+    for kod, tutar in kullanimlar:
+        kod = (kod or '').strip()
+        tutar = Decimal(str(tutar))
+        if not kod:
+            raise HediyeCekiKullanilamaz('Hediye çeki kodu gerekli!')
+        if kod_hatali_mi(kod):
+            # Kontrol karakteri tutmayan kod için veritabanına gidilmez
+            raise HediyeCekiKullanilamaz(f'Hediye çeki kodu hatalı: {kod}')
+        if tutar <= 0:
+            raise HediyeCekiKullanilamaz(f"Hediye çeki tutarı 0'dan büyük olmalıdır: {kod}")
+        toplam[kod] = toplam.get(kod, Decimal('0')) + tutar
+    return toplam
+
+
+def _kullanilamama_nedeni(toplam):
+    """Düşülemeyen ilk çek için hata mesajı"""
+    bugun = timezone.localdate()
+    cekler = {cek.kod: cek for cek in HediyeCeki.objects.filter(kod__in=list(toplam))}
+    for kod, tutar in toplam.items():
+        cek = cekler.get(kod)
+        if cek is None or not cek.aktif:
+            return f'Hediye çeki bulunamadı: {kod}'
+        if cek.durum != 'aktif':
+            return f'Hediye çeki kullanılamaz ({cek.get_durum_display()}): {kod}'
+        if cek.gecerlilik_tarihi < bugun:
+            return f'Hediye çekinin süresi dolmuş: {kod}'
+        if cek.kalan_tutar < tutar:
+            return f'Hediye çekinde yeterli bakiye yok: {kod} (Kalan: {cek.kalan_tutar}₺)'
+    return 'Hediye çeki kullanılamadı!'
+
+
+def cekleri_dus(kullanimlar):
+    """
+    Çeklerin bakiyelerini düş ([(kod, tutar)], aynı kod birden fazla olabilir).
+
+    Bakiyesi sıfırlanan çekler kullanılmış olarak işaretlenir. Çeklerden biri
+    kullanılamıyorsa HediyeCekiKullanilamaz fırlatılır ve hiçbir bakiye
+    değişmez. ({kod: tutar}, {kod: güncel HediyeCeki}) döndürür.
+    """
+    toplam = _topla(kullanimlar)
+    if not toplam:
+        return {}, {}
+
+    simdi = timezone.now()
+    with transaction.atomic():
+        try:
+            with transaction.atomic():
+                guncellenen = HediyeCeki.objects.filter(
+                    reduce(or_, (Q(kod=kod, kalan_tutar__gte=tutar) for kod, tutar in toplam.items())),
+                    aktif=True,
+                    durum='aktif',
+                    gecerlilik_tarihi__gte=timezone.localdate(),
+                ).update(
+                    kalan_tutar=F('kalan_tutar') - Case(
+                        *[When(kod=kod, then=Value(tutar)) for kod, tutar in toplam.items()],
+                        output_field=DecimalField(max_digits=10, decimal_places=2),
+                    )
+                )
+                if guncellenen != len(toplam):
+                    raise HediyeCekiKullanilamaz
+        except HediyeCekiKullanilamaz:
+            # Düşülen diğer çekler geri alındıktan sonra neden okunur
+            raise HediyeCekiKullanilamaz(_kullanilamama_nedeni(toplam)) from None
+
+        HediyeCeki.objects.filter(kod__in=list(toplam), durum='aktif', kalan_tutar__lte=0).update(
+            durum='kullanilmis', kullanilma_tarihi=simdi,
+        )
+        cekler = {cek.kod: cek for cek in HediyeCeki.objects.filter(kod__in=list(toplam))}
+    return toplam, cekler
+
+
+def cekleri_kullan(kullanimlar, satis, kullanan=None, aciklama=''):
+    """
+    Hediye çekleriyle satış ödemesi al.
+
+    Bakiyeler düşülür, her çek için HediyeCekiKullanim ve Odeme kaydı
+    yazılır; hepsi tek transaction'dır. Oluşan Odeme kayıtlarını döndürür.
+    """
+    from satis.models import Odeme
+
+    with transaction.atomic():
+        toplam, cekler = cekleri_dus(kullanimlar)
+        HediyeCekiKullanim.objects.bulk_create([
+            HediyeCekiKullanim(
+                hediye_ceki=cekler[kod],
+                kullanilan_tutar=tutar,
+                satis_id=satis.id,
+                kullanan=kullanan,
+                aciklama=aciklama or f'Satış #{satis.satis_no}',
+            )
+            for kod, tutar in toplam.items()
+        ])
+        return [
+            Odeme.objects.create(
+                satis=satis,
+                odeme_tipi='hediye_ceki',
+                tutar=tutar,
+                hediye_ceki_kodu=kod,
+            )
+            for kod, tutar in toplam.items()
+        ]
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from hediye.yukumluluk import suresi_dolanlari_isaretle, yukumluluk_ozeti_olustur
+
+
+class Command(BaseCommand):
+    help = 'Süresi dolan hediye çeklerini işaretler ve günlük yükümlülük özetini saklar (gece çalıştırılır)'
+
+    def handle(self, *args, **options):
+        dolan = suresi_dolanlari_isaretle()
+        ozet = yukumluluk_ozeti_olustur()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'{dolan} çekin süresi doldu. {ozet.tarih.strftime("%d.%m.%Y")} yükümlülük: '
+                f'{ozet.cek_sayisi} aktif çek, {ozet.toplam_kalan} ₺ ödenmemiş bakiye'
+            )
+        )
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-19 13:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hediye', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='hediyeceki',
+            name='parti',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=20, verbose_name='Parti'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.5 on 2026-10-19 13:35
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hediye', '0003_hediyeceki_parti'),
+        ('musteri', '0005_musterisegment'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HediyeYukumlulukOzeti',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tarih', models.DateField(unique=True, verbose_name='Tarih')),
+                ('toplam_kalan', models.DecimalField(decimal_places=2, default=0, max_digits=15, verbose_name='Ödenmemiş Bakiye')),
+                ('cek_sayisi', models.IntegerField(default=0, verbose_name='Aktif Çek Sayısı')),
+                ('veri', models.JSONField(verbose_name='Özet Verisi')),
+                ('hesaplanma_tarihi', models.DateTimeField(auto_now=True, verbose_name='Hesaplanma Tarihi')),
+            ],
+            options={
+                'verbose_name': 'Hediye Çeki Yükümlülük Özeti',
+                'verbose_name_plural': 'Hediye Çeki Yükümlülük Özetleri',
+                'ordering': ['-tarih'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='hediyeceki',
+            index=models.Index(fields=['durum', 'gecerlilik_tarihi'], name='hediye_ceki_durum_gec_idx'),
+        ),
+    ]
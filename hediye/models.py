@@ -34,29 +34,31 @@ class HediyeCeki(models.Model):
     
     # Notlar
     aciklama = models.TextField(blank=True, null=True, verbose_name="Açıklama")
+    
+    # Toplu üretim partisi (bkz. hediye.uretim)
+    parti = models.CharField(max_length=20, blank=True, default='', db_index=True, verbose_name="Parti")
 
     class Meta:
         verbose_name = "Hediye Çeki"
         verbose_name_plural = "Hediye Çekleri"
         ordering = ['-olusturma_tarihi']
+        indexes = [
+            # Süresi dolan aktif çeklerin taranması
+            models.Index(fields=['durum', 'gecerlilik_tarihi'], name='hediye_ceki_durum_gec_idx'),
+        ]
     
     def __str__(self):
         return f"{self.kod} - {self.kalan_tutar} ₺"
     
     def kullan(self, tutar):
-        """Hediye çekinden belirtilen tutarı kullan"""
-        from decimal import Decimal
-        tutar = Decimal(str(tutar))
-        
-        if tutar > self.kalan_tutar:
-            raise ValueError("Hediye çekinde yeterli bakiye yok!")
-        
-        self.kalan_tutar -= tutar
-        if self.kalan_tutar == 0:
-            self.durum = 'kullanilmis'
-            self.kullanilma_tarihi = timezone.now()
+        """Hediye çekinden belirtilen tutarı kullan (bakiye koşullu güncellemeyle düşülür)"""
+        from .kullanim import cekleri_dus
         
-        self.save()
+        _, cekler = cekleri_dus([(self.kod, tutar)])
+        guncel = cekler[self.kod]
+        self.kalan_tutar = guncel.kalan_tutar
+        self.durum = guncel.durum
+        self.kullanilma_tarihi = guncel.kullanilma_tarihi
         return self.kalan_tutar
     
     @property
@@ -87,3 +89,25 @@ class HediyeCekiKullanim(models.Model):
     
     def __str__(self):
         return f"{self.hediye_ceki.kod} - {self.kullanilan_tutar} ₺"
+
+
+class HediyeYukumlulukOzeti(models.Model):
+    """Günlük hediye çeki yükümlülük özeti - her gece hesaplanır (bkz. hediye.yukumluluk)"""
+    tarih = models.DateField(unique=True, verbose_name="Tarih")
+    
+    # Listeleme için özet alanlar
+    toplam_kalan = models.DecimalField(max_digits=15, decimal_places=2, default=0, verbose_name="Ödenmemiş Bakiye")
+    cek_sayisi = models.IntegerField(default=0, verbose_name="Aktif Çek Sayısı")
+    
+    # Düzenlenme ayı ve durum bazında dağılım (hediye.yukumluluk.yukumluluk_verisi)
+    veri = models.JSONField(verbose_name="Özet Verisi")
+    
+    hesaplanma_tarihi = models.DateTimeField(auto_now=True, verbose_name="Hesaplanma Tarihi")
+    
+    class Meta:
+        verbose_name = "Hediye Çeki Yükümlülük Özeti"
+        verbose_name_plural = "Hediye Çeki Yükümlülük Özetleri"
+        ordering = ['-tarih']
+    
+    def __str__(self):
+        return f"Yükümlülük {self.tarih} - {self.toplam_kalan} ₺"
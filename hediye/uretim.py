@@ -0,0 +1,190 @@
+"""
+Hediye çeki üretimi.
+
+Kodlar işletim sisteminin güvenli rastgele sayı üretecinden (secrets) alınır;
+karışabilecek karakterler (0/O, 1/I) alfabede yoktur. Son karakter Luhn mod N
+kontrol karakteridir: tek karakter hataları ve yan yana iki karakterin yer
+değiştirmesi kasada kod girilirken yakalanır.
+
+Toplu üretimde adaylar tek sorguda mevcut kodlarla karşılaştırılır, çekler
+bulk_create ile yazılır ve aynı parti numarasını alır; parti çok çekli A4
+sayfalar halinde PDF olarak basılabilir.
+"""
+import io
+import os
+import secrets
+from decimal import Decimal
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import HediyeCeki
+
+
+ALFABE = '23456789ABCDEFGHJKLMNPQRSTUVWXYZ'
+ONEK = 'HC'
+RASTGELE_UZUNLUK = 8
+
+# Tek seferde üretilebilecek en fazla çek
+EN_FAZLA_ADET = 10000
+
+_DEGER = {karakter: i for i, karakter in enumerate(ALFABE)}
+
+
+def kontrol_karakteri(govde):
+    """Gövdenin Luhn mod N kontrol karakteri"""
+    n = len(ALFABE)
+    toplam = 0
+    for i, karakter in enumerate(reversed(govde)):
+        deger = _DEGER[karakter]
+        if i % 2 == 0:
+            deger *= 2
+            deger = deger // n + deger % n
+        toplam += deger
+    return ALFABE[(n - toplam % n) % n]
+
+
+def kod_gecerli_mi(kod):
+    """Kodun kontrol karakteri doğru mu (eski biçimdeki kodlar için False)"""
+    kod = (kod or '').strip().upper()
+    if not kod.startswith(ONEK) or len(kod) != len(ONEK) + RASTGELE_UZUNLUK + 1:
+        return False
+    govde = kod[len(ONEK):-1]
+    if any(karakter not in _DEGER for karakter in govde):
+        return False
+    return kontrol_karakteri(govde) == kod[-1]
+
+
+def kod_hatali_mi(kod):
+    """
+    Yeni biçimdeki (HC + gövde + kontrol karakteri) kod hatalı girilmiş mi.
+    HC ile başlamayan ya da uzunluğu farklı eski kodlar kontrol edilmez.
+    """
+    kod = (kod or '').strip().upper()
+    if not kod.startswith(ONEK) or len(kod) != len(ONEK) + RASTGELE_UZUNLUK + 1:
+        return False
+    return not kod_gecerli_mi(kod)
+
+
+def _aday_kodlar(adet):
+    # Alfabe 32 karakter: her bayt'ın alt 5 biti eşit dağılımlı bir karakter seçer
+    baytlar = secrets.token_bytes(adet * RASTGELE_UZUNLUK)
+    kodlar = set()
+    for i in range(adet):
+        govde = ''.join(ALFABE[b & 31] for b in baytlar[i * RASTGELE_UZUNLUK:(i + 1) * RASTGELE_UZUNLUK])
+        kodlar.add(f'{ONEK}{govde}{kontrol_karakteri(govde)}')
+    return kodlar
+
+
+def kodlar_uret(adet):
+    """Veritabanında olmayan `adet` adet yeni kod"""
+    kodlar = set()
+    while len(kodlar) < adet:
+        adaylar = _aday_kodlar(adet - len(kodlar)) - kodlar
+        mevcut = set(HediyeCeki.objects.filter(kod__in=list(adaylar)).values_list('kod', flat=True))
+        kodlar |= adaylar - mevcut
+    return sorted(kodlar)
+
+
+def parti_no():
+    """Toplu üretim parti numarası (tarih + rastgele ek)"""
+    return f"{timezone.localtime().strftime('%Y%m%d%H%M')}-{secrets.token_hex(2).upper()}"
+
+
+def cekleri_olustur(adet, tutar, gecerlilik_tarihi, olusturan=None, musteri=None, aciklama='', parti=''):
+    """
+    `adet` adet aynı tutarlı hediye çeki oluştur.
+
+    Çekler tek transaction içinde bulk_create ile yazılır. Oluşan çekleri
+    döndürür.
+    """
+    adet = int(adet)
+    tutar = Decimal(str(tutar))
+    if adet < 1 or adet > EN_FAZLA_ADET:
+        raise ValueError(f'Çek adedi 1 ile {EN_FAZLA_ADET} arasında olmalıdır!')
+    if tutar <= 0:
+        raise ValueError("Çek tutarı 0'dan büyük olmalıdır!")
+
+    with transaction.atomic():
+        return HediyeCeki.objects.bulk_create(
+            [
+                HediyeCeki(
+                    kod=kod,
+                    tutar=tutar,
+                    kalan_tutar=tutar,
+                    gecerlilik_tarihi=gecerlilik_tarihi,
+                    olusturan=olusturan,
+                    musteri=musteri,
+                    durum='aktif',
+                    aktif=True,
+                    aciklama=aciklama,
+                    parti=parti,
+                )
+                for kod in kodlar_uret(adet)
+            ],
+            batch_size=1000,
+        )
+
+
+def _yazi_tipi():
+    """Türkçe karakterleri destekleyen ilk TTF yazı tipi (yoksa Helvetica)"""
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+
+    adaylar = [
+        (r'C:\Windows\Fonts\arial.ttf', 'Arial'),
+        (r'C:\Windows\Fonts\calibri.ttf', 'Calibri'),
+        ('/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf', 'DejaVuSans'),
+    ]
+    for yol, ad in adaylar:
+        if ad in pdfmetrics.getRegisteredFontNames():
+            return ad
+        if os.path.exists(yol):
+            try:
+                pdfmetrics.registerFont(TTFont(ad, yol))
+                return ad
+            except Exception:
+                continue
+    return 'Helvetica'
+
+
+def cekler_pdf(cekler, sutun=2, satir=5):
+    """Çekleri A4 sayfalara (varsayılan sayfa başına 2x5) basılabilir PDF olarak çiz"""
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.units import mm
+    from reportlab.pdfgen import canvas
+
+    yazi = _yazi_tipi()
+    genislik, yukseklik = A4
+    kenar = 10 * mm
+    kart_g = (genislik - 2 * kenar) / sutun
+    kart_y = (yukseklik - 2 * kenar) / satir
+    sayfa_basina = sutun * satir
+
+    buffer = io.BytesIO()
+    pdf = canvas.Canvas(buffer, pagesize=A4)
+    pdf.setTitle('Hediye Çekleri')
+    for i, cek in enumerate(cekler):
+        if i and i % sayfa_basina == 0:
+            pdf.showPage()
+        konum = i % sayfa_basina
+        x = kenar + (konum % sutun) * kart_g
+        y = yukseklik - kenar - (konum // sutun + 1) * kart_y
+        orta = x + kart_g / 2
+
+        # Kesim çizgisi
+        pdf.setDash(3, 3)
+        pdf.setLineWidth(0.5)
+        pdf.rect(x, y, kart_g, kart_y)
+        pdf.setDash()
+
+        pdf.setFont(yazi, 14)
+        pdf.drawCentredString(orta, y + kart_y - 12 * mm, 'HEDİYE ÇEKİ')
+        pdf.setFont(yazi, 22)
+        pdf.drawCentredString(orta, y + kart_y / 2 + 2 * mm, f'{cek.tutar:.2f} ₺')
+        pdf.setFont('Courier-Bold', 16)
+        pdf.drawCentredString(orta, y + kart_y / 2 - 10 * mm, cek.kod)
+        pdf.setFont(yazi, 9)
+        pdf.drawCentredString(orta, y + 8 * mm, f"Son geçerlilik: {cek.gecerlilik_tarihi.strftime('%d.%m.%Y')}")
+    pdf.save()
+    return buffer.getvalue()
@@ -10,6 +10,13 @@ urlpatterns = [
     path('<int:pk>/iptal/', views.hediye_ceki_iptal, name='iptal'),
     path('<int:pk>/yazdir/', views.hediye_ceki_yazdir, name='yazdir'),
     
+    # Yükümlülük özeti
+    path('yukumluluk/', views.hediye_yukumluluk, name='yukumluluk'),
+    
+    # Toplu üretim
+    path('toplu/', views.hediye_ceki_toplu, name='toplu'),
+    path('parti/<str:parti>/pdf/', views.hediye_parti_pdf, name='parti_pdf'),
+    
     # AJAX endpoints
     path('ajax/sorgula/', views.hediye_ceki_ajax_sorgula, name='ajax_sorgula'),
 ]
@@ -1,11 +1,13 @@
 from django.shortcuts import render, get_object_or_404, redirect
+from django.urls import reverse
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse
 from django.core.paginator import Paginator
 from django.db.models import Q
 from django.utils import timezone
-from .models import HediyeCeki, HediyeCekiKullanim
+from .models import HediyeCeki, HediyeCekiKullanim, HediyeYukumlulukOzeti
+from .yukumluluk import cek_istatistikleri, yukumluluk_ozeti_olustur
 
 
 @login_required
@@ -15,9 +17,14 @@ def hediye_ceki_listesi(request):
     search_query = request.GET.get('search', '')
     durum_filter = request.GET.get('durum', '')
     tarih_filter = request.GET.get('tarih', '')
+    parti_filter = request.GET.get('parti', '')
     
     hediye_cekleri = HediyeCeki.objects.all()
     
+    # Toplu üretim partisi
+    if parti_filter:
+        hediye_cekleri = hediye_cekleri.filter(parti=parti_filter)
+    
     # Arama
     if search_query:
         hediye_cekleri = hediye_cekleri.filter(
@@ -54,32 +61,102 @@ def hediye_ceki_listesi(request):
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     
-    # İstatistikler
-    toplam_cekler = HediyeCeki.objects.count()
-    aktif_cekler = HediyeCeki.objects.filter(durum='aktif', aktif=True).count()
-    kullanilmis_cekler = HediyeCeki.objects.filter(durum='kullanilmis').count()
-    iptal_cekler = HediyeCeki.objects.filter(durum='iptal').count()
-    
-    toplam_tutar = sum(cek.tutar for cek in HediyeCeki.objects.filter(durum='aktif', aktif=True))
-    kalan_tutar = sum(cek.kalan_tutar for cek in HediyeCeki.objects.filter(durum='aktif', aktif=True))
+    # İstatistikler (tek sorgu)
+    istatistikler = cek_istatistikleri()
     
     context = {
         'page_obj': page_obj,
         'search_query': search_query,
         'durum_filter': durum_filter,
         'tarih_filter': tarih_filter,
-        'toplam_cekler': toplam_cekler,
-        'aktif_cekler': aktif_cekler,
-        'kullanilmis_cekler': kullanilmis_cekler,
-        'iptal_cekler': iptal_cekler,
-        'toplam_tutar': toplam_tutar,
-        'kalan_tutar': kalan_tutar,
+        'parti_filter': parti_filter,
         'durum_secenekleri': HediyeCeki.DURUM_SECENEKLERI,
+        **istatistikler,
     }
     
     return render(request, 'hediye/liste.html', context)
 
 
+@login_required
+def hediye_ceki_toplu(request):
+    """Kampanya için toplu hediye çeki oluşturma"""
+    from datetime import datetime, timedelta
+    from decimal import Decimal, InvalidOperation
+    from .uretim import EN_FAZLA_ADET, cekleri_olustur, parti_no
+    
+    form = {
+        'adet': request.POST.get('adet', '100'),
+        'tutar': request.POST.get('tutar', ''),
+        'gecerlilik_tarihi': request.POST.get(
+            'gecerlilik_tarihi', (timezone.localdate() + timedelta(days=365)).strftime('%Y-%m-%d')
+        ),
+        'aciklama': request.POST.get('aciklama', ''),
+    }
+    
+    if request.method == 'POST':
+        try:
+            adet = int(form['adet'])
+            tutar = Decimal(form['tutar'].replace(',', '.'))
+            gecerlilik_tarihi = datetime.strptime(form['gecerlilik_tarihi'], '%Y-%m-%d').date()
+        except (ValueError, InvalidOperation):
+            messages.error(request, 'Adet, tutar ve geçerlilik tarihini kontrol edin!')
+        else:
+            if gecerlilik_tarihi < timezone.localdate():
+                messages.error(request, 'Geçerlilik tarihi geçmiş olamaz!')
+            else:
+                parti = parti_no()
+                try:
+                    cekler = cekleri_olustur(
+                        adet,
+                        tutar,
+                        gecerlilik_tarihi,
+                        olusturan=request.user,
+                        aciklama=form['aciklama'] or f'Toplu üretim - Parti {parti}',
+                        parti=parti,
+                    )
+                except ValueError as e:
+                    messages.error(request, str(e))
+                else:
+                    messages.success(request, f'{len(cekler)} hediye çeki oluşturuldu (Parti: {parti}).')
+                    return redirect(f"{reverse('hediye:liste')}?parti={parti}")
+    
+    return render(request, 'hediye/toplu.html', {'form': form, 'en_fazla_adet': EN_FAZLA_ADET})
+
+
+@login_required
+def hediye_parti_pdf(request, parti):
+    """Partideki çekleri çok çekli A4 sayfalar halinde PDF olarak indir"""
+    from .uretim import cekler_pdf
+    
+    cekler = list(HediyeCeki.objects.filter(parti=parti).order_by('kod'))
+    if not cekler:
+        messages.error(request, 'Parti bulunamadı!')
+        return redirect('hediye:liste')
+    
+    response = HttpResponse(cekler_pdf(cekler), content_type='application/pdf')
+    response['Content-Disposition'] = f'attachment; filename="hediye_cekleri_{parti}.pdf"'
+    return response
+
+
+@login_required
+def hediye_yukumluluk(request):
+    """Ödenmemiş hediye çeki bakiyesi - düzenlenme ayı ve durum bazında"""
+    bugun = timezone.localdate()
+    if request.method == 'POST':
+        yukumluluk_ozeti_olustur(bugun)
+        return redirect('hediye:yukumluluk')
+    
+    # Gece hesaplanmadıysa şimdi hesaplanır
+    ozet = HediyeYukumlulukOzeti.objects.filter(tarih=bugun).first() or yukumluluk_ozeti_olustur(bugun)
+    gecmis = HediyeYukumlulukOzeti.objects.order_by('-tarih')[:30]
+    
+    context = {
+        'ozet': ozet,
+        'gecmis': gecmis,
+    }
+    return render(request, 'hediye/yukumluluk.html', context)
+
+
 @login_required
 def hediye_ceki_detay(request, pk):
     """Hediye çeki detay sayfası"""
@@ -130,6 +207,11 @@ def hediye_ceki_ajax_sorgula(request):
     if not kod:
         return JsonResponse({'success': False, 'message': 'Hediye çeki kodu gerekli!'})
     
+    # Yazım hatası olan yeni biçim kodlar sorgulanmadan reddedilir
+    from .uretim import kod_hatali_mi
+    if kod_hatali_mi(kod):
+        return JsonResponse({'success': False, 'message': 'Hediye çeki kodu hatalı!'})
+    
     try:
         hediye_ceki = HediyeCeki.objects.get(kod=kod, aktif=True)
         
@@ -0,0 +1,99 @@
+"""
+Hediye çeki yükümlülüğü.
+
+Süresi dolan aktif çekler `suresi_dolanlari_isaretle` ile tek UPDATE'te
+"suresi_dolmus" olarak işaretlenir. Ödenmemiş çek bakiyesi (yükümlülük)
+düzenlenme ayı ve durum bazında tek gruplu sorguyla hesaplanır ve her gece
+`hediye_gun_sonu` komutuyla HediyeYukumlulukOzeti olarak saklanır.
+"""
+from decimal import Decimal
+
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from .models import HediyeCeki, HediyeYukumlulukOzeti
+
+
+# Bakiyesi hâlâ kullanılabilecek çekler
+ACIK_CEKLER = Q(durum='aktif', aktif=True)
+
+
+def _para(deger):
+    return str(Decimal(deger or 0).quantize(Decimal('0.01')))
+
+
+def suresi_dolanlari_isaretle(gun=None):
+    """Geçerlilik tarihi geçmiş aktif çekleri işaretle; işaretlenen çek sayısını döndür"""
+    gun = gun or timezone.localdate()
+    return HediyeCeki.objects.filter(durum='aktif', gecerlilik_tarihi__lt=gun).update(durum='suresi_dolmus')
+
+
+def cek_istatistikleri():
+    """Hediye çeki listesi istatistikleri (tek sorgu)"""
+    return HediyeCeki.objects.aggregate(
+        toplam_cekler=Count('id'),
+        aktif_cekler=Count('id', filter=ACIK_CEKLER),
+        kullanilmis_cekler=Count('id', filter=Q(durum='kullanilmis')),
+        iptal_cekler=Count('id', filter=Q(durum='iptal')),
+        toplam_tutar=Sum('tutar', filter=ACIK_CEKLER, default=Decimal('0')),
+        kalan_tutar=Sum('kalan_tutar', filter=ACIK_CEKLER, default=Decimal('0')),
+    )
+
+
+def yukumluluk_verisi(gun=None):
+    """Düzenlenme ayı ve durum bazında çek sayısı, tutar ve kalan bakiye (JSON'a yazılabilir)"""
+    gun = gun or timezone.localdate()
+    durum_adlari = dict(HediyeCeki.DURUM_SECENEKLERI)
+    satirlar = HediyeCeki.objects.annotate(
+        ay=TruncMonth('olusturma_tarihi'),
+    ).values('ay', 'durum').annotate(
+        adet=Count('id'),
+        tutar=Sum('tutar'),
+        kalan=Sum('kalan_tutar'),
+        acik_adet=Count('id', filter=ACIK_CEKLER),
+        acik_kalan=Sum('kalan_tutar', filter=ACIK_CEKLER),
+    ).order_by('-ay', 'durum')
+
+    aylar = []
+    toplam = Decimal('0')
+    cek_sayisi = 0
+    for satir in satirlar:
+        ay = timezone.localtime(satir['ay']).strftime('%Y-%m') if satir['ay'] else ''
+        if not aylar or aylar[-1]['ay'] != ay:
+            aylar.append({'ay': ay, 'durumlar': [], 'kalan': Decimal('0')})
+        acik_kalan = satir['acik_kalan'] or Decimal('0')
+        aylar[-1]['durumlar'].append({
+            'durum': satir['durum'],
+            'durum_adi': durum_adlari.get(satir['durum'], satir['durum']),
+            'adet': satir['adet'],
+            'tutar': _para(satir['tutar']),
+            'kalan': _para(satir['kalan']),
+        })
+        aylar[-1]['kalan'] += acik_kalan
+        toplam += acik_kalan
+        cek_sayisi += satir['acik_adet']
+
+    for ay in aylar:
+        ay['kalan'] = _para(ay['kalan'])
+    return {
+        'tarih': gun.isoformat(),
+        'toplam_kalan': _para(toplam),
+        'cek_sayisi': cek_sayisi,
+        'aylar': aylar,
+    }
+
+
+def yukumluluk_ozeti_olustur(gun=None):
+    """Yükümlülük özetini hesapla ve sakla (aynı günün kaydı yenilenir)"""
+    gun = gun or timezone.localdate()
+    veri = yukumluluk_verisi(gun)
+    ozet, _ = HediyeYukumlulukOzeti.objects.update_or_create(
+        tarih=gun,
+        defaults={
+            'toplam_kalan': Decimal(veri['toplam_kalan']),
+            'cek_sayisi': veri['cek_sayisi'],
+            'veri': veri,
+        },
+    )
+    return ozet
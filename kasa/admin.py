@@ -1,10 +1,10 @@
 from django.contrib import admin
-from .models import Kasa, KasaHareket, KasaVirman, KasaCikis, KasaGiris
+from .models import Kasa, KasaHareket, KasaVirman, KasaCikis, KasaGiris, KasaKontrolNoktasi, HesapEkstresi, EkstreSatiri
 
 
 @admin.register(Kasa)
 class KasaAdmin(admin.ModelAdmin):
-    list_display = ('ad', 'tip', 'guncel_bakiye', 'aktif', 'olusturma_tarihi')
+    list_display = ('ad', 'tip', 'mevcut_bakiye', 'aktif', 'olusturma_tarihi')
     list_filter = ('tip', 'aktif')
     search_fields = ('ad', 'aciklama')
     ordering = ('tip', 'ad')
@@ -12,7 +12,7 @@ class KasaAdmin(admin.ModelAdmin):
 
 @admin.register(KasaHareket)
 class KasaHareketAdmin(admin.ModelAdmin):
-    list_display = ('kasa', 'tip', 'kaynak', 'tutar', 'tarih', 'kullanici')
+    list_display = ('kasa', 'tip', 'kaynak', 'tutar', 'bakiye_sonrasi', 'tarih', 'kullanici')
     list_filter = ('tip', 'kaynak', 'kasa', 'tarih')
     search_fields = ('aciklama', 'kasa__ad')
     ordering = ('-tarih',)
@@ -40,3 +40,27 @@ class KasaGirisAdmin(admin.ModelAdmin):
     list_filter = ('kasa', 'sebep', 'tarih')
     search_fields = ('aciklama',)
     ordering = ('-tarih',)
+
+
+@admin.register(KasaKontrolNoktasi)
+class KasaKontrolNoktasiAdmin(admin.ModelAdmin):
+    list_display = ('kasa', 'tarih', 'bakiye', 'kayitli_bakiye', 'fark', 'olusturma_tarihi')
+    list_filter = ('kasa', 'tarih')
+    ordering = ('-tarih',)
+
+
+@admin.register(HesapEkstresi)
+class HesapEkstresiAdmin(admin.ModelAdmin):
+    list_display = ('kasa', 'dosya_adi', 'baslangic_tarihi', 'bitis_tarihi', 'satir_sayisi', 'yukleyen', 'yukleme_tarihi')
+    list_filter = ('kasa', 'yukleme_tarihi')
+    search_fields = ('dosya_adi',)
+    ordering = ('-yukleme_tarihi',)
+
+
+@admin.register(EkstreSatiri)
+class EkstreSatiriAdmin(admin.ModelAdmin):
+    list_display = ('ekstre', 'tarih', 'tip', 'tutar', 'durum', 'eslesen_hareket', 'tutar_farki', 'gun_farki')
+    list_filter = ('durum', 'tip', 'kasa')
+    search_fields = ('aciklama', 'referans')
+    raw_id_fields = ('onerilen_hareket', 'eslesen_hareket')
+    ordering = ('tarih',)
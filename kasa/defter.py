@@ -0,0 +1,126 @@
+"""
+Kasa defteri - hareket kayıt servisi.
+
+Virman, para giriş/çıkışı, satış, gider ve tahsilat hareketleri bu modül
+üzerinden işlenir. Bir işlemin tüm bacakları (kaydedilmemiş KasaHareket
+nesneleri) tek transaction içinde yazılır:
+
+1. İlgili kasalar id sırasıyla kilitlenir (select_for_update), böylece
+   aynı kasalara dokunan eşzamanlı işlemler birbirini kilitlemez.
+2. Kilitli bakiyeler üzerinden yeterli bakiye kontrolü yapılır.
+3. Hareketler bulk_create ile tek sorguda yazılır; kasa bakiyeleri kasa
+   başına tek F() güncellemesiyle artırılır.
+
+bulk_create KasaHareket.save'i çağırmadığı için bakiye ve rapor önbelleği
+güncellemeleri burada yapılır.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Kasa, KasaHareket, KasaKontrolNoktasi
+
+
+# Satış ve tahsilat ödeme tiplerinin girileceği kasa tipleri
+ODEME_KASA_TIPLERI = {
+    'nakit': 'nakit',
+    'kart': 'pos',
+    'havale': 'banka',
+}
+
+# Gider ödeme yöntemlerinin çıkılacağı kasa tipleri
+GIDER_KASA_TIPLERI = {
+    'nakit': 'nakit',
+    'kart': 'kart',
+    'havale': 'banka',
+}
+
+# Eksi bakiyeye düşebilen kasa tipleri (harcama kredi kartı borç taşır)
+EKSI_BAKIYE_TIPLERI = ('kart',)
+
+
+class YetersizBakiye(ValueError):
+    """Kasada işlem için yeterli bakiye yok"""
+
+
+def kasa_bul(tip):
+    """Verilen tipteki ilk aktif kasa (yoksa None)"""
+    if not tip:
+        return None
+    return Kasa.objects.filter(tip=tip, aktif=True).order_by('id').first()
+
+
+def kaydet(hareketler, bakiye_kontrolu=True):
+    """
+    Kaydedilmemiş KasaHareket nesnelerini tek transaction içinde işle.
+
+    `bakiye_kontrolu` ise işlem sonunda bakiyesi eksiye düşen kasa
+    (EKSI_BAKIYE_TIPLERI hariç) için YetersizBakiye fırlatılır ve hiçbir
+    hareket yazılmaz. Kaydedilen hareketleri döndürür.
+    """
+    hareketler = [hareket for hareket in hareketler if hareket is not None]
+    if not hareketler:
+        return []
+
+    simdi = timezone.now()
+    for hareket in hareketler:
+        if hareket.tip not in ('giris', 'cikis'):
+            raise ValueError(f'Geçersiz hareket tipi: {hareket.tip}')
+        hareket.tutar = Decimal(str(hareket.tutar))
+        if hareket.tutar <= 0:
+            raise ValueError("Hareket tutarı 0'dan büyük olmalıdır!")
+        if hareket.tarih is None:
+            hareket.tarih = simdi
+
+    with transaction.atomic():
+        # Kilitler her zaman aynı sırayla alınır
+        kasa_idleri = sorted({hareket.kasa_id for hareket in hareketler})
+        kasalar = {
+            kasa.id: kasa
+            for kasa in Kasa.objects.select_for_update().filter(pk__in=kasa_idleri).order_by('pk')
+        }
+        if len(kasalar) != len(kasa_idleri):
+            raise Kasa.DoesNotExist('Hareket kasası bulunamadı!')
+
+        # Kasa bazında net etki ve hareket sonrası bakiyeler
+        netler = defaultdict(Decimal)
+        for hareket in hareketler:
+            etki = hareket._bakiye_etkisi()[1]
+            netler[hareket.kasa_id] += etki
+            hareket.bakiye_sonrasi = kasalar[hareket.kasa_id].mevcut_bakiye + netler[hareket.kasa_id]
+
+        if bakiye_kontrolu:
+            for kasa_id, net in netler.items():
+                kasa = kasalar[kasa_id]
+                if net < 0 and kasa.tip not in EKSI_BAKIYE_TIPLERI and kasa.mevcut_bakiye + net < 0:
+                    raise YetersizBakiye(f'{kasa.ad} kasasında yeterli bakiye yok!')
+
+        KasaHareket.objects.bulk_create(hareketler)
+
+        for kasa_id, net in netler.items():
+            if net:
+                Kasa.objects.filter(pk=kasa_id).update(mevcut_bakiye=F('mevcut_bakiye') + net)
+
+        # Geriye dönük hareketler sonraki kontrol noktalarını etkiler
+        noktalar = defaultdict(Decimal)
+        for hareket in hareketler:
+            kasa_id, etki, tarih = hareket._bakiye_etkisi()
+            noktalar[(kasa_id, tarih)] += etki
+        for (kasa_id, tarih), etki in noktalar.items():
+            if etki:
+                KasaKontrolNoktasi.objects.filter(kasa_id=kasa_id, tarih__gt=tarih).update(bakiye=F('bakiye') + etki)
+
+    for hareket in hareketler:
+        hareket._bakiye_onceki = hareket._bakiye_etkisi()
+        # Bellekteki kasa nesnesi de güncel bakiyeyi göstersin
+        kasa = hareket._state.fields_cache.get('kasa')
+        if kasa is not None:
+            kasa.mevcut_bakiye = kasalar[hareket.kasa_id].mevcut_bakiye + netler[hareket.kasa_id]
+
+    from rapor.onbellek import rapor_gunlerini_gecersiz_kil
+    rapor_gunlerini_gecersiz_kil(*(hareket.tarih for hareket in hareketler))
+
+    return hareketler
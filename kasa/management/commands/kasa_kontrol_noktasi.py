@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+from kasa.models import Kasa, KasaKontrolNoktasi
+
+
+class Command(BaseCommand):
+    help = 'Aktif kasalar için bakiye kontrol noktası oluşturur ve saklanan bakiyeyi denetler'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tam',
+            action='store_true',
+            help='Bakiyeyi önceki kontrol noktası yerine tüm hareketlerden hesapla',
+        )
+        parser.add_argument(
+            '--duzelt',
+            action='store_true',
+            help='Fark bulunursa saklanan kasa bakiyesini düzelt',
+        )
+
+    def handle(self, *args, **options):
+        fark_var = False
+        for kasa in Kasa.objects.filter(aktif=True):
+            nokta = KasaKontrolNoktasi.olustur(kasa, tam=options['tam'], duzelt=options['duzelt'])
+            if nokta.fark:
+                fark_var = True
+                durum = 'düzeltildi' if options['duzelt'] else 'düzeltilmedi'
+                self.stdout.write(
+                    self.style.WARNING(
+                        f'{kasa.ad}: saklanan bakiye {nokta.kayitli_bakiye}₺, '
+                        f'hesaplanan {nokta.kayitli_bakiye - nokta.fark}₺ (fark {nokta.fark}₺, {durum})'
+                    )
+                )
+            else:
+                self.stdout.write(f'{kasa.ad}: {nokta.bakiye}₺')
+
+        if fark_var:
+            self.stdout.write(self.style.WARNING('Bazı kasalarda bakiye farkı bulundu!'))
+        else:
+            self.stdout.write(self.style.SUCCESS('Kontrol noktaları oluşturuldu, fark yok.'))
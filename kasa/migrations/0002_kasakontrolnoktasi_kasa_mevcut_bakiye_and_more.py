@@ -0,0 +1,77 @@
+# Generated by Django 5.2.5 on 2026-10-19 13:05
+
+import django.db.models.deletion
+from django.conf import settings
+from decimal import Decimal
+
+from django.db import migrations, models
+
+
+def bakiyeleri_doldur(apps, schema_editor):
+    """Mevcut hareketlerden kasa bakiyelerini ve hareket sonrası bakiyeleri hesapla"""
+    Kasa = apps.get_model('kasa', 'Kasa')
+    KasaHareket = apps.get_model('kasa', 'KasaHareket')
+
+    for kasa in Kasa.objects.all():
+        bakiye = kasa.baslangic_bakiye or Decimal('0')
+        guncellenecek = []
+        for hareket in KasaHareket.objects.filter(kasa=kasa).order_by('id').iterator():
+            bakiye += hareket.tutar if hareket.tip == 'giris' else -hareket.tutar
+            hareket.bakiye_sonrasi = bakiye
+            guncellenecek.append(hareket)
+            if len(guncellenecek) >= 1000:
+                KasaHareket.objects.bulk_update(guncellenecek, ['bakiye_sonrasi'])
+                guncellenecek = []
+        KasaHareket.objects.bulk_update(guncellenecek, ['bakiye_sonrasi'])
+        Kasa.objects.filter(pk=kasa.pk).update(mevcut_bakiye=bakiye)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kasa', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='KasaKontrolNoktasi',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tarih', models.DateTimeField(verbose_name='Tarih')),
+                ('bakiye', models.DecimalField(decimal_places=2, max_digits=15, verbose_name='Bakiye')),
+                ('kayitli_bakiye', models.DecimalField(decimal_places=2, max_digits=15, verbose_name='Kayıtlı Bakiye')),
+                ('fark', models.DecimalField(decimal_places=2, default=0, max_digits=15, verbose_name='Fark')),
+                ('olusturma_tarihi', models.DateTimeField(auto_now_add=True, verbose_name='Oluşturma Tarihi')),
+            ],
+            options={
+                'verbose_name': 'Kasa Kontrol Noktası',
+                'verbose_name_plural': 'Kasa Kontrol Noktaları',
+                'ordering': ['-tarih'],
+            },
+        ),
+        migrations.AddField(
+            model_name='kasa',
+            name='mevcut_bakiye',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=15, verbose_name='Mevcut Bakiye'),
+        ),
+        migrations.AddField(
+            model_name='kasahareket',
+            name='bakiye_sonrasi',
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, max_digits=15, null=True, verbose_name='Hareket Sonrası Bakiye'),
+        ),
+        migrations.AddIndex(
+            model_name='kasahareket',
+            index=models.Index(fields=['kasa', 'tarih'], name='kasa_kasaha_kasa_id_856fee_idx'),
+        ),
+        migrations.AddField(
+            model_name='kasakontrolnoktasi',
+            name='kasa',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='kontrol_noktalari', to='kasa.kasa', verbose_name='Kasa'),
+        ),
+        migrations.AddIndex(
+            model_name='kasakontrolnoktasi',
+            index=models.Index(fields=['kasa', 'tarih'], name='kasa_kasako_kasa_id_d2143f_idx'),
+        ),
+        migrations.RunPython(bakiyeleri_doldur, migrations.RunPython.noop),
+    ]
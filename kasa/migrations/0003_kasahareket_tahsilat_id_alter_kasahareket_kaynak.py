@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-19 13:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kasa', '0002_kasakontrolnoktasi_kasa_mevcut_bakiye_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='kasahareket',
+            name='tahsilat_id',
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name='Tahsilat ID'),
+        ),
+        migrations.AlterField(
+            model_name='kasahareket',
+            name='kaynak',
+            field=models.CharField(choices=[('satis', 'Satış'), ('gider', 'Gider'), ('virman', 'Virman'), ('cikis', 'Para Çıkışı'), ('giris', 'Para Girişi'), ('tahsilat', 'Tahsilat'), ('duzeltme', 'Düzeltme')], max_length=20, verbose_name='Kaynak'),
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 5.2.5 on 2026-10-19 13:11
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kasa', '0003_kasahareket_tahsilat_id_alter_kasahareket_kaynak'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HesapEkstresi',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dosya_adi', models.CharField(max_length=255, verbose_name='Dosya Adı')),
+                ('baslangic_tarihi', models.DateField(blank=True, null=True, verbose_name='Başlangıç Tarihi')),
+                ('bitis_tarihi', models.DateField(blank=True, null=True, verbose_name='Bitiş Tarihi')),
+                ('satir_sayisi', models.PositiveIntegerField(default=0, verbose_name='Satır Sayısı')),
+                ('yukleme_tarihi', models.DateTimeField(auto_now_add=True, verbose_name='Yükleme Tarihi')),
+                ('kasa', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ekstreler', to='kasa.kasa', verbose_name='Kasa')),
+                ('yukleyen', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL, verbose_name='Yükleyen')),
+            ],
+            options={
+                'verbose_name': 'Hesap Ekstresi',
+                'verbose_name_plural': 'Hesap Ekstreleri',
+                'ordering': ['-yukleme_tarihi'],
+            },
+        ),
+        migrations.CreateModel(
+            name='EkstreSatiri',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tarih', models.DateField(verbose_name='Tarih')),
+                ('tip', models.CharField(choices=[('giris', 'Para Girişi'), ('cikis', 'Para Çıkışı')], max_length=10, verbose_name='Hareket Tipi')),
+                ('tutar', models.DecimalField(decimal_places=2, max_digits=15, verbose_name='Tutar')),
+                ('aciklama', models.CharField(blank=True, max_length=255, verbose_name='Açıklama')),
+                ('referans', models.CharField(blank=True, max_length=100, verbose_name='Referans')),
+                ('durum', models.CharField(choices=[('bekliyor', 'Bekliyor'), ('onerildi', 'Eşleşme Önerildi'), ('eslesti', 'Eşleşti'), ('yok_sayildi', 'Yok Sayıldı')], default='bekliyor', max_length=20, verbose_name='Durum')),
+                ('tutar_farki', models.DecimalField(decimal_places=2, default=0, max_digits=15, verbose_name='Tutar Farkı')),
+                ('gun_farki', models.SmallIntegerField(default=0, verbose_name='Gün Farkı')),
+                ('onay_tarihi', models.DateTimeField(blank=True, null=True, verbose_name='Onay Tarihi')),
+                ('eslesen_hareket', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='ekstre_satiri', to='kasa.kasahareket', verbose_name='Eşleşen Hareket')),
+                ('kasa', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ekstre_satirlari', to='kasa.kasa', verbose_name='Kasa')),
+                ('onaylayan', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL, verbose_name='Onaylayan')),
+                ('onerilen_hareket', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='ekstre_onerileri', to='kasa.kasahareket', verbose_name='Önerilen Hareket')),
+                ('ekstre', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='satirlar', to='kasa.hesapekstresi', verbose_name='Ekstre')),
+            ],
+            options={
+                'verbose_name': 'Ekstre Satırı',
+                'verbose_name_plural': 'Ekstre Satırları',
+                'ordering': ['tarih', 'id'],
+                'indexes': [models.Index(fields=['kasa', 'durum'], name='kasa_ekstre_kasa_id_e94455_idx')],
+            },
+        ),
+    ]
@@ -1,4 +1,5 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
 from django.conf import settings
 from django.utils import timezone
 from decimal import Decimal
@@ -18,6 +19,8 @@ class Kasa(models.Model):
     tip = models.CharField(max_length=20, choices=KASA_TIPLERI, verbose_name="Kasa Tipi")
     aciklama = models.TextField(blank=True, null=True, verbose_name="Açıklama")
     baslangic_bakiye = models.DecimalField(max_digits=15, decimal_places=2, default=0, verbose_name="Başlangıç Bakiyesi")
+    # Her harekette atomik olarak güncellenen bakiye (bkz. KasaHareket.save)
+    mevcut_bakiye = models.DecimalField(max_digits=15, decimal_places=2, default=0, editable=False, verbose_name="Mevcut Bakiye")
     aktif = models.BooleanField(default=True, verbose_name="Aktif")
     olusturma_tarihi = models.DateTimeField(auto_now_add=True, verbose_name="Oluşturma Tarihi")
     
@@ -29,23 +32,91 @@ class Kasa(models.Model):
     def __str__(self):
         return f"{self.ad} ({self.get_tip_display()})"
     
-    @property
-    def guncel_bakiye(self):
-        """Güncel kasa bakiyesini hesapla"""
-        toplam_giris = self.hareketler.filter(tip='giris').aggregate(
-            toplam=models.Sum('tutar')
-        )['toplam'] or Decimal('0')
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._kayitli_baslangic = instance.__dict__.get('baslangic_bakiye')
+        return instance
+    
+    def save(self, *args, **kwargs):
+        if self._state.adding:
+            self.mevcut_bakiye = self.baslangic_bakiye
+            super().save(*args, **kwargs)
+            self._kayitli_baslangic = self.baslangic_bakiye
+            return
         
-        toplam_cikis = self.hareketler.filter(tip='cikis').aggregate(
-            toplam=models.Sum('tutar')
-        )['toplam'] or Decimal('0')
+        # Bakiye sadece hareketlerle değişir; eski bir nesnenin kaydı
+        # güncel bakiyenin üzerine yazmasın
+        if kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.name != 'mevcut_bakiye'
+            ]
         
-        return self.baslangic_bakiye + toplam_giris - toplam_cikis
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            
+            # Başlangıç bakiyesi değiştiyse fark bakiyeye yansıtılır
+            kayitli = getattr(self, '_kayitli_baslangic', None)
+            if kayitli is not None and kayitli != self.baslangic_bakiye:
+                fark = Decimal(self.baslangic_bakiye) - Decimal(kayitli)
+                Kasa.objects.filter(pk=self.pk).update(mevcut_bakiye=F('mevcut_bakiye') + fark)
+                KasaKontrolNoktasi.objects.filter(kasa_id=self.pk).update(bakiye=F('bakiye') + fark)
+                self.mevcut_bakiye = Kasa.objects.filter(pk=self.pk).values_list('mevcut_bakiye', flat=True).get()
+            self._kayitli_baslangic = self.baslangic_bakiye
+    
+    @classmethod
+    def bakiye_uygula(cls, kasa_id, tutar, tarih):
+        """
+        Hareket etkisini kasa bakiyesine atomik olarak uygula, yeni bakiyeyi döndür.
+        
+        Hareket tarihinden sonra alınmış kontrol noktaları (geriye dönük kayıt)
+        da aynı tutar kadar düzeltilir. Çağıran işlem transaction içinde olmalıdır.
+        """
+        cls.objects.filter(pk=kasa_id).update(mevcut_bakiye=F('mevcut_bakiye') + tutar)
+        KasaKontrolNoktasi.objects.filter(kasa_id=kasa_id, tarih__gt=tarih).update(bakiye=F('bakiye') + tutar)
+        return cls.objects.filter(pk=kasa_id).values_list('mevcut_bakiye', flat=True).get()
+    
+    @property
+    def guncel_bakiye(self):
+        """Güncel kasa bakiyesi (saklanan değer)"""
+        return self.mevcut_bakiye
     
     def bakiye(self):
         """Güncel kasa bakiyesini hesapla - method versiyonu"""
         return self.guncel_bakiye
     
+    def hesaplanan_bakiye(self, an=None):
+        """Bakiyeyi tüm hareketlerden yeniden hesapla (denetim için)"""
+        hareketler = self.hareketler.all()
+        if an is not None:
+            hareketler = hareketler.filter(tarih__lt=an)
+        toplam = hareketler.aggregate(
+            giris=models.Sum('tutar', filter=models.Q(tip='giris')),
+            cikis=models.Sum('tutar', filter=models.Q(tip='cikis')),
+        )
+        return self.baslangic_bakiye + (toplam['giris'] or Decimal('0')) - (toplam['cikis'] or Decimal('0'))
+    
+    def bakiye_tarihinde(self, an):
+        """
+        `an` anından hemen önceki bakiye.
+        
+        En yakın kontrol noktasından başlayıp sadece sonraki hareketleri toplar.
+        """
+        nokta = self.kontrol_noktalari.filter(tarih__lte=an).order_by('-tarih').first()
+        hareketler = self.hareketler.filter(tarih__lt=an)
+        if nokta:
+            baslangic = nokta.bakiye
+            hareketler = hareketler.filter(tarih__gte=nokta.tarih)
+        else:
+            baslangic = self.baslangic_bakiye
+        
+        toplam = hareketler.aggregate(
+            giris=models.Sum('tutar', filter=models.Q(tip='giris')),
+            cikis=models.Sum('tutar', filter=models.Q(tip='cikis')),
+        )
+        return baslangic + (toplam['giris'] or Decimal('0')) - (toplam['cikis'] or Decimal('0'))
+    
     @property
     def bugunki_hareketler(self):
         """Bugünkü hareketleri getir"""
@@ -66,6 +137,7 @@ class KasaHareket(models.Model):
         ('virman', 'Virman'),
         ('cikis', 'Para Çıkışı'),
         ('giris', 'Para Girişi'),
+        ('tahsilat', 'Tahsilat'),
         ('duzeltme', 'Düzeltme'),
     ]
     
@@ -79,18 +151,139 @@ class KasaHareket(models.Model):
     satis_id = models.PositiveIntegerField(blank=True, null=True, verbose_name="Satış ID")
     gider_id = models.PositiveIntegerField(blank=True, null=True, verbose_name="Gider ID")
     virman_id = models.PositiveIntegerField(blank=True, null=True, verbose_name="Virman ID")
+    tahsilat_id = models.PositiveIntegerField(blank=True, null=True, verbose_name="Tahsilat ID")
     
     # Sistem bilgileri
     kullanici = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, verbose_name="Kullanıcı")
     tarih = models.DateTimeField(default=timezone.now, verbose_name="Tarih")
     
+    # Kayıt sırasına göre bu hareketten sonraki kasa bakiyesi
+    bakiye_sonrasi = models.DecimalField(max_digits=15, decimal_places=2, null=True, blank=True, editable=False, verbose_name="Hareket Sonrası Bakiye")
+    
     class Meta:
         verbose_name = "Kasa Hareketi"
         verbose_name_plural = "Kasa Hareketleri"
         ordering = ['-tarih']
+        indexes = [
+            models.Index(fields=['kasa', 'tarih']),
+        ]
     
     def __str__(self):
         return f"{self.kasa.ad} - {self.get_tip_display()} - {self.tutar}₺"
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if not instance.get_deferred_fields() & {'kasa_id', 'tip', 'tutar', 'tarih'}:
+            instance._bakiye_onceki = instance._bakiye_etkisi()
+        return instance
+    
+    def _bakiye_etkisi(self):
+        """(kasa_id, bakiyeye etkisi, tarih)"""
+        tutar = Decimal(self.tutar)
+        return (self.kasa_id, tutar if self.tip == 'giris' else -tutar, self.tarih)
+    
+    def save(self, *args, **kwargs):
+        eski = None
+        kasa_bakiyesi = None
+        with transaction.atomic():
+            yeni = self._bakiye_etkisi()
+            if self._state.adding:
+                self.bakiye_sonrasi = kasa_bakiyesi = Kasa.bakiye_uygula(*yeni)
+            else:
+                # bakiye_sonrasi kayıt anındaki bakiyedir, güncellemede değişmez
+                eski = getattr(self, '_bakiye_onceki', None)
+                if eski is None:
+                    eski = KasaHareket.objects.get(pk=self.pk)._bakiye_etkisi()
+                if eski != yeni:
+                    Kasa.bakiye_uygula(eski[0], -eski[1], eski[2])
+                    kasa_bakiyesi = Kasa.bakiye_uygula(*yeni)
+            super().save(*args, **kwargs)
+        self._bakiye_onceki = yeni
+        
+        # Bellekteki kasa nesnesi de güncel bakiyeyi göstersin
+        kasa = self._state.fields_cache.get('kasa')
+        if kasa is not None and kasa_bakiyesi is not None and kasa.pk == yeni[0]:
+            kasa.mevcut_bakiye = kasa_bakiyesi
+        
+        # Günlük rapordaki kasa hareketleri bu günü (tarih değiştiyse eski günü de) kapsıyor
+        from rapor.onbellek import rapor_gunlerini_gecersiz_kil
+        rapor_gunlerini_gecersiz_kil(eski[2] if eski else None, self.tarih)
+    
+    def delete(self, *args, **kwargs):
+        tarih = self.tarih
+        with transaction.atomic():
+            eski = getattr(self, '_bakiye_onceki', None) or self._bakiye_etkisi()
+            Kasa.bakiye_uygula(eski[0], -eski[1], eski[2])
+            sonuc = super().delete(*args, **kwargs)
+        
+        from rapor.onbellek import rapor_gunlerini_gecersiz_kil
+        rapor_gunlerini_gecersiz_kil(tarih)
+        return sonuc
+
+
+class KasaKontrolNoktasi(models.Model):
+    """
+    Periyodik kasa bakiye kontrol noktası.
+    
+    `bakiye`, `tarih` anından önceki tüm hareketlerin sonucudur; geçmiş bakiye
+    sorguları en yakın noktadan başlar. Oluşturulurken saklanan bakiye ile
+    hesaplanan bakiye arasındaki fark denetim için kaydedilir.
+    """
+    kasa = models.ForeignKey(Kasa, on_delete=models.CASCADE, related_name='kontrol_noktalari', verbose_name="Kasa")
+    tarih = models.DateTimeField(verbose_name="Tarih")
+    bakiye = models.DecimalField(max_digits=15, decimal_places=2, verbose_name="Bakiye")
+    kayitli_bakiye = models.DecimalField(max_digits=15, decimal_places=2, verbose_name="Kayıtlı Bakiye")
+    fark = models.DecimalField(max_digits=15, decimal_places=2, default=0, verbose_name="Fark")
+    olusturma_tarihi = models.DateTimeField(auto_now_add=True, verbose_name="Oluşturma Tarihi")
+    
+    class Meta:
+        verbose_name = "Kasa Kontrol Noktası"
+        verbose_name_plural = "Kasa Kontrol Noktaları"
+        ordering = ['-tarih']
+        indexes = [
+            models.Index(fields=['kasa', 'tarih']),
+        ]
+    
+    def __str__(self):
+        return f"{self.kasa.ad} - {self.tarih:%d.%m.%Y %H:%M} - {self.bakiye}₺"
+    
+    @classmethod
+    def olustur(cls, kasa, an=None, tam=False, duzelt=False):
+        """
+        Kasa için `an` anında kontrol noktası oluştur.
+        
+        Bakiye bir önceki noktadan itibaren hesaplanır (`tam` ise tüm
+        geçmişten). Saklanan kasa bakiyesi ile karşılaştırılır; `duzelt` ise
+        fark kasa bakiyesine yansıtılır.
+        """
+        an = an or timezone.now()
+        with transaction.atomic():
+            # Nokta oluşurken yeni hareket işlenmesin
+            kasa = Kasa.objects.select_for_update().get(pk=kasa.pk)
+            bakiye = kasa.hesaplanan_bakiye(an) if tam else kasa.bakiye_tarihinde(an)
+            bakiye = Decimal(bakiye).quantize(Decimal('0.01'))
+            
+            # Saklanan bakiye, `an` sonrasına tarihli hareketleri de içerir
+            sonraki = kasa.hareketler.filter(tarih__gte=an).aggregate(
+                giris=models.Sum('tutar', filter=models.Q(tip='giris')),
+                cikis=models.Sum('tutar', filter=models.Q(tip='cikis')),
+            )
+            beklenen = bakiye + (sonraki['giris'] or Decimal('0')) - (sonraki['cikis'] or Decimal('0'))
+            fark = kasa.mevcut_bakiye - beklenen
+            
+            nokta = cls.objects.create(
+                kasa=kasa,
+                tarih=an,
+                bakiye=bakiye,
+                kayitli_bakiye=kasa.mevcut_bakiye,
+                fark=fark,
+            )
+            
+            if duzelt and fark:
+                Kasa.objects.filter(pk=kasa.pk).update(mevcut_bakiye=F('mevcut_bakiye') - fark)
+        
+        return nokta
 
 
 class KasaVirman(models.Model):
@@ -111,29 +304,37 @@ class KasaVirman(models.Model):
         return f"{self.kaynak_kasa.ad} → {self.hedef_kasa.ad} ({self.tutar}₺)"
     
     def save(self, *args, **kwargs):
-        super().save(*args, **kwargs)
+        from .defter import kaydet
         
-        # Kaynak kasadan çıkış hareketi
-        KasaHareket.objects.create(
-            kasa=self.kaynak_kasa,
-            tip='cikis',
-            kaynak='virman',
-            tutar=self.tutar,
-            aciklama=f"Virman: {self.hedef_kasa.ad} kasasına",
-            virman_id=self.id,
-            kullanici=self.kullanici
-        )
-        
-        # Hedef kasaya giriş hareketi
-        KasaHareket.objects.create(
-            kasa=self.hedef_kasa,
-            tip='giris',
-            kaynak='virman',
-            tutar=self.tutar,
-            aciklama=f"Virman: {self.kaynak_kasa.ad} kasasından",
-            virman_id=self.id,
-            kullanici=self.kullanici
-        )
+        yeni = self._state.adding
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if not yeni:
+                return
+            
+            # Kaynak kasadan çıkış ve hedef kasaya giriş birlikte işlenir
+            kaydet([
+                KasaHareket(
+                    kasa=self.kaynak_kasa,
+                    tip='cikis',
+                    kaynak='virman',
+                    tutar=self.tutar,
+                    aciklama=f"Virman: {self.hedef_kasa.ad} kasasına",
+                    virman_id=self.id,
+                    kullanici=self.kullanici,
+                    tarih=self.tarih,
+                ),
+                KasaHareket(
+                    kasa=self.hedef_kasa,
+                    tip='giris',
+                    kaynak='virman',
+                    tutar=self.tutar,
+                    aciklama=f"Virman: {self.kaynak_kasa.ad} kasasından",
+                    virman_id=self.id,
+                    kullanici=self.kullanici,
+                    tarih=self.tarih,
+                ),
+            ])
 
 
 class KasaCikis(models.Model):
@@ -162,17 +363,24 @@ class KasaCikis(models.Model):
         return f"{self.kasa.ad} - {self.tutar}₺ ({self.get_sebep_display()})"
     
     def save(self, *args, **kwargs):
-        super().save(*args, **kwargs)
+        from .defter import kaydet
         
-        # Kasa hareket kaydı oluştur
-        KasaHareket.objects.create(
-            kasa=self.kasa,
-            tip='cikis',
-            kaynak='cikis',
-            tutar=self.tutar,
-            aciklama=f"{self.get_sebep_display()}: {self.aciklama}",
-            kullanici=self.kullanici
-        )
+        yeni = self._state.adding
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if not yeni:
+                return
+            
+            # Kasa hareket kaydı oluştur
+            kaydet([KasaHareket(
+                kasa=self.kasa,
+                tip='cikis',
+                kaynak='cikis',
+                tutar=self.tutar,
+                aciklama=f"{self.get_sebep_display()}: {self.aciklama}",
+                kullanici=self.kullanici,
+                tarih=self.tarih,
+            )])
 
 
 class KasaGiris(models.Model):
@@ -200,14 +408,79 @@ class KasaGiris(models.Model):
         return f"{self.kasa.ad} + {self.tutar}₺ ({self.get_sebep_display()})"
     
     def save(self, *args, **kwargs):
-        super().save(*args, **kwargs)
+        from .defter import kaydet
         
-        # Kasa hareket kaydı oluştur
-        KasaHareket.objects.create(
-            kasa=self.kasa,
-            tip='giris',
-            kaynak='giris',
-            tutar=self.tutar,
-            aciklama=f"{self.get_sebep_display()}: {self.aciklama}",
-            kullanici=self.kullanici
-        )
+        yeni = self._state.adding
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if not yeni:
+                return
+            
+            # Kasa hareket kaydı oluştur
+            kaydet([KasaHareket(
+                kasa=self.kasa,
+                tip='giris',
+                kaynak='giris',
+                tutar=self.tutar,
+                aciklama=f"{self.get_sebep_display()}: {self.aciklama}",
+                kullanici=self.kullanici,
+                tarih=self.tarih,
+            )])
+
+
+class HesapEkstresi(models.Model):
+    """Banka / POS ekstresi yüklemesi (mutabakat için)"""
+    kasa = models.ForeignKey(Kasa, on_delete=models.CASCADE, related_name='ekstreler', verbose_name="Kasa")
+    dosya_adi = models.CharField(max_length=255, verbose_name="Dosya Adı")
+    baslangic_tarihi = models.DateField(null=True, blank=True, verbose_name="Başlangıç Tarihi")
+    bitis_tarihi = models.DateField(null=True, blank=True, verbose_name="Bitiş Tarihi")
+    satir_sayisi = models.PositiveIntegerField(default=0, verbose_name="Satır Sayısı")
+    yukleyen = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, verbose_name="Yükleyen")
+    yukleme_tarihi = models.DateTimeField(auto_now_add=True, verbose_name="Yükleme Tarihi")
+    
+    class Meta:
+        verbose_name = "Hesap Ekstresi"
+        verbose_name_plural = "Hesap Ekstreleri"
+        ordering = ['-yukleme_tarihi']
+    
+    def __str__(self):
+        return f"{self.kasa.ad} - {self.dosya_adi}"
+
+
+class EkstreSatiri(models.Model):
+    """Ekstre satırı - kasa hareketiyle eşleştirilmeyi bekler"""
+    DURUMLAR = [
+        ('bekliyor', 'Bekliyor'),
+        ('onerildi', 'Eşleşme Önerildi'),
+        ('eslesti', 'Eşleşti'),
+        ('yok_sayildi', 'Yok Sayıldı'),
+    ]
+    
+    ekstre = models.ForeignKey(HesapEkstresi, on_delete=models.CASCADE, related_name='satirlar', verbose_name="Ekstre")
+    kasa = models.ForeignKey(Kasa, on_delete=models.CASCADE, related_name='ekstre_satirlari', verbose_name="Kasa")
+    tarih = models.DateField(verbose_name="Tarih")
+    tip = models.CharField(max_length=10, choices=KasaHareket.HAREKET_TIPLERI, verbose_name="Hareket Tipi")
+    tutar = models.DecimalField(max_digits=15, decimal_places=2, verbose_name="Tutar")
+    aciklama = models.CharField(max_length=255, blank=True, verbose_name="Açıklama")
+    referans = models.CharField(max_length=100, blank=True, verbose_name="Referans")
+    
+    durum = models.CharField(max_length=20, choices=DURUMLAR, default='bekliyor', verbose_name="Durum")
+    onerilen_hareket = models.ForeignKey(KasaHareket, on_delete=models.SET_NULL, null=True, blank=True, related_name='ekstre_onerileri', verbose_name="Önerilen Hareket")
+    # Bir kasa hareketi en fazla bir ekstre satırıyla eşleşebilir
+    eslesen_hareket = models.OneToOneField(KasaHareket, on_delete=models.SET_NULL, null=True, blank=True, related_name='ekstre_satiri', verbose_name="Eşleşen Hareket")
+    # Hareket tutarı - ekstre tutarı (POS komisyonu) ve valör gün farkı
+    tutar_farki = models.DecimalField(max_digits=15, decimal_places=2, default=0, verbose_name="Tutar Farkı")
+    gun_farki = models.SmallIntegerField(default=0, verbose_name="Gün Farkı")
+    onaylayan = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, verbose_name="Onaylayan")
+    onay_tarihi = models.DateTimeField(null=True, blank=True, verbose_name="Onay Tarihi")
+    
+    class Meta:
+        verbose_name = "Ekstre Satırı"
+        verbose_name_plural = "Ekstre Satırları"
+        ordering = ['tarih', 'id']
+        indexes = [
+            models.Index(fields=['kasa', 'durum']),
+        ]
+    
+    def __str__(self):
+        return f"{self.tarih} - {self.get_tip_display()} - {self.tutar}₺"
@@ -0,0 +1,348 @@
+"""
+Banka / POS ekstresi mutabakatı.
+
+Ekstre dosyası (CSV veya MT940) EkstreSatiri tablosuna yüklenir, satırlar
+kasa hareketleriyle eşleştirilir ve öneriler toplu olarak onaylanır.
+
+Eşleştirme hareketleri (gün, tip, tutar) anahtarlı bir sözlükte toplar; her
+ekstre satırı için sadece valör toleransı kadar gün aranır. POS hesaplarında
+bankaya komisyon düşülmüş tutar geçtiği için ikinci turda gün bazında
+sıralı tutar listelerinde ikili arama yapılır. Toplam maliyet satır ve
+hareket sayısıyla neredeyse doğrusal artar.
+"""
+import csv
+import io
+import re
+from bisect import bisect_left
+from collections import defaultdict
+from datetime import datetime, timedelta
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import EkstreSatiri, HesapEkstresi, KasaHareket
+
+
+# Ekstre tarihi, kasa hareketinden en fazla bu kadar gün sonra olabilir
+GUN_TOLERANSI = 3
+
+# Kasa tipine göre ekstre tutarının hareketten düşük olabileceği oran
+# (POS gün sonu aktarımlarında banka komisyonu kesilir)
+KOMISYON_ORANLARI = {
+    'pos': Decimal('0.05'),
+}
+
+TARIH_BICIMLERI = ('%d.%m.%Y', '%d/%m/%Y', '%Y-%m-%d', '%d-%m-%Y', '%d.%m.%y')
+
+# CSV başlık adları (küçük harf, Türkçe karakterler sadeleştirilmiş)
+CSV_SUTUNLARI = {
+    'tarih': ('tarih', 'islem tarihi', 'valor', 'valor tarihi', 'date'),
+    'tutar': ('tutar', 'islem tutari', 'amount'),
+    'borc': ('borc', 'cikan', 'debit'),
+    'alacak': ('alacak', 'giren', 'credit'),
+    'aciklama': ('aciklama', 'islem aciklamasi', 'description'),
+    'referans': ('referans', 'referans no', 'dekont no', 'reference'),
+}
+
+MT940_SATIR = re.compile(r'^:61:(\d{6})(\d{4})?(R?[CD])[A-Z]?([\d,.]+)(.*)$')
+
+
+def _sade(metin):
+    return (metin or '').strip().lower().translate(str.maketrans('çğıöşüİ', 'cgiosui'))
+
+
+def _sayi(deger):
+    """'1.234,56' / '1,234.56' / '-12,5' biçimlerini Decimal'e çevir"""
+    deger = re.sub(r'[^\d,.\-+]', '', deger or '')
+    if ',' in deger and '.' in deger:
+        if deger.rfind(',') > deger.rfind('.'):
+            deger = deger.replace('.', '').replace(',', '.')
+        else:
+            deger = deger.replace(',', '')
+    elif ',' in deger:
+        deger = deger.replace(',', '.')
+    elif deger.count('.') > 1:
+        deger = deger.replace('.', '')
+    try:
+        return Decimal(deger)
+    except InvalidOperation:
+        raise ValueError(f'Geçersiz tutar: {deger}')
+
+
+def _tarih(deger):
+    deger = (deger or '').strip().split(' ')[0]
+    for bicim in TARIH_BICIMLERI:
+        try:
+            return datetime.strptime(deger, bicim).date()
+        except ValueError:
+            continue
+    raise ValueError(f'Geçersiz tarih: {deger}')
+
+
+def dosya_coz(veri):
+    """Yüklenen dosyanın içeriğini metne çevir (UTF-8, yoksa Windows-1254)"""
+    try:
+        return veri.decode('utf-8-sig')
+    except UnicodeDecodeError:
+        return veri.decode('cp1254')
+
+
+class _NoktaliVirgul(csv.excel):
+    # Yerel banka ekstrelerinde yaygın ayraç
+    delimiter = ';'
+
+
+def _csv_oku(metin):
+    ornek = metin[:4096]
+    try:
+        lehce = csv.Sniffer().sniff(ornek, delimiters=';,\t|')
+    except csv.Error:
+        lehce = _NoktaliVirgul
+    satirlar = [satir for satir in csv.reader(io.StringIO(metin), lehce) if any(h.strip() for h in satir)]
+    if not satirlar:
+        return []
+
+    # Başlık satırı varsa sütunları adlarından bul, yoksa varsayılan sıra
+    basliklar = [_sade(h) for h in satirlar[0]]
+    sutunlar = {}
+    for alan, adlar in CSV_SUTUNLARI.items():
+        for sira, baslik in enumerate(basliklar):
+            if baslik in adlar:
+                sutunlar[alan] = sira
+                break
+    if 'tarih' in sutunlar:
+        satirlar = satirlar[1:]
+    else:
+        sutunlar = {'tarih': 0, 'tutar': 1, 'aciklama': 2, 'referans': 3}
+
+    def hucre(satir, alan):
+        sira = sutunlar.get(alan)
+        return satir[sira].strip() if sira is not None and sira < len(satir) else ''
+
+    sonuc = []
+    for no, satir in enumerate(satirlar, start=1):
+        try:
+            if 'tutar' in sutunlar:
+                tutar = _sayi(hucre(satir, 'tutar'))
+            else:
+                tutar = _sayi(hucre(satir, 'alacak') or '0') - _sayi(hucre(satir, 'borc') or '0')
+            if not tutar:
+                continue
+            sonuc.append({
+                'tarih': _tarih(hucre(satir, 'tarih')),
+                'tip': 'giris' if tutar > 0 else 'cikis',
+                'tutar': abs(tutar),
+                'aciklama': hucre(satir, 'aciklama')[:255],
+                'referans': hucre(satir, 'referans')[:100],
+            })
+        except ValueError as e:
+            raise ValueError(f'{no}. satır okunamadı: {e}')
+    return sonuc
+
+
+def _mt940_oku(metin):
+    sonuc = []
+    son = None
+    for satir in metin.splitlines():
+        satir = satir.strip()
+        eslesme = MT940_SATIR.match(satir)
+        if eslesme:
+            tarih, _, isaret, tutar, kalan = eslesme.groups()
+            # RC: alacak iptali (çıkış), RD: borç iptali (giriş)
+            giris = isaret in ('C', 'RD')
+            son = {
+                'tarih': datetime.strptime(tarih, '%y%m%d').date(),
+                'tip': 'giris' if giris else 'cikis',
+                'tutar': _sayi(tutar),
+                'aciklama': '',
+                'referans': kalan[4:].split('//')[0].strip()[:100],
+            }
+            sonuc.append(son)
+        elif satir.startswith(':86:') and son is not None:
+            son['aciklama'] = satir[4:][:255]
+        elif satir.startswith(':'):
+            son = None
+        elif son is not None and son['aciklama']:
+            # :86: alanı birden fazla satıra yayılabilir
+            son['aciklama'] = f"{son['aciklama']} {satir}"[:255]
+    return sonuc
+
+
+def ekstre_oku(metin):
+    """Ekstre metnini [{tarih, tip, tutar, aciklama, referans}] listesine çevir"""
+    if re.search(r'^:61:', metin, re.M):
+        return _mt940_oku(metin)
+    return _csv_oku(metin)
+
+
+def ekstre_yukle(kasa, dosya_adi, metin, kullanici=None):
+    """
+    Ekstreyi oku ve satırlarını kaydet.
+
+    Aynı kasaya daha önce yüklenmiş, referans numarası dolu satırlar
+    (tarih, tip, tutar, referans aynıysa) tekrar eklenmez.
+    """
+    okunan = ekstre_oku(metin)
+    if not okunan:
+        raise ValueError('Ekstrede işlem satırı bulunamadı!')
+
+    ilk = min(satir['tarih'] for satir in okunan)
+    son = max(satir['tarih'] for satir in okunan)
+    mevcut = set(
+        EkstreSatiri.objects.filter(kasa=kasa, tarih__gte=ilk, tarih__lte=son).exclude(referans='')
+        .values_list('tarih', 'tip', 'tutar', 'referans')
+    )
+    yeni = [
+        satir for satir in okunan
+        if not satir['referans'] or (satir['tarih'], satir['tip'], satir['tutar'], satir['referans']) not in mevcut
+    ]
+
+    with transaction.atomic():
+        ekstre = HesapEkstresi.objects.create(
+            kasa=kasa,
+            dosya_adi=dosya_adi[:255],
+            baslangic_tarihi=ilk,
+            bitis_tarihi=son,
+            satir_sayisi=len(yeni),
+            yukleyen=kullanici,
+        )
+        EkstreSatiri.objects.bulk_create(
+            [EkstreSatiri(ekstre=ekstre, kasa=kasa, **satir) for satir in yeni],
+            batch_size=1000,
+        )
+    return ekstre, len(okunan) - len(yeni)
+
+
+def eslestir(kasa, gun_toleransi=GUN_TOLERANSI, komisyon_orani=None):
+    """
+    Kasanın bekleyen ekstre satırları için eşleşme öner, önerilen sayıyı döndür.
+
+    Önce aynı tutarlı hareket, bulunamazsa komisyon oranı içinde kalan en
+    yakın tutarlı hareket aranır; her ikisinde de valör farkı en az olan
+    gün tercih edilir. Eşleşmiş ya da başka satıra önerilmiş hareketler
+    kullanılmaz.
+    """
+    if komisyon_orani is None:
+        komisyon_orani = KOMISYON_ORANLARI.get(kasa.tip, Decimal('0'))
+
+    satirlar = list(EkstreSatiri.objects.filter(kasa=kasa, durum='bekliyor'))
+    if not satirlar:
+        return 0
+
+    # Sadece ekstre dönemini (valör toleransı dahil) kapsayan hareketler
+    from rapor.gun_sonu import gun_araligi
+    baslangic, _ = gun_araligi(min(satir.tarih for satir in satirlar) - timedelta(days=gun_toleransi))
+    _, bitis = gun_araligi(max(satir.tarih for satir in satirlar))
+    hareketler = KasaHareket.objects.filter(
+        kasa=kasa, tarih__gte=baslangic, tarih__lt=bitis, ekstre_satiri__isnull=True,
+    ).exclude(
+        ekstre_onerileri__durum='onerildi',
+    ).order_by('tarih', 'id').values_list('id', 'tip', 'tutar', 'tarih')
+
+    # (gün, tip, tutar) -> hareketler ve (gün, tip) -> sıralı (tutar, id)
+    tam_dizin = defaultdict(list)
+    tutar_dizini = defaultdict(list)
+    tutarlar = {}
+    for hareket_id, tip, tutar, tarih in hareketler:
+        gun = timezone.localtime(tarih).date()
+        tam_dizin[(gun, tip, tutar)].append(hareket_id)
+        tutar_dizini[(gun, tip)].append((tutar, hareket_id))
+        tutarlar[hareket_id] = tutar
+    for liste in tutar_dizini.values():
+        liste.sort()
+
+    kullanilan = set()
+    gecikmeler = range(gun_toleransi + 1)
+
+    def oner(satir, hareket_id, gecikme):
+        kullanilan.add(hareket_id)
+        satir.onerilen_hareket_id = hareket_id
+        satir.durum = 'onerildi'
+        satir.tutar_farki = tutarlar[hareket_id] - satir.tutar
+        satir.gun_farki = gecikme
+
+    # 1. tur: tutarı birebir tutan hareketler
+    kalan = []
+    for satir in satirlar:
+        for gecikme in gecikmeler:
+            adaylar = tam_dizin.get((satir.tarih - timedelta(days=gecikme), satir.tip, satir.tutar), ())
+            hareket_id = next((aday for aday in adaylar if aday not in kullanilan), None)
+            if hareket_id is not None:
+                oner(satir, hareket_id, gecikme)
+                break
+        else:
+            kalan.append(satir)
+
+    # 2. tur: komisyon düşülmüş girişler (hareket tutarı >= ekstre tutarı)
+    if komisyon_orani > 0:
+        for satir in kalan:
+            if satir.tip != 'giris':
+                continue
+            ust_sinir = satir.tutar / (1 - komisyon_orani)
+            for gecikme in gecikmeler:
+                liste = tutar_dizini.get((satir.tarih - timedelta(days=gecikme), 'giris'), ())
+                sira = bisect_left(liste, (satir.tutar, 0))
+                hareket_id = None
+                while sira < len(liste) and liste[sira][0] <= ust_sinir:
+                    if liste[sira][1] not in kullanilan:
+                        hareket_id = liste[sira][1]
+                        break
+                    sira += 1
+                if hareket_id is not None:
+                    oner(satir, hareket_id, gecikme)
+                    break
+
+    onerilenler = [satir for satir in satirlar if satir.durum == 'onerildi']
+    EkstreSatiri.objects.bulk_update(
+        onerilenler, ['onerilen_hareket', 'durum', 'tutar_farki', 'gun_farki'], batch_size=500
+    )
+    return len(onerilenler)
+
+
+def eslesmeleri_onayla(satir_idleri, kullanici=None):
+    """Önerilen eşleşmeleri toplu onayla, onaylanan satır sayısını döndür"""
+    with transaction.atomic():
+        satirlar = list(
+            EkstreSatiri.objects.select_for_update()
+            .filter(pk__in=satir_idleri, durum='onerildi', onerilen_hareket__isnull=False)
+            .order_by('pk')
+        )
+        # Bu arada başka satırla eşleşmiş hareketlerin önerisi geri alınır;
+        # aynı hareket bu partide birden fazla satıra önerilmişse (eşzamanlı
+        # eslestir çalışmaları) ilk satır onaylanır
+        dolu = set(
+            EkstreSatiri.objects.filter(eslesen_hareket_id__in=[satir.onerilen_hareket_id for satir in satirlar])
+            .values_list('eslesen_hareket_id', flat=True)
+        )
+        simdi = timezone.now()
+        onaylanan = 0
+        for satir in satirlar:
+            if satir.onerilen_hareket_id in dolu:
+                satir.durum = 'bekliyor'
+                satir.onerilen_hareket = None
+                continue
+            satir.eslesen_hareket_id = satir.onerilen_hareket_id
+            satir.durum = 'eslesti'
+            satir.onaylayan = kullanici
+            satir.onay_tarihi = simdi
+            dolu.add(satir.eslesen_hareket_id)
+            onaylanan += 1
+        EkstreSatiri.objects.bulk_update(
+            satirlar, ['eslesen_hareket', 'onerilen_hareket', 'durum', 'onaylayan', 'onay_tarihi'], batch_size=500
+        )
+    return onaylanan
+
+
+def onerileri_reddet(satir_idleri):
+    """Önerileri geri al; satırlar tekrar eşleşme bekler"""
+    return EkstreSatiri.objects.filter(pk__in=satir_idleri, durum='onerildi').update(
+        durum='bekliyor', onerilen_hareket=None, tutar_farki=0, gun_farki=0
+    )
+
+
+def satirlari_yok_say(satir_idleri):
+    """Kasada karşılığı olmayan satırları (masraf, faiz vb.) kapat"""
+    return EkstreSatiri.objects.filter(pk__in=satir_idleri, durum__in=['bekliyor', 'onerildi']).update(
+        durum='yok_sayildi', onerilen_hareket=None
+    )
@@ -9,5 +9,7 @@ urlpatterns = [
     path('virman/', views.virman_yap, name='virman'),
     path('para-cikisi/', views.para_cikisi, name='para_cikisi'),
     path('para-girisi/', views.para_girisi, name='para_girisi'),
+    path('mutabakat/', views.mutabakat, name='mutabakat'),
+    path('mutabakat/<int:ekstre_id>/', views.mutabakat_detay, name='mutabakat_detay'),
     path('bakiye-ajax/', views.kasa_bakiye_ajax, name='bakiye_ajax'),
 ]
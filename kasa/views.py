@@ -6,6 +6,8 @@ from django.db.models import Sum, Q
 from django.utils import timezone
 from datetime import datetime, timedelta
 from .models import Kasa, KasaHareket, KasaVirman, KasaCikis, KasaGiris
+from .defter import YetersizBakiye
+from rapor.gun_sonu import gun_araligi, kasa_hareket_toplamlari
 from decimal import Decimal
 import json
 
@@ -13,21 +15,14 @@ import json
 @login_required
 def kasa_dashboard(request):
     """Kasa ana sayfası"""
-    kasalar = Kasa.objects.filter(aktif=True).order_by('tip', 'ad')
+    # Bugünkü giriş/çıkışlar tek gruplu sorguda; bakiyeler kasada saklanır
+    baslangic, bitis = gun_araligi(timezone.localdate())
+    kasalar = list(Kasa.objects.filter(aktif=True).order_by('tip', 'ad'))
+    bugun = kasa_hareket_toplamlari([kasa.id for kasa in kasalar], baslangic, bitis)
     
-    # Her kasa için güncel bakiye ve bugünkü hareketleri hesapla
     kasa_bilgileri = []
     for kasa in kasalar:
-        bugun = timezone.now().date()
-        bugunki_giris = kasa.hareketler.filter(
-            tip='giris', 
-            tarih__date=bugun
-        ).aggregate(toplam=Sum('tutar'))['toplam'] or Decimal('0')
-        
-        bugunki_cikis = kasa.hareketler.filter(
-            tip='cikis', 
-            tarih__date=bugun
-        ).aggregate(toplam=Sum('tutar'))['toplam'] or Decimal('0')
+        bugunki_giris, bugunki_cikis = bugun[kasa.id]
         
         kasa_bilgileri.append({
             'kasa': kasa,
@@ -120,19 +115,19 @@ def virman_yap(request):
             kaynak_kasa = Kasa.objects.get(id=kaynak_kasa_id, aktif=True)
             hedef_kasa = Kasa.objects.get(id=hedef_kasa_id, aktif=True)
             
-            if kaynak_kasa.guncel_bakiye < tutar:
-                messages.error(request, f'{kaynak_kasa.ad} kasasında yeterli bakiye yok!')
+            # Virman oluştur (bakiye kontrolü kasalar kilitliyken yapılır)
+            try:
+                virman = KasaVirman.objects.create(
+                    kaynak_kasa=kaynak_kasa,
+                    hedef_kasa=hedef_kasa,
+                    tutar=tutar,
+                    aciklama=aciklama,
+                    kullanici=request.user
+                )
+            except YetersizBakiye as e:
+                messages.error(request, str(e))
                 return redirect('kasa:virman')
             
-            # Virman oluştur
-            virman = KasaVirman.objects.create(
-                kaynak_kasa=kaynak_kasa,
-                hedef_kasa=hedef_kasa,
-                tutar=tutar,
-                aciklama=aciklama,
-                kullanici=request.user
-            )
-            
             messages.success(request, f'{tutar}₺ {kaynak_kasa.ad} kasasından {hedef_kasa.ad} kasasına aktarıldı.')
             return redirect('kasa:dashboard')
             
@@ -155,19 +150,19 @@ def para_cikisi(request):
             
             kasa = Kasa.objects.get(id=kasa_id, aktif=True)
             
-            if kasa.guncel_bakiye < tutar:
-                messages.error(request, f'{kasa.ad} kasasında yeterli bakiye yok!')
+            # Para çıkışı oluştur (bakiye kontrolü kasa kilitliyken yapılır)
+            try:
+                cikis = KasaCikis.objects.create(
+                    kasa=kasa,
+                    tutar=tutar,
+                    sebep=sebep,
+                    aciklama=aciklama,
+                    kullanici=request.user
+                )
+            except YetersizBakiye as e:
+                messages.error(request, str(e))
                 return redirect('kasa:para_cikisi')
             
-            # Para çıkışı oluştur
-            cikis = KasaCikis.objects.create(
-                kasa=kasa,
-                tutar=tutar,
-                sebep=sebep,
-                aciklama=aciklama,
-                kullanici=request.user
-            )
-            
             messages.success(request, f'{tutar}₺ {kasa.ad} kasasından çıkarıldı.')
             return redirect('kasa:dashboard')
             
@@ -225,3 +220,93 @@ def kasa_bakiye_ajax(request):
             pass
     
     return JsonResponse({'success': False})
+
+
+@login_required
+def mutabakat(request):
+    """Banka/POS ekstresi yükleme ve ekstre listesi"""
+    from django.db.models import Count
+    from .models import HesapEkstresi
+    from .mutabakat import dosya_coz, ekstre_yukle, eslestir
+    
+    if request.method == 'POST':
+        try:
+            kasa = Kasa.objects.get(id=request.POST.get('kasa'), tip__in=['banka', 'pos'], aktif=True)
+            dosya = request.FILES.get('dosya')
+            if not dosya:
+                messages.error(request, 'Ekstre dosyası seçmelisiniz!')
+                return redirect('kasa:mutabakat')
+            
+            ekstre, atlanan = ekstre_yukle(kasa, dosya.name, dosya_coz(dosya.read()), request.user)
+            onerilen = eslestir(kasa)
+            
+            mesaj = f'{ekstre.satir_sayisi} satır yüklendi, {onerilen} eşleşme önerildi.'
+            if atlanan:
+                mesaj += f' Daha önce yüklenmiş {atlanan} satır atlandı.'
+            messages.success(request, mesaj)
+            return redirect('kasa:mutabakat_detay', ekstre_id=ekstre.id)
+            
+        except Kasa.DoesNotExist:
+            messages.error(request, 'Geçerli bir banka veya POS kasası seçmelisiniz!')
+        except ValueError as e:
+            messages.error(request, f'Ekstre okunamadı: {str(e)}')
+    
+    ekstreler = HesapEkstresi.objects.select_related('kasa', 'yukleyen').annotate(
+        eslesen=Count('satirlar', filter=Q(satirlar__durum='eslesti')),
+        onerilen=Count('satirlar', filter=Q(satirlar__durum='onerildi')),
+        bekleyen=Count('satirlar', filter=Q(satirlar__durum='bekliyor')),
+    )[:50]
+    
+    context = {
+        'ekstreler': ekstreler,
+        'kasalar': Kasa.objects.filter(tip__in=['banka', 'pos'], aktif=True).order_by('tip', 'ad'),
+    }
+    return render(request, 'kasa/mutabakat.html', context)
+
+
+@login_required
+def mutabakat_detay(request, ekstre_id):
+    """Ekstre satırları, eşleşme önerileri ve toplu onay"""
+    from django.core.paginator import Paginator
+    from django.db.models import Count
+    from .models import EkstreSatiri, HesapEkstresi
+    from .mutabakat import eslestir, eslesmeleri_onayla, onerileri_reddet, satirlari_yok_say
+    
+    ekstre = get_object_or_404(HesapEkstresi.objects.select_related('kasa'), id=ekstre_id)
+    
+    if request.method == 'POST':
+        islem = request.POST.get('islem')
+        secilenler = request.POST.getlist('satirlar')
+        if islem == 'tumunu_onayla':
+            islem = 'onayla'
+            secilenler = list(ekstre.satirlar.filter(durum='onerildi').values_list('id', flat=True))
+        else:
+            secilenler = list(ekstre.satirlar.filter(id__in=secilenler).values_list('id', flat=True))
+        
+        if islem == 'eslestir':
+            messages.success(request, f'{eslestir(ekstre.kasa)} eşleşme önerildi.')
+        elif islem == 'onayla':
+            messages.success(request, f'{eslesmeleri_onayla(secilenler, request.user)} eşleşme onaylandı.')
+        elif islem == 'reddet':
+            messages.success(request, f'{onerileri_reddet(secilenler)} öneri geri alındı.')
+        elif islem == 'yok_say':
+            messages.success(request, f'{satirlari_yok_say(secilenler)} satır yok sayıldı.')
+        return redirect(f"{request.path}?durum={request.POST.get('durum', '')}")
+    
+    durum = request.GET.get('durum', '')
+    satirlar = ekstre.satirlar.select_related('onerilen_hareket', 'eslesen_hareket')
+    if durum:
+        satirlar = satirlar.filter(durum=durum)
+    
+    ozet = dict(ekstre.satirlar.values_list('durum').annotate(adet=Count('id')).values_list('durum', 'adet'))
+    
+    page_obj = Paginator(satirlar, 100).get_page(request.GET.get('page'))
+    
+    context = {
+        'ekstre': ekstre,
+        'page_obj': page_obj,
+        'durum': durum,
+        'durumlar': EkstreSatiri.DURUMLAR,
+        'ozet': ozet,
+    }
+    return render(request, 'kasa/mutabakat_detay.html', context)
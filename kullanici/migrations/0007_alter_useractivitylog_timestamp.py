@@ -0,0 +1,19 @@
+# Generated by Django 5.2.5 on 2026-10-19 13:45
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kullanici', '0006_remove_userprofile_allowed_menus_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='useractivitylog',
+            name='timestamp',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False, verbose_name='Zaman'),
+        ),
+    ]
@@ -1,6 +1,7 @@
 from django.db import models
 from django.contrib.auth.models import AbstractUser, Group, Permission
 from django.core.validators import RegexValidator
+from django.utils import timezone
 
 
 class CustomUser(AbstractUser):
@@ -194,7 +195,8 @@ class UserActivityLog(models.Model):
         verbose_name='IP Adresi'
     )
     timestamp = models.DateTimeField(
-        auto_now_add=True,
+        default=timezone.now,
+        editable=False,
         verbose_name='Zaman'
     )
     
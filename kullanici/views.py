@@ -38,17 +38,19 @@ def get_client_ip(request):
 
 
 def log_user_activity(user, action, content_type='', object_id=None, description='', request=None):
-    """Kullanıcı aktivitesini logla"""
+    """Kullanıcı aktivitesini logla (log.yazici kuyruğu üzerinden toplu yazılır)"""
+    from log.yazici import kaydet
+
     ip_address = get_client_ip(request) if request else '127.0.0.1'
     
-    UserActivityLog.objects.create(
+    kaydet(UserActivityLog(
         user=user,
         action=action,
         content_type=content_type,
         object_id=object_id,
         description=description,
         ip_address=ip_address
-    )
+    ))
 
 
 from django.views.decorators.csrf import csrf_protect
@@ -0,0 +1,215 @@
+"""
+Log saklama ve arşivleme.
+
+Süresi dolan log kayıtları birincil anahtar sırasıyla LOG_TEMIZLEME_PARCA
+kayıtlık parçalar halinde silinir; her parça kendi kısa transaction'ında
+işlendiği için büyük tablolarda SQLite uzun süre kilitlenmez. Silinmeden
+önce kayıtlar aylık, gzip sıkıştırılmış JSONL dosyalarına yazılır. Her
+temizleme çalışması kendi dosyalarını yazar:
+
+    LOG_ARSIV_DIZINI/<tür>/<YYYY-AA>.<çalışma>.jsonl.gz
+
+Her parça önce geçici adla tam bir gzip dosyası olarak yazılıp kapatılır,
+diske aktarılır ve os.replace ile yerine taşınır; parça ancak bundan sonra
+silinir. Çalışma sonunda parça dosyaları ay başına tek dosyada birleştirilir.
+Yarıda kalan bir çalışma en fazla birleştirilmemiş parçalar ya da aynı
+kaydın iki kopyasını bırakır; `arsivde_ara` aynı id'yi bir kez döndürür,
+okunamayan dosyaları atlar.
+
+Arşiv veritabanı olmadan okunabilir: `arsivde_ara` ve log_arsiv_ara komutu.
+"""
+import gzip
+import json
+import logging
+import os
+import re
+import secrets
+import shutil
+import zlib
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+
+
+logger = logging.getLogger(__name__)
+
+# <YYYY-AA>[.<çalışma>].jsonl.gz
+ARSIV_DOSYASI = re.compile(r'^(\d{4}-\d{2})(?:\.[\w-]+)?\.jsonl\.gz$')
+
+# Tür -> (model yolu, tarih alanı, ek filtre)
+LOG_TURLERI = {
+    'aktivite': ('log.AktiviteLog', 'tarih', {}),
+    'hata': ('log.SistemHatasi', 'tarih', {'cozuldu': True}),
+    'login': ('log.LoginLog', 'giris_tarihi', {}),
+}
+
+
+def arsiv_dizini(tur):
+    kok = getattr(settings, 'LOG_ARSIV_DIZINI', os.path.join(settings.BASE_DIR, 'log_arsivi'))
+    return os.path.join(kok, tur)
+
+
+def _model(tur):
+    from django.apps import apps
+    return apps.get_model(LOG_TURLERI[tur][0])
+
+
+def saklama_siniri(gun_sayisi):
+    """`gun_sayisi` gün önceki günün başlangıcı; bundan eski kayıtlar silinir"""
+    gun = timezone.localdate() - timedelta(days=gun_sayisi)
+    return timezone.make_aware(datetime.combine(gun, time.min))
+
+
+def _kalici_yaz(yol, yaz):
+    """`yaz(dosya)` ile geçici dosyaya yaz, diske aktar ve `yol` adına taşı"""
+    gecici = f'{yol}.tmp'
+    with open(gecici, 'wb') as dosya:
+        yaz(dosya)
+        dosya.flush()
+        os.fsync(dosya.fileno())
+    os.replace(gecici, yol)
+    try:
+        dizin = os.open(os.path.dirname(yol), os.O_RDONLY)
+    except OSError:
+        # Windows'ta dizin açılamaz
+        return
+    try:
+        os.fsync(dizin)
+    finally:
+        os.close(dizin)
+
+
+class _CalismaArsivi:
+    """Bir temizleme çalışmasının arşiv dosyaları"""
+
+    def __init__(self, tur):
+        self.dizin = arsiv_dizini(tur)
+        self.calisma = f"{timezone.localtime().strftime('%Y%m%d%H%M%S')}-{secrets.token_hex(3)}"
+        self.parcalar = defaultdict(list)
+
+    def parca_yaz(self, aylar):
+        """{ay: [satır]} parçasını ay başına tam bir gzip dosyası olarak yaz"""
+        os.makedirs(self.dizin, exist_ok=True)
+        for ay, satirlar in aylar.items():
+            yol = os.path.join(self.dizin, f'{ay}.{self.calisma}-{len(self.parcalar[ay]):05d}.jsonl.gz')
+
+            def yaz(dosya, satirlar=satirlar):
+                with gzip.GzipFile(fileobj=dosya, mode='wb') as gz:
+                    for satir in satirlar:
+                        gz.write(json.dumps(satir, cls=DjangoJSONEncoder, ensure_ascii=False).encode('utf-8'))
+                        gz.write(b'\n')
+
+            _kalici_yaz(yol, yaz)
+            self.parcalar[ay].append(yol)
+
+    def birlestir(self):
+        """Parça dosyalarını ay başına tek dosyada topla (gzip üyeleri art arda eklenir)"""
+        for ay, yollar in self.parcalar.items():
+            hedef = os.path.join(self.dizin, f'{ay}.{self.calisma}.jsonl.gz')
+            if len(yollar) == 1:
+                os.replace(yollar[0], hedef)
+                continue
+
+            def yaz(dosya, yollar=yollar):
+                for yol in yollar:
+                    with open(yol, 'rb') as parca:
+                        shutil.copyfileobj(parca, dosya)
+
+            _kalici_yaz(hedef, yaz)
+            for yol in yollar:
+                os.remove(yol)
+        self.parcalar = defaultdict(list)
+
+
+def eski_loglari_temizle(tur, sinir, arsivle=True, parca=None):
+    """
+    `tur` loglarından `sinir` anından eski olanları (arşivleyip) parça parça
+    sil; silinen kayıt sayısını döndürür.
+    """
+    model = _model(tur)
+    _, tarih_alani, ek_filtre = LOG_TURLERI[tur]
+    parca = parca or getattr(settings, 'LOG_TEMIZLEME_PARCA', 1000)
+    kayitlar = model.objects.filter(**{f'{tarih_alani}__lt': sinir}, **ek_filtre).order_by('pk')
+
+    arsiv = _CalismaArsivi(tur) if arsivle else None
+    son_pk = 0
+    silinen = 0
+    try:
+        while True:
+            satirlar = list(kayitlar.filter(pk__gt=son_pk).values()[:parca])
+            if not satirlar:
+                break
+            son_pk = satirlar[-1]['id']
+
+            # Kayıtlar silinmeden önce arşiv diske yazılmış olmalı
+            if arsiv:
+                aylar = defaultdict(list)
+                for satir in satirlar:
+                    aylar[timezone.localtime(satir[tarih_alani]).strftime('%Y-%m')].append(satir)
+                arsiv.parca_yaz(aylar)
+
+            with transaction.atomic():
+                silinen += model.objects.filter(pk__in=[satir['id'] for satir in satirlar]).delete()[0]
+    finally:
+        if arsiv:
+            arsiv.birlestir()
+        if silinen:
+            from .istatistik import istatistikleri_gecersiz_kil
+            istatistikleri_gecersiz_kil()
+    return silinen
+
+
+def _ay_dosyalari(tur):
+    """{ay: [dosya yolu]} (her ayın tüm çalışmaları)"""
+    dizin = arsiv_dizini(tur)
+    try:
+        adlar = sorted(os.listdir(dizin))
+    except FileNotFoundError:
+        return {}
+    dosyalar = defaultdict(list)
+    for ad in adlar:
+        eslesme = ARSIV_DOSYASI.match(ad)
+        if eslesme:
+            dosyalar[eslesme.group(1)].append(os.path.join(dizin, ad))
+    return dosyalar
+
+
+def arsiv_aylari(tur):
+    """Arşivi bulunan aylar (YYYY-AA, eskiden yeniye)"""
+    return sorted(_ay_dosyalari(tur))
+
+
+def arsivde_ara(tur, aylar=None, metin=None, **alanlar):
+    """
+    Arşivlenmiş kayıtları sırayla döndür (sözlük olarak).
+
+    aylar: YYYY-AA listesi (varsayılan tüm arşiv); metin: satırda geçen
+    metin (büyük/küçük harf ve Türkçe karakter duyarsız); alanlar: alan=değer eşitlikleri,
+    örn. kullanici_id=3, aktivite_tipi='silme'.
+    """
+    from musteri.arama import turkce_normal
+
+    aranan = turkce_normal(metin) if metin else None
+    gorulen = set()
+    dosyalar = _ay_dosyalari(tur)
+    for ay in aylar or sorted(dosyalar):
+        for yol in dosyalar.get(ay, []):
+            try:
+                with gzip.open(yol, 'rt', encoding='utf-8') as dosya:
+                    for satir in dosya:
+                        # JSON çözmeden önce ucuz metin kontrolü
+                        if aranan and aranan not in turkce_normal(satir):
+                            continue
+                        kayit = json.loads(satir)
+                        if kayit['id'] in gorulen:
+                            continue
+                        if all(kayit.get(alan) == deger for alan, deger in alanlar.items()):
+                            gorulen.add(kayit['id'])
+                            yield kayit
+            except (OSError, EOFError, zlib.error, ValueError):
+                # Yarım kalmış eski biçim dosya: okunabilen kayıtlar döndürüldü
+                logger.warning('Arşiv dosyası okunamadı: %s', yol, exc_info=True)
@@ -0,0 +1,194 @@
+"""
+Denetim farkları.
+
+Denetlenen modeller (Gider, Urun, Musteri) kaydedilip silindikçe
+AktiviteLog'a kaydın tamamı yerine sadece değişen alanlar yazılır:
+eski_degerler değişen alanların önceki, yeni_degerler sonraki değerlerini
+tutar. Eklemede yeni_degerler, silmede eski_degerler kaydın tam halidir.
+
+Kaydın veritabanından okunan değerleri from_db'de saklanır
+(onceki_durumu_sakla), fark için ek sorgu yapılmaz. JSON hali
+AKTIVITE_LOG_SIKISTIRMA_ESIGI bayttan büyük değerler zlib ile sıkıştırılıp
+{"_zlib": "<base64>"} olarak saklanır; `ac` ile açılır.
+
+Kaydın herhangi bir andaki tam hali `surum` ile, bugünkü halinden geriye
+doğru eski değerler uygulanarak elde edilir. Bu yüzden denetlenen alanları
+save() dışından yazan yollar (UPDATE, bulk_update, bulk_create, queryset
+delete) degisiklik_kaydet / silme_kaydet'i kendileri çağırır.
+"""
+import base64
+import json
+import zlib
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import FileField, Q
+from django.utils.text import capfirst
+
+
+SIKISTIRMA_ANAHTARI = '_zlib'
+
+# DenetimMiddleware'in sakladığı istek (kullanıcı ve IP için)
+aktif_istek = ContextVar('denetim_istegi', default=None)
+
+
+def _alanlar(model):
+    """Farkı tutulan alanlar; türetilen (editable=False) alanlar hariç"""
+    return [alan for alan in model._meta.concrete_fields if alan.editable and not alan.primary_key]
+
+
+def _deger(alan, deger):
+    # Dosya alanları dosya adıyla saklanır
+    if isinstance(alan, FileField):
+        return getattr(deger, 'name', deger) or None
+    return deger
+
+
+def _json(degerler):
+    return json.loads(json.dumps(degerler, cls=DjangoJSONEncoder))
+
+
+def durum(nesne):
+    """Nesnenin denetlenen alanlarının şimdiki değerleri (ertelenmiş alanlar hariç)"""
+    return {
+        alan.attname: _deger(alan, getattr(nesne, alan.attname))
+        for alan in _alanlar(type(nesne))
+        if alan.attname in nesne.__dict__
+    }
+
+
+def onceki_durumu_sakla(nesne, alan_adlari, degerler):
+    """from_db içinde çağrılır: kaydın veritabanından okunan değerlerini sakla"""
+    nesne._denetim_onceki = dict(zip(alan_adlari, degerler))
+
+
+def kayitli_durum(nesne):
+    """Kaydın veritabanındaki hali (yeni kayıtlar için None); kaydetmeden önce çağrılır"""
+    if nesne._state.adding or nesne.pk is None:
+        return None
+    alanlar = {alan.attname: alan for alan in _alanlar(type(nesne))}
+    onceki = getattr(nesne, '_denetim_onceki', {})
+    eksik = [ad for ad in alanlar if ad not in onceki]
+    if eksik:
+        onceki = {**onceki, **(type(nesne)._base_manager.filter(pk=nesne.pk).values(*eksik).first() or {})}
+    return {ad: _deger(alan, onceki[ad]) for ad, alan in alanlar.items() if ad in onceki}
+
+
+def sikistir(degerler):
+    """Değer sözlüğünü JSON'a uygun hale getir, büyükse zlib ile sıkıştır"""
+    if degerler is None:
+        return None
+    metin = json.dumps(degerler, cls=DjangoJSONEncoder, ensure_ascii=False)
+    esik = getattr(settings, 'AKTIVITE_LOG_SIKISTIRMA_ESIGI', 4096)
+    if esik is None or len(metin.encode()) < esik:
+        return json.loads(metin)
+    return {SIKISTIRMA_ANAHTARI: base64.b64encode(zlib.compress(metin.encode(), 9)).decode('ascii')}
+
+
+def ac(deger):
+    """`sikistir` ile saklanan değeri aç"""
+    if isinstance(deger, dict) and SIKISTIRMA_ANAHTARI in deger:
+        return json.loads(zlib.decompress(base64.b64decode(deger[SIKISTIRMA_ANAHTARI])))
+    return deger
+
+
+def _log_yaz(model, pk, aktivite_tipi, baslik, aciklama, eski, yeni):
+    from django.contrib.contenttypes.models import ContentType
+    from .models import AktiviteLog
+    from .yazici import kaydet
+
+    log = AktiviteLog(
+        aktivite_tipi=aktivite_tipi,
+        baslik=baslik,
+        aciklama=aciklama,
+        content_type=ContentType.objects.get_for_model(model),
+        object_id=pk,
+        eski_degerler=sikistir(eski),
+        yeni_degerler=sikistir(yeni),
+    )
+    istek = aktif_istek.get()
+    if istek is not None:
+        from kullanici.views import get_client_ip
+        if istek.user.is_authenticated:
+            log.kullanici = istek.user
+        log.ip_adresi = get_client_ip(istek)
+        log.tarayici_bilgisi = istek.META.get('HTTP_USER_AGENT', '')
+    kaydet(log)
+
+
+def degisiklik_kaydet(nesne, eski):
+    """
+    save içinde super().save()'den sonra çağrılır. `eski` kaydetmeden önce
+    alınan kayitli_durum'dur (eklemede None). save() dışından yazan yollar
+    nesneyi yeni değerlerle güncelleyip sadece değişen alanların önceki
+    değerlerini verebilir.
+    """
+    yeni = durum(nesne)
+    nesne._denetim_onceki = yeni
+    model = type(nesne)
+    ad = capfirst(model._meta.verbose_name)
+
+    if eski is None:
+        _log_yaz(model, nesne.pk, 'ekleme', f'{ad} Eklendi', str(nesne), None, _json(yeni))
+        return
+
+    eski, yeni = _json(eski), _json(yeni)
+    degisen = [alan for alan, deger in yeni.items() if alan in eski and eski[alan] != deger]
+    if not degisen:
+        return
+    # Pasife alma (soft delete) silme olarak görünür
+    tip = 'silme' if degisen == ['aktif'] and not yeni['aktif'] else 'guncelleme'
+    etiketler = ', '.join(str(model._meta.get_field(alan).verbose_name) for alan in degisen)
+    _log_yaz(
+        model, nesne.pk, tip,
+        f'{ad} Silindi' if tip == 'silme' else f'{ad} Güncellendi',
+        f'{nesne} ({etiketler})',
+        {alan: eski[alan] for alan in degisen},
+        {alan: yeni[alan] for alan in degisen},
+    )
+
+
+def silme_kaydet(nesne, pk, eski):
+    """delete içinde super().delete()'den sonra çağrılır"""
+    model = type(nesne)
+    _log_yaz(
+        model, pk, 'silme', f'{capfirst(model._meta.verbose_name)} Silindi', str(nesne),
+        _json(eski) if eski is not None else None, None,
+    )
+
+
+def _geri_sar(model, pk, sonraki_loglar):
+    """Kaydın bugünkü halinden `sonraki_loglar`ı geri alarak önceki halini bul"""
+    nesne = model._base_manager.filter(pk=pk).first()
+    hal = _json(durum(nesne)) if nesne else {}
+    var = nesne is not None
+    for log in sonraki_loglar.order_by('-tarih', '-pk').only('aktivite_tipi', 'eski_degerler'):
+        eski = ac(log.eski_degerler)
+        if eski:
+            hal.update(eski)
+            var = True
+        elif log.aktivite_tipi == 'ekleme':
+            # Eklemeden öncesinde kayıt yoktu
+            hal, var = {}, False
+    return hal if var else None
+
+
+def _kayit_loglari(model, pk):
+    from django.contrib.contenttypes.models import ContentType
+    from .models import AktiviteLog
+    return AktiviteLog.objects.filter(content_type=ContentType.objects.get_for_model(model), object_id=pk)
+
+
+def surum(model, pk, an):
+    """Kaydın `an` anındaki tam hali (alan adı -> değer); o anda kayıt yoksa None"""
+    return _geri_sar(model, pk, _kayit_loglari(model, pk).filter(tarih__gt=an))
+
+
+def log_surumu(log):
+    """Kaydın `log`daki değişiklikten hemen sonraki tam hali"""
+    model = log.content_type.model_class()
+    sonraki = _kayit_loglari(model, log.object_id).filter(
+        Q(tarih__gt=log.tarih) | Q(tarih=log.tarih, pk__gt=log.pk)
+    )
+    return _geri_sar(model, log.object_id, sonraki)
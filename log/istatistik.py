@@ -0,0 +1,111 @@
+"""
+Log istatistikleri.
+
+Log temizleme sayfasındaki sayılar tablo başına tek sorguda (koşullu
+Count) hesaplanır ve rapor önbelleğinde saklanır; önbellek süreçler arası
+paylaşıldığından tüm işçiler aynı sayıları görür. Sayılar
+LOG_ISTATISTIK_SURESI saniyeden eskiyse yeniden hesaplanır.
+
+Log yazıcıları (log.yazici) yeni kayıtları `istatistikleri_artir` ile
+önbellekteki sayılara ekler, böylece sayfa arada tabloları taramaz. Eş
+zamanlı artırmalarda kaybolan sayılar ve zamanla pencere dışına çıkan
+kayıtlar bir sonraki hesaplamada düzelir. Toplu silme sonrası
+`istatistikleri_gecersiz_kil` çağrılır.
+"""
+import time
+
+from django.conf import settings
+from django.db.models import Count, Q
+
+from rapor.onbellek import onbellek_getir
+
+
+ANAHTAR = 'log:istatistikler'
+
+
+def _sure():
+    return getattr(settings, 'LOG_ISTATISTIK_SURESI', 60)
+
+
+def _sinirlar():
+    from .arsiv import saklama_siniri
+    return saklama_siniri(7), saklama_siniri(30)
+
+
+def _hesapla():
+    from .models import AktiviteLog, LoginLog, SistemHatasi
+
+    hafta, ay = _sinirlar()
+    return {
+        **AktiviteLog.objects.aggregate(
+            toplam_aktivite=Count('pk'),
+            haftalik_aktivite=Count('pk', filter=Q(tarih__gte=hafta)),
+            aylik_aktivite=Count('pk', filter=Q(tarih__gte=ay)),
+        ),
+        **SistemHatasi.objects.aggregate(
+            toplam_hata=Count('pk'),
+            cozulmemis_hata=Count('pk', filter=Q(cozuldu=False)),
+            haftalik_hata=Count('pk', filter=Q(tarih__gte=hafta)),
+        ),
+        **LoginLog.objects.aggregate(
+            toplam_login=Count('pk'),
+            basarili_login=Count('pk', filter=Q(basarili=True)),
+            basarisiz_login=Count('pk', filter=Q(basarili=False)),
+        ),
+    }
+
+
+def log_istatistikleri():
+    """Log tablolarının sayıları (en fazla LOG_ISTATISTIK_SURESI saniye eski)"""
+    onbellek = onbellek_getir()
+    veri = onbellek.get(ANAHTAR)
+    if veri is None or time.time() - veri['zaman'] > _sure():
+        veri = {'zaman': time.time(), 'sayilar': _hesapla()}
+        onbellek.set(ANAHTAR, veri, _sure() * 10)
+    return veri['sayilar']
+
+
+def _katki(nesne, hafta, ay):
+    """Yeni yazılan log kaydının sayılara katkısı"""
+    from .models import AktiviteLog, LoginLog, SistemHatasi
+
+    if isinstance(nesne, AktiviteLog):
+        return {
+            'toplam_aktivite': 1,
+            'haftalik_aktivite': nesne.tarih >= hafta,
+            'aylik_aktivite': nesne.tarih >= ay,
+        }
+    if isinstance(nesne, SistemHatasi):
+        return {
+            'toplam_hata': 1,
+            'cozulmemis_hata': not nesne.cozuldu,
+            'haftalik_hata': nesne.tarih >= hafta,
+        }
+    if isinstance(nesne, LoginLog):
+        return {
+            'toplam_login': 1,
+            'basarili_login': nesne.basarili,
+            'basarisiz_login': not nesne.basarili,
+        }
+    return {}
+
+
+def istatistikleri_artir(nesneler):
+    """Yeni yazılan log kayıtlarını önbellekteki sayılara ekle (önbellek yoksa bir şey yapmaz)"""
+    onbellek = onbellek_getir()
+    veri = onbellek.get(ANAHTAR)
+    if veri is None:
+        return
+    hafta, ay = _sinirlar()
+    degisti = False
+    for nesne in nesneler:
+        for alan, artis in _katki(nesne, hafta, ay).items():
+            veri['sayilar'][alan] += int(artis)
+            degisti = True
+    if degisti:
+        # Hesaplama zamanı korunur, sayılar süresi dolunca yine yeniden hesaplanır
+        onbellek.set(ANAHTAR, veri, _sure() * 10)
+
+
+def istatistikleri_gecersiz_kil():
+    onbellek_getir().delete(ANAHTAR)
@@ -0,0 +1,52 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from log.arsiv import LOG_TURLERI, arsiv_aylari, arsivde_ara
+
+
+class Command(BaseCommand):
+    help = 'Arşivlenmiş logları (log_temizle) veritabanına dokunmadan arar; sonuçları JSONL olarak yazar'
+
+    def add_arguments(self, parser):
+        parser.add_argument('tip', choices=list(LOG_TURLERI), help='Log türü')
+        parser.add_argument(
+            '--ay',
+            action='append',
+            help='Aranacak ay (YYYY-AA); birden fazla verilebilir, varsayılan tüm arşiv',
+        )
+        parser.add_argument('--metin', help='Kayıtta geçen metin (büyük/küçük harf ve Türkçe karakter duyarsız)')
+        parser.add_argument(
+            '--alan',
+            action='append',
+            default=[],
+            metavar='ALAN=DEĞER',
+            help='Alan eşitliği, örn. --alan kullanici_id=3 --alan aktivite_tipi=silme',
+        )
+        parser.add_argument('--limit', type=int, default=None, help='En fazla kaç kayıt yazılsın')
+        parser.add_argument('--aylar', action='store_true', help='Sadece arşivi olan ayları listele')
+
+    def handle(self, *args, **options):
+        if options['aylar']:
+            for ay in arsiv_aylari(options['tip']):
+                self.stdout.write(ay)
+            return
+
+        alanlar = {}
+        for ifade in options['alan']:
+            alan, esit, deger = ifade.partition('=')
+            if not esit:
+                raise CommandError(f'Geçersiz alan filtresi: {ifade} (ALAN=DEĞER olmalı)')
+            # Sayı/true/null gibi değerler JSON olarak yorumlanır
+            try:
+                alanlar[alan] = json.loads(deger)
+            except ValueError:
+                alanlar[alan] = deger
+
+        bulunan = 0
+        for kayit in arsivde_ara(options['tip'], options['ay'], options['metin'], **alanlar):
+            self.stdout.write(json.dumps(kayit, ensure_ascii=False))
+            bulunan += 1
+            if options['limit'] and bulunan >= options['limit']:
+                break
+        self.stderr.write(f'{bulunan} kayıt bulundu')
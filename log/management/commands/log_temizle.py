@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+
+from log.arsiv import LOG_TURLERI, arsiv_dizini, eski_loglari_temizle, saklama_siniri
+
+
+class Command(BaseCommand):
+    help = 'Saklama süresi dolan logları aylık gzip JSONL arşivine yazıp parça parça siler (gece çalıştırılır)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--gun',
+            type=int,
+            default=90,
+            help='Kaç günden eski loglar silinsin (varsayılan 90)',
+        )
+        parser.add_argument(
+            '--tip',
+            choices=[*LOG_TURLERI, 'hepsi'],
+            default='hepsi',
+            help='Temizlenecek log türü (varsayılan hepsi; hata loglarından sadece çözülmüşler)',
+        )
+        parser.add_argument(
+            '--parca',
+            type=int,
+            default=None,
+            help='Her transaction\'da silinecek kayıt sayısı (varsayılan LOG_TEMIZLEME_PARCA)',
+        )
+        parser.add_argument(
+            '--arsivsiz',
+            action='store_true',
+            help='Kayıtları arşivlemeden sil',
+        )
+
+    def handle(self, *args, **options):
+        sinir = saklama_siniri(options['gun'])
+        turler = list(LOG_TURLERI) if options['tip'] == 'hepsi' else [options['tip']]
+        for tur in turler:
+            silinen = eski_loglari_temizle(tur, sinir, arsivle=not options['arsivsiz'], parca=options['parca'])
+            hedef = f' (arşiv: {arsiv_dizini(tur)})' if silinen and not options['arsivsiz'] else ''
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f'{tur}: {sinir.strftime("%d.%m.%Y")} öncesi {silinen} kayıt silindi{hedef}'
+                )
+            )
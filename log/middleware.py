@@ -0,0 +1,15 @@
+from .fark import aktif_istek
+
+
+class DenetimMiddleware:
+    """Model kaydetme kancalarının yazdığı denetim loglarına kullanıcı ve IP bilgisi verir"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = aktif_istek.set(request)
+        try:
+            return self.get_response(request)
+        finally:
+            aktif_istek.reset(token)
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.5 on 2026-10-19 13:45
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('log', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='aktivitelog',
+            name='tarih',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False, verbose_name='Tarih'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.5 on 2026-10-19 13:49
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('log', '0002_alter_aktivitelog_tarih'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='aktivitelog',
+            name='tarih',
+            field=models.DateTimeField(db_index=True, default=django.utils.timezone.now, editable=False, verbose_name='Tarih'),
+        ),
+        migrations.AlterField(
+            model_name='loginlog',
+            name='giris_tarihi',
+            field=models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Giriş Tarihi'),
+        ),
+        migrations.AlterField(
+            model_name='sistemhatasi',
+            name='tarih',
+            field=models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Tarih'),
+        ),
+    ]
@@ -2,6 +2,7 @@ from django.db import models
 from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
 from django.contrib.contenttypes.fields import GenericForeignKey
+from django.utils import timezone
 
 
 class AktiviteLog(models.Model):
@@ -40,8 +41,8 @@ class AktiviteLog(models.Model):
     eski_degerler = models.JSONField(null=True, blank=True, verbose_name="Eski Değerler")
     yeni_degerler = models.JSONField(null=True, blank=True, verbose_name="Yeni Değerler")
     
-    # Tarih bilgisi
-    tarih = models.DateTimeField(auto_now_add=True, verbose_name="Tarih")
+    # Tarih bilgisi (kayıt kuyruktan sonra yazılsa da olay anı saklanır)
+    tarih = models.DateTimeField(default=timezone.now, editable=False, db_index=True, verbose_name="Tarih")
 
     class Meta:
         verbose_name = "Aktivite Log"
@@ -56,8 +57,10 @@ class AktiviteLog(models.Model):
     def log_aktivite(cls, kullanici, aktivite_tipi, baslik, aciklama, 
                      content_object=None, ip_adresi=None, tarayici_bilgisi=None, 
                      eski_degerler=None, yeni_degerler=None):
-        """Aktivite log kaydı oluştur"""
-        log = cls.objects.create(
+        """Aktivite log kaydı oluştur (log.yazici kuyruğu üzerinden toplu yazılır)"""
+        from .yazici import kaydet
+
+        log = cls(
             kullanici=kullanici,
             aktivite_tipi=aktivite_tipi,
             baslik=baslik,
@@ -68,7 +71,7 @@ class AktiviteLog(models.Model):
             eski_degerler=eski_degerler,
             yeni_degerler=yeni_degerler
         )
-        return log
+        return kaydet(log)
 
 
 class SistemHatasi(models.Model):
@@ -100,7 +103,7 @@ class SistemHatasi(models.Model):
     cozum_notu = models.TextField(null=True, blank=True, verbose_name="Çözüm Notu")
     
     # Tarih bilgisi
-    tarih = models.DateTimeField(auto_now_add=True, verbose_name="Tarih")
+    tarih = models.DateTimeField(auto_now_add=True, db_index=True, verbose_name="Tarih")
 
     class Meta:
         verbose_name = "Sistem Hatası"
@@ -114,7 +117,7 @@ class SistemHatasi(models.Model):
 class LoginLog(models.Model):
     """Kullanıcı giriş logları"""
     kullanici = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, verbose_name="Kullanıcı")
-    giris_tarihi = models.DateTimeField(auto_now_add=True, verbose_name="Giriş Tarihi")
+    giris_tarihi = models.DateTimeField(auto_now_add=True, db_index=True, verbose_name="Giriş Tarihi")
     cikis_tarihi = models.DateTimeField(null=True, blank=True, verbose_name="Çıkış Tarihi")
     ip_adresi = models.GenericIPAddressField(verbose_name="IP Adresi")
     tarayici_bilgisi = models.TextField(verbose_name="Tarayıcı Bilgisi")
@@ -1,8 +1,10 @@
 from django.shortcuts import render, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from django.core.exceptions import FieldDoesNotExist
 from django.core.paginator import Paginator
 from django.db.models import Q
+from .istatistik import istatistikleri_gecersiz_kil, log_istatistikleri
 from .models import AktiviteLog, SistemHatasi, LoginLog
 
 
@@ -50,8 +52,33 @@ def aktivite_loglari(request):
 @login_required
 def aktivite_detay(request, pk):
     """Aktivite log detay view'ı"""
-    log = get_object_or_404(AktiviteLog, pk=pk)
-    context = {'log': log}
+    from .fark import ac, log_surumu
+    log = get_object_or_404(AktiviteLog.objects.select_related('kullanici', 'content_type'), pk=pk)
+    
+    # Değişen alanlar ve kaydın bu değişiklikten sonraki tam hali
+    eski = ac(log.eski_degerler) or {}
+    yeni = ac(log.yeni_degerler) or {}
+    model = log.content_type.model_class() if log.content_type else None
+    
+    def etiket(alan):
+        try:
+            return model._meta.get_field(alan).verbose_name
+        except (AttributeError, FieldDoesNotExist):
+            return alan
+    
+    degisiklikler = [
+        {'alan': etiket(alan), 'eski': eski.get(alan), 'yeni': yeni.get(alan)}
+        for alan in dict.fromkeys([*eski, *yeni])
+    ]
+    surum = None
+    if model and log.object_id and (eski or yeni):
+        surum = [(etiket(alan), deger) for alan, deger in (log_surumu(log) or {}).items()]
+    
+    context = {
+        'log': log,
+        'degisiklikler': degisiklikler,
+        'surum': surum,
+    }
     return render(request, 'log/aktivite_detay.html', context)
 
 
@@ -99,11 +126,13 @@ def hata_detay(request, pk):
             hata.cozuldu = True
             hata.cozum_notu = request.POST.get('cozum_notu', '')
             hata.save()
+            istatistikleri_gecersiz_kil()
             messages.success(request, 'Hata çözüldü olarak işaretlendi.')
         elif request.POST.get('action') == 'ac':
             hata.cozuldu = False
             hata.cozum_notu = ''
             hata.save()
+            istatistikleri_gecersiz_kil()
             messages.success(request, 'Hata tekrar açıldı.')
     
     context = {'hata': hata}
@@ -153,59 +182,31 @@ def login_loglari(request):
 def log_temizle(request):
     """Log temizleme view'ı"""
     if request.method == 'POST':
+        from .arsiv import LOG_TURLERI, eski_loglari_temizle, saklama_siniri
         temizle_tipi = request.POST.get('tip')
         gun_sayisi = int(request.POST.get('gun_sayisi', 30))
+        arsivle = request.POST.get('arsivle', '1') == '1'
+        sinir = saklama_siniri(gun_sayisi)
         
-        from datetime import date, timedelta
-        cutoff_date = date.today() - timedelta(days=gun_sayisi)
-        
-        if temizle_tipi == 'aktivite':
-            silinen = AktiviteLog.objects.filter(tarih__date__lt=cutoff_date).count()
-            AktiviteLog.objects.filter(tarih__date__lt=cutoff_date).delete()
-            messages.success(request, f'{silinen} aktivite log kaydı silindi.')
-        
-        elif temizle_tipi == 'hata':
-            silinen = SistemHatasi.objects.filter(tarih__date__lt=cutoff_date, cozuldu=True).count()
-            SistemHatasi.objects.filter(tarih__date__lt=cutoff_date, cozuldu=True).delete()
-            messages.success(request, f'{silinen} çözülmüş hata kaydı silindi.')
-        
-        elif temizle_tipi == 'login':
-            silinen = LoginLog.objects.filter(giris_tarihi__date__lt=cutoff_date).count()
-            LoginLog.objects.filter(giris_tarihi__date__lt=cutoff_date).delete()
-            messages.success(request, f'{silinen} login log kaydı silindi.')
-        
-        elif temizle_tipi == 'hepsi':
-            aktivite_silinen = AktiviteLog.objects.filter(tarih__date__lt=cutoff_date).count()
-            hata_silinen = SistemHatasi.objects.filter(tarih__date__lt=cutoff_date, cozuldu=True).count()
-            login_silinen = LoginLog.objects.filter(giris_tarihi__date__lt=cutoff_date).count()
-            
-            AktiviteLog.objects.filter(tarih__date__lt=cutoff_date).delete()
-            SistemHatasi.objects.filter(tarih__date__lt=cutoff_date, cozuldu=True).delete()
-            LoginLog.objects.filter(giris_tarihi__date__lt=cutoff_date).delete()
-            
-            toplam = aktivite_silinen + hata_silinen + login_silinen
+        # Kayıtlar arşivlenip kısa transaction'larda parça parça silinir
+        if temizle_tipi == 'hepsi':
+            toplam = sum(eski_loglari_temizle(tur, sinir, arsivle) for tur in LOG_TURLERI)
             messages.success(request, f'Toplam {toplam} log kaydı silindi.')
-    
-    # İstatistikler
-    from datetime import date, timedelta
-    
-    bugun = date.today()
-    bir_hafta_once = bugun - timedelta(days=7)
-    bir_ay_once = bugun - timedelta(days=30)
-    
-    stats = {
-        'toplam_aktivite': AktiviteLog.objects.count(),
-        'haftalik_aktivite': AktiviteLog.objects.filter(tarih__date__gte=bir_hafta_once).count(),
-        'aylik_aktivite': AktiviteLog.objects.filter(tarih__date__gte=bir_ay_once).count(),
-        
-        'toplam_hata': SistemHatasi.objects.count(),
-        'cozulmemis_hata': SistemHatasi.objects.filter(cozuldu=False).count(),
-        'haftalik_hata': SistemHatasi.objects.filter(tarih__date__gte=bir_hafta_once).count(),
-        
-        'toplam_login': LoginLog.objects.count(),
-        'basarili_login': LoginLog.objects.filter(basarili=True).count(),
-        'basarisiz_login': LoginLog.objects.filter(basarili=False).count(),
+        elif temizle_tipi in LOG_TURLERI:
+            silinen = eski_loglari_temizle(temizle_tipi, sinir, arsivle)
+            etiket = {
+                'aktivite': 'aktivite log',
+                'hata': 'çözülmüş hata',
+                'login': 'login log',
+            }[temizle_tipi]
+            messages.success(request, f'{silinen} {etiket} kaydı silindi.')
+    
+    # İstatistikler (tablo başına tek sorgu, kısa süreli önbellekli)
+    stats = log_istatistikleri()
+    
+    from .arsiv import LOG_TURLERI, arsiv_aylari
+    context = {
+        'stats': stats,
+        'arsivler': {tur: arsiv_aylari(tur) for tur in LOG_TURLERI},
     }
-    
-    context = {'stats': stats}
     return render(request, 'log/log_temizle.html', context)
@@ -0,0 +1,137 @@
+"""
+Aktivite logu yazıcısı.
+
+Log kayıtları istek içinde tek tek INSERT edilmek yerine süreç içi bir
+kuyruğa eklenir. Arka plandaki iş parçacığı kuyruğu her
+AKTIVITE_LOG_TOPLU_ADET kayıtta ya da en geç AKTIVITE_LOG_BEKLEME_MS
+milisaniyede bir bulk_create ile yazar; süreç kapanırken kalan kayıtlar
+yazılır (atexit). Yazılan kayıtlar log istatistiklerine (log.istatistik)
+eklenir.
+
+Kayıtlar transaction commit edildikten sonra kuyruğa girer, böylece geri
+alınan işlemlerin logu yazılmaz. AKTIVITE_LOG_SENKRON ayarı açıksa
+(testler) kayıtlar hemen kaydedilir.
+"""
+import atexit
+import logging
+import os
+import threading
+from collections import defaultdict, deque
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+
+logger = logging.getLogger(__name__)
+
+# Yazılamayan bir kayıt en fazla bu kadar denenir
+EN_FAZLA_DENEME = 3
+
+_kuyruk = deque()
+_uyandir = threading.Event()
+_baslatma_kilidi = threading.Lock()
+_yazma_kilidi = threading.Lock()
+_is_parcacigi = None
+_pid = None
+
+
+def kaydet(nesne):
+    """Kaydedilmemiş log nesnesini (AktiviteLog, UserActivityLog...) yazılmak üzere kuyruğa al"""
+    if getattr(settings, 'AKTIVITE_LOG_SENKRON', False):
+        nesne.save()
+        _istatistiklere_ekle([nesne])
+    else:
+        transaction.on_commit(lambda: _kuyruga_ekle(nesne))
+    return nesne
+
+
+def _kuyruga_ekle(nesne):
+    _kuyruk.append(nesne)
+    if _pid != os.getpid() or not _is_parcacigi.is_alive():
+        _baslat()
+    if len(_kuyruk) >= getattr(settings, 'AKTIVITE_LOG_TOPLU_ADET', 100):
+        _uyandir.set()
+
+
+def _baslat():
+    """Bu süreç için yazıcı iş parçacığını başlat (fork sonrası yeniden)"""
+    global _is_parcacigi, _pid
+    with _baslatma_kilidi:
+        if _pid == os.getpid() and _is_parcacigi.is_alive():
+            return
+        _pid = os.getpid()
+        _is_parcacigi = threading.Thread(target=_calis, name='aktivite-log-yazici', daemon=True)
+        _is_parcacigi.start()
+
+
+def _calis():
+    bekleme = getattr(settings, 'AKTIVITE_LOG_BEKLEME_MS', 200) / 1000
+    while True:
+        _uyandir.wait(bekleme)
+        _uyandir.clear()
+        if not _kuyruk:
+            continue
+        try:
+            bosalt()
+        except Exception:
+            logger.exception('Aktivite logları yazılamadı')
+        finally:
+            close_old_connections()
+
+
+def bosalt():
+    """
+    Kuyruktaki kayıtları model başına tek bulk_create ile yaz; yazılan kayıt
+    sayısını döndür. Toplu yazma başarısız olursa grup tek tek yazılır,
+    böylece bozuk bir kayıt diğerlerini kaybettirmez.
+    """
+    with _yazma_kilidi:
+        gruplar = defaultdict(list)
+        while _kuyruk:
+            nesne = _kuyruk.popleft()
+            gruplar[type(nesne)].append(nesne)
+
+        yazilan = 0
+        for model, nesneler in gruplar.items():
+            try:
+                model.objects.bulk_create(nesneler, batch_size=500)
+            except Exception:
+                logger.exception('%s: %d log kaydı toplu yazılamadı, tek tek deneniyor', model.__name__, len(nesneler))
+                nesneler = _tek_tek_yaz(nesneler)
+            yazilan += len(nesneler)
+            _istatistiklere_ekle(nesneler)
+        return yazilan
+
+
+def _tek_tek_yaz(nesneler):
+    """
+    Toplu yazılamayan grubu kayıt kayıt yaz; yazılanları döndür. Tek başına da
+    yazılamayan kayıt EN_FAZLA_DENEME kez denenene kadar kuyruğa geri döner.
+    """
+    yazilan = []
+    for nesne in nesneler:
+        try:
+            with transaction.atomic():
+                nesne.save()
+        except Exception:
+            nesne._log_deneme = getattr(nesne, '_log_deneme', 0) + 1
+            if nesne._log_deneme < EN_FAZLA_DENEME:
+                _kuyruk.append(nesne)
+            else:
+                degerler = {ad: deger for ad, deger in vars(nesne).items() if not ad.startswith('_')}
+                logger.exception('%s log kaydı atlandı: %s', type(nesne).__name__, degerler)
+        else:
+            yazilan.append(nesne)
+    return yazilan
+
+
+def _istatistiklere_ekle(nesneler):
+    # Önbellek hatası yazılmış kayıtların tekrar kuyruğa girmesine yol açmamalı
+    from .istatistik import istatistikleri_artir
+    try:
+        istatistikleri_artir(nesneler)
+    except Exception:
+        logger.exception('Log istatistikleri güncellenemedi')
+
+
+atexit.register(bosalt)
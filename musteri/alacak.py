@@ -0,0 +1,203 @@
+"""
+Müşteri alacakları - açık kalem takibi.
+
+Her açık hesap (veresiye) ödemesi müşterinin bir AcikKalem kaydıdır. Tahsilat
+yapıldığında tutar önce elle seçilen kalemlere, kalanı en eski kalemden
+başlayarak (FIFO) dağıtılır; her dağıtım bir TahsilatDetay kaydıdır.
+Müşterinin açık kalemleri kısmi indeksle doğrudan okunur, böylece borç
+ekranları sadece o müşterinin geçmişiyle ölçeklenir.
+
+Açık hesap satışları `acik_hesap_borclandir` ile müşteriye yazılır: limit
+kontrolü ve bakiye artışı tek koşullu UPDATE'tir, eşzamanlı kasalar limiti
+aşamaz.
+"""
+from decimal import Decimal
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import AcikKalem, BorcAlacakHareket, Musteri, TahsilatDetay
+
+
+class AcikHesapLimitiAsildi(ValueError):
+    """Açık hesap satışı müşterinin limitini aşıyor"""
+
+
+def _bakiye_artir_sql():
+    tablo = connection.ops.quote_name(Musteri._meta.db_table)
+    bakiye = connection.ops.quote_name(Musteri._meta.get_field('acik_hesap_bakiye').column)
+    limit = connection.ops.quote_name(Musteri._meta.get_field('acik_hesap_limit').column)
+    pk = connection.ops.quote_name(Musteri._meta.pk.column)
+    return (
+        f'UPDATE {tablo} SET {bakiye} = {bakiye} + %s '
+        f'WHERE {pk} = %s AND ({limit} <= 0 OR {bakiye} + %s <= {limit}) '
+        f'RETURNING {bakiye}'
+    )
+
+
+def acik_hesap_borclandir(musteri, tutar, aciklama, satis_id=None, user=None):
+    """
+    Açık hesap satış tutarını müşterinin bakiyesine borç olarak yaz.
+
+    Bakiye + tutar limiti aşıyorsa AcikHesapLimitiAsildi fırlatılır ve
+    bakiye değişmez; limiti 0 olan müşteriler limitsizdir. Kontrol ve artış
+    tek `UPDATE ... WHERE bakiye + tutar <= limit RETURNING bakiye` sorgusudur
+    (ORM update() yeni bakiyeyi döndürmez); hemen ardından aynı transaction
+    içinde BorcAlacakHareket kaydı yazılır. Oluşan hareketi döndürür.
+    """
+    from log.fark import degisiklik_kaydet
+    from rapor.pano import genel_sayaclari_guncelle, ozet_sakla
+
+    tutar = Decimal(str(tutar))
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(_bakiye_artir_sql(), [tutar, musteri.pk, tutar])
+            satir = cursor.fetchone()
+        if satir is None:
+            guncel = Musteri.objects.filter(pk=musteri.pk).values('acik_hesap_bakiye', 'acik_hesap_limit').first()
+            if guncel is None:
+                raise Musteri.DoesNotExist('Müşteri bulunamadı!')
+            kullanilabilir = max(Decimal('0'), guncel['acik_hesap_limit'] - guncel['acik_hesap_bakiye'])
+            raise AcikHesapLimitiAsildi(
+                f'{musteri} açık hesap limitini aşıyor! '
+                f'Limit: {guncel["acik_hesap_limit"]}₺, Bakiye: {guncel["acik_hesap_bakiye"]}₺, '
+                f'Kullanılabilir: {kullanilabilir}₺'
+            )
+
+        yeni_bakiye = Decimal(str(satir[0])).quantize(Decimal('0.01'))
+        onceki_bakiye = yeni_bakiye - tutar
+        hareket = BorcAlacakHareket.objects.create(
+            musteri_id=musteri.pk,
+            hareket_tipi='borc',
+            tutar=tutar,
+            satis_id=satis_id,
+            onceki_bakiye=onceki_bakiye,
+            yeni_bakiye=yeni_bakiye,
+            aciklama=aciklama,
+            islem_yapan=user,
+        )
+        # Musteri.save atlandığı için dashboard açık alacak sayacı burada güncellenir
+        genel_sayaclari_guncelle(
+            {'acik_alacak': max(Decimal('0'), onceki_bakiye)},
+            {'acik_alacak': max(Decimal('0'), yeni_bakiye)},
+        )
+
+        # Musteri.save atlandığı için bakiye farkı denetim loguna burada yazılır
+        musteri.acik_hesap_bakiye = yeni_bakiye
+        degisiklik_kaydet(musteri, {'acik_hesap_bakiye': onceki_bakiye})
+
+    ozet_sakla(musteri, ('aktif', 'acik_hesap_bakiye'))
+    return hareket
+
+
+def odeme_kalemini_guncelle(odeme):
+    """Odeme.save içinde çağrılır: ödemenin açık kalemini oluştur/güncelle/sil"""
+    satis = odeme.satis
+    if odeme.odeme_tipi != 'acik_hesap' or not satis.musteri_id:
+        AcikKalem.objects.filter(odeme=odeme).delete()
+        return None
+
+    tutar = Decimal(str(odeme.tutar))
+    kalem = AcikKalem.objects.filter(odeme=odeme).first()
+    if kalem is None:
+        return AcikKalem.objects.create(
+            musteri_id=satis.musteri_id,
+            satis=satis,
+            odeme=odeme,
+            tarih=satis.satis_tarihi or odeme.odeme_tarihi or timezone.now(),
+            tutar=tutar,
+            kalan_tutar=tutar,
+        )
+
+    # Tahsil edilmiş kısım korunur, kalan yeni tutara göre hesaplanır
+    odenen = kalem.tutar - kalem.kalan_tutar
+    kalem.musteri_id = satis.musteri_id
+    kalem.tutar = tutar
+    kalem.kalan_tutar = max(Decimal('0'), tutar - odenen)
+    if kalem.kalan_tutar == 0 and kalem.kapanma_tarihi is None:
+        kalem.kapanma_tarihi = timezone.now()
+    elif kalem.kalan_tutar > 0:
+        kalem.kapanma_tarihi = None
+    kalem.save()
+    return kalem
+
+
+def acik_kalemler(musteri):
+    """Müşterinin açık kalemleri (en eskiden yeniye)"""
+    return AcikKalem.objects.filter(
+        musteri=musteri,
+        kalan_tutar__gt=0,
+        satis__durum='tamamlandi',
+    ).select_related('satis').order_by('tarih', 'id')
+
+
+def tahsilat_dagit(tahsilat, dagilim=None):
+    """
+    Tahsilat tutarını müşterinin açık kalemlerine dağıt.
+
+    `dagilim` ({kalem_id: tutar}) verilirse bu tutarlar önce ilgili kalemlere
+    yazılır; kalan tutar FIFO ile dağıtılır. Açık kalemlerden artan tutar
+    (avans) dağıtılmadan kalır. Oluşturulan TahsilatDetay kayıtlarını döndürür.
+    """
+    dagilim = dagilim or {}
+    kalan = Decimal(str(tahsilat.tutar))
+    simdi = timezone.now()
+
+    with transaction.atomic():
+        kalemler = list(
+            AcikKalem.objects.select_for_update().filter(
+                musteri_id=tahsilat.musteri_id,
+                kalan_tutar__gt=0,
+                satis__durum='tamamlandi',
+            ).order_by('tarih', 'id')
+        )
+
+        odenen = {}
+
+        def yaz(kalem, istenen):
+            nonlocal kalan
+            tutar = min(istenen, kalem.kalan_tutar, kalan)
+            if tutar <= 0:
+                return
+            kalem.kalan_tutar -= tutar
+            if kalem.kalan_tutar == 0:
+                kalem.kapanma_tarihi = simdi
+            odenen[kalem.id] = odenen.get(kalem.id, Decimal('0')) + tutar
+            kalan -= tutar
+
+        # Önce elle seçilen kalemler, sonra en eskiden başlayarak
+        for kalem in kalemler:
+            if kalem.id in dagilim:
+                yaz(kalem, Decimal(str(dagilim[kalem.id])))
+        for kalem in kalemler:
+            yaz(kalem, kalan)
+
+        degisen = [kalem for kalem in kalemler if kalem.id in odenen]
+        AcikKalem.objects.bulk_update(degisen, ['kalan_tutar', 'kapanma_tarihi'])
+        return TahsilatDetay.objects.bulk_create([
+            TahsilatDetay(
+                tahsilat=tahsilat,
+                acik_kalem=kalem,
+                satis_id=kalem.satis_id,
+                odenen_tutar=odenen[kalem.id],
+            )
+            for kalem in degisen
+        ])
+
+
+def tahsilat_dagitimini_geri_al(tahsilat):
+    """İptal edilen tahsilatın kapattığı tutarları kalemlere geri yaz"""
+    with transaction.atomic():
+        detaylar = list(tahsilat.detaylar.filter(acik_kalem__isnull=False))
+        kalemler = {
+            kalem.id: kalem
+            for kalem in AcikKalem.objects.select_for_update().filter(
+                pk__in={detay.acik_kalem_id for detay in detaylar}
+            )
+        }
+        for detay in detaylar:
+            kalem = kalemler[detay.acik_kalem_id]
+            kalem.kalan_tutar = min(kalem.tutar, kalem.kalan_tutar + detay.odenen_tutar)
+            kalem.kapanma_tarihi = None
+        AcikKalem.objects.bulk_update(list(kalemler.values()), ['kalan_tutar', 'kapanma_tarihi'])
+        tahsilat.detaylar.all().delete()
@@ -0,0 +1,107 @@
+"""
+Müşteri arama.
+
+Telefonlar rakamlardan oluşan ulusal biçimde (telefon_normal) ve ters
+çevrilmiş olarak (telefon_ters) indeksli tutulur; numaranın başı ya da son
+hanelerinden arama önek sorgusudur. Ad, soyad ve firma adı Türkçe kurallarla
+küçültülüp (İ→i, I→ı) Türkçe karakterlerden arındırılarak
+MusteriAramaTerimi tablosunda kelime kelime saklanır; "sahin", "ŞAHİN" ve
+"Şahin" aynı terime düşer.
+
+Tüm müşteri arama ekranları `musteri_bul` kullanır.
+"""
+import re
+
+from django.db.models import Case, Exists, IntegerField, OuterRef, Q, Value, When
+
+from .models import Musteri, MusteriAramaTerimi
+
+
+# Aramada telefon sayılacak en az hane sayısı
+TELEFON_EN_AZ_HANE = 3
+
+_TURKCE_KUCUK = str.maketrans({'İ': 'i', 'I': 'ı'})
+_ASCII = str.maketrans('ıışğüöçâîû', 'iisguocaiu')
+
+
+def turkce_normal(metin):
+    """Metni Türkçe kurallarla küçült ve Türkçe karakterlerden arındır"""
+    return (metin or '').translate(_TURKCE_KUCUK).lower().translate(_ASCII)
+
+
+def terimlere_ayir(metin):
+    """Metnin normalleştirilmiş kelimeleri (sırası korunarak, tekrarsız)"""
+    return list(dict.fromkeys(re.findall(r'\w+', turkce_normal(metin))))
+
+
+def telefon_normal(telefon):
+    """Telefonun sadece rakamlardan oluşan ulusal biçimi (0532..., +90532..., 0090532... → 532...)"""
+    rakamlar = re.sub(r'\D', '', telefon or '').lstrip('0')
+    if len(rakamlar) == 12 and rakamlar.startswith('90'):
+        rakamlar = rakamlar[2:]
+    return rakamlar
+
+
+def musteri_terimleri(musteri):
+    """Müşterinin arama terimleri"""
+    return terimlere_ayir(' '.join(filter(None, [musteri.ad, musteri.soyad, musteri.firma_adi])))
+
+
+def arama_indeksini_guncelle(musteri):
+    """Müşterinin arama terimlerini yeniden yaz"""
+    MusteriAramaTerimi.objects.filter(musteri=musteri).delete()
+    MusteriAramaTerimi.objects.bulk_create([
+        MusteriAramaTerimi(musteri=musteri, terim=terim[:100])
+        for terim in musteri_terimleri(musteri)
+    ])
+
+
+def musteri_bul(sorgu, musteriler=None):
+    """
+    Müşterileri ara ve ilgiye göre sırala.
+
+    Sorgudaki her kelime eşleşmelidir: rakamlardan oluşan kelimeler telefonun
+    başıyla ya da son haneleriyle, diğerleri ad/soyad/firma kelimelerinin
+    başıyla karşılaştırılır; '@' içeren sorgular e-postada aranır. Sonuçlar
+    `arama_sirasi`na göre (tam eşleşmeler önce) sıralanır.
+    """
+    musteriler = Musteri.objects.all() if musteriler is None else musteriler
+    sorgu = (sorgu or '').strip()
+    if not sorgu:
+        return musteriler.none()
+
+    if '@' in sorgu:
+        return musteriler.filter(email__icontains=sorgu).annotate(
+            arama_sirasi=Value(0, output_field=IntegerField())
+        ).order_by('arama_sirasi', 'ad', 'soyad', 'id')
+
+    # Boşluk, tire, parantez ile yazılmış telefonlar tek kelime sayılır
+    telefon_metni = re.sub(r'[\s\-().+]', '', sorgu)
+    if telefon_metni.isdigit():
+        kelimeler = [telefon_metni]
+    else:
+        kelimeler = terimlere_ayir(sorgu)
+    if not kelimeler:
+        return musteriler.none()
+
+    filtre = Q()
+    tam = Q()
+    for kelime in kelimeler:
+        if kelime.isdigit():
+            if len(kelime) < TELEFON_EN_AZ_HANE:
+                return musteriler.none()
+            normal = telefon_normal(kelime)
+            filtre &= Q(telefon_normal__startswith=normal) | Q(telefon_ters__startswith=kelime[::-1])
+            tam &= Q(telefon_normal=normal)
+        else:
+            terimler = MusteriAramaTerimi.objects.filter(musteri=OuterRef('pk'))
+            filtre &= Q(Exists(terimler.filter(terim__startswith=kelime)))
+            tam &= Q(Exists(terimler.filter(terim=kelime)))
+
+    return musteriler.filter(filtre).annotate(
+        arama_sirasi=Case(
+            When(tam, then=Value(0)),
+            default=Value(1),
+            output_field=IntegerField(),
+        )
+    ).order_by('arama_sirasi', 'ad', 'soyad', 'id')
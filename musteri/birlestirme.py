@@ -0,0 +1,201 @@
+"""
+Mükerrer müşteri tespiti ve birleştirme.
+
+Adaylar normal telefon (telefon_normal), vergi numarası ve TC kimlik
+numarasının özeti ile bloklanır; aynı anahtarı paylaşan kayıtlar
+(dolaylı olarak da olsa) tek grupta toplanır. Her grupta bir ana kayıt
+seçilir, diğerleri ona birleştirilir.
+
+Birleştirme tek transaction içinde küme tabanlı çalışır: Musteri'ye bağlı
+her tablo için parti başına tek bir `UPDATE ... SET musteri_id = CASE ...`
+sorgusu çalışır, bakiyeler toplanır, istatistikler ve dashboard sayaçları
+ana kayıtlar için güncellenir, kopyalar silinir.
+"""
+import hashlib
+import re
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Case, Value, When
+
+from .models import Musteri, MusteriAramaTerimi, MusteriGrupUyelik, MusteriIstatistik
+
+
+# Birleştirmede yeniden yönlendirilmeyen ilişkiler (kopya ile birlikte silinir,
+# ana kayıt için yeniden oluşturulur)
+YENIDEN_OLUSTURULAN = (MusteriAramaTerimi, MusteriIstatistik)
+
+# Tek UPDATE sorgusundaki en fazla kopya sayısı
+PARTI_BOYUTU = 500
+
+# Bloklamada kullanılacak en kısa telefon (eksik girilmiş numaralar eşleşmesin)
+TELEFON_EN_AZ_HANE = 7
+
+
+def tc_ozeti(tc_no):
+    """TC kimlik numarasının özeti (numara açıkça karşılaştırılmaz/gösterilmez)"""
+    rakamlar = re.sub(r'\D', '', tc_no or '')
+    if len(rakamlar) != 11:
+        return None
+    return hashlib.sha256(rakamlar.encode()).hexdigest()
+
+
+def _blok_anahtarlari(satir):
+    anahtarlar = []
+    if len(satir['telefon_normal'] or '') >= TELEFON_EN_AZ_HANE:
+        anahtarlar.append(('telefon', satir['telefon_normal']))
+    vergi_no = re.sub(r'\D', '', satir['vergi_no'] or '')
+    if len(vergi_no) >= 10:
+        anahtarlar.append(('vergi_no', vergi_no))
+    ozet = tc_ozeti(satir['tc_no'])
+    if ozet:
+        anahtarlar.append(('tc_no', ozet))
+    return anahtarlar
+
+
+def mukerrer_gruplari(musteriler=None):
+    """
+    Mükerrer müşteri gruplarını bul.
+
+    Her grup {'ana': id, 'kopyalar': [id, ...], 'nedenler': [...]} sözlüğüdür.
+    Ana kayıt aktif olanlar arasından en çok satışı olan, eşitlikte en eski
+    kayıttır.
+    """
+    musteriler = Musteri.objects.all() if musteriler is None else musteriler
+    satirlar = list(musteriler.values(
+        'id', 'telefon_normal', 'vergi_no', 'tc_no', 'aktif', 'istatistik__satis_sayisi',
+    ))
+
+    # Aynı anahtarı paylaşan kayıtlar birleşim-bul ile gruplanır
+    ata = {satir['id']: satir['id'] for satir in satirlar}
+
+    def kok(musteri_id):
+        while ata[musteri_id] != musteri_id:
+            ata[musteri_id] = ata[ata[musteri_id]]
+            musteri_id = ata[musteri_id]
+        return musteri_id
+
+    ilk_sahip = {}
+    nedenler = defaultdict(set)
+    for satir in satirlar:
+        for anahtar in _blok_anahtarlari(satir):
+            if anahtar not in ilk_sahip:
+                ilk_sahip[anahtar] = satir['id']
+                continue
+            a, b = kok(ilk_sahip[anahtar]), kok(satir['id'])
+            if a != b:
+                ata[max(a, b)] = min(a, b)
+            nedenler[satir['id']].add(anahtar[0])
+            nedenler[ilk_sahip[anahtar]].add(anahtar[0])
+
+    uyeler = defaultdict(list)
+    for satir in satirlar:
+        uyeler[kok(satir['id'])].append(satir)
+
+    gruplar = []
+    for grup in uyeler.values():
+        if len(grup) < 2:
+            continue
+        grup.sort(key=lambda satir: (not satir['aktif'], -(satir['istatistik__satis_sayisi'] or 0), satir['id']))
+        gruplar.append({
+            'ana': grup[0]['id'],
+            'kopyalar': [satir['id'] for satir in grup[1:]],
+            'nedenler': sorted(set().union(*(nedenler[satir['id']] for satir in grup))),
+        })
+    gruplar.sort(key=lambda grup: grup['ana'])
+    return gruplar
+
+
+def _yonlendir(model, alan, eslesme):
+    """model.alan'ı kopya → ana eşlemesine göre tek UPDATE ile yeniden yönlendir"""
+    return model._base_manager.filter(**{f'{alan}__in': list(eslesme)}).update(**{
+        alan: Case(
+            *[When(**{f'{alan}_id': kopya}, then=Value(ana)) for kopya, ana in eslesme.items()],
+            output_field=model._meta.get_field(alan).target_field,
+        )
+    })
+
+
+def _parti_birlestir(eslesme):
+    from log.fark import degisiklik_kaydet, kayitli_durum, silme_kaydet
+    from rapor.pano import genel_sayaclari_guncelle
+    from .istatistik import istatistikleri_yeniden_olustur
+
+    anlar = set(eslesme.values())
+    musteriler = {
+        musteri.pk: musteri
+        for musteri in Musteri.objects.select_for_update().filter(pk__in=anlar | set(eslesme)).order_by('pk')
+    }
+    eslesme = {kopya: ana for kopya, ana in eslesme.items() if kopya in musteriler and ana in musteriler}
+    if not eslesme:
+        return 0
+
+    # Ana kayıtta zaten bulunan grup üyelikleri kopyadan taşınmaz
+    uyelikler = set(MusteriGrupUyelik.objects.filter(musteri_id__in=anlar).values_list('musteri_id', 'grup_id'))
+    cakisan = []
+    for uyelik_id, musteri_id, grup_id in MusteriGrupUyelik.objects.filter(
+        musteri_id__in=list(eslesme)
+    ).order_by('musteri_id', 'id').values_list('id', 'musteri_id', 'grup_id'):
+        anahtar = (eslesme[musteri_id], grup_id)
+        if anahtar in uyelikler:
+            cakisan.append(uyelik_id)
+        else:
+            uyelikler.add(anahtar)
+    MusteriGrupUyelik.objects.filter(pk__in=cakisan).delete()
+
+    # Musteri'ye bağlı tüm tablolar küme tabanlı yeniden yönlendirilir
+    for iliski in Musteri._meta.related_objects:
+        if iliski.one_to_one or iliski.related_model in YENIDEN_OLUSTURULAN:
+            continue
+        _yonlendir(iliski.related_model, iliski.field.name, eslesme)
+
+    # Bakiyeler ve notlar ana kayıtlarda toplanır
+    eski_katki, yeni_katki = defaultdict(int), defaultdict(int)
+    for musteri in musteriler.values():
+        for alan, deger in musteri._pano_ozeti().items():
+            eski_katki[alan] += deger
+    degisen = {}
+    denetim_oncesi = {pk: kayitli_durum(musteri) for pk, musteri in musteriler.items()}
+    for kopya_id, ana_id in sorted(eslesme.items()):
+        ana, kopya = musteriler[ana_id], musteriler[kopya_id]
+        ana.acik_hesap_bakiye += kopya.acik_hesap_bakiye
+        ana.acik_hesap_limit = max(ana.acik_hesap_limit, kopya.acik_hesap_limit)
+        ana.notlar = '\n'.join(filter(None, [ana.notlar, f'Birleştirilen müşteri: {kopya} ({kopya.telefon})']))
+        degisen[ana_id] = ana
+    Musteri.objects.bulk_update(list(degisen.values()), ['acik_hesap_bakiye', 'acik_hesap_limit', 'notlar'])
+    Musteri.objects.filter(pk__in=list(eslesme)).delete()
+
+    # bulk_update ve queryset delete Musteri.save/delete'i atlar; farklar burada loglanır
+    for ana_id, ana in degisen.items():
+        degisiklik_kaydet(ana, denetim_oncesi[ana_id])
+    for kopya_id in eslesme:
+        silme_kaydet(musteriler[kopya_id], kopya_id, denetim_oncesi[kopya_id])
+
+    for ana_id in anlar:
+        if ana_id in musteriler:
+            for alan, deger in musteriler[ana_id]._pano_ozeti().items():
+                yeni_katki[alan] += deger
+    genel_sayaclari_guncelle(dict(eski_katki), dict(yeni_katki))
+    istatistikleri_yeniden_olustur(list(anlar))
+    return len(eslesme)
+
+
+def birlestir(gruplar, parti_boyutu=PARTI_BOYUTU):
+    """
+    Müşteri gruplarını ana kayıtlarına birleştir (mukerrer_gruplari çıktısı).
+
+    Tüm partiler tek transaction içinde çalışır. Birleştirilen kopya
+    sayısını döndürür.
+    """
+    eslesme = {
+        kopya: grup['ana']
+        for grup in gruplar
+        for kopya in grup['kopyalar']
+        if kopya != grup['ana']
+    }
+    kopyalar = sorted(eslesme)
+    toplam = 0
+    with transaction.atomic():
+        for i in range(0, len(kopyalar), parti_boyutu):
+            toplam += _parti_birlestir({kopya: eslesme[kopya] for kopya in kopyalar[i:i + parti_boyutu]})
+    return toplam
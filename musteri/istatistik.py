@@ -0,0 +1,132 @@
+"""
+Müşteri istatistikleri (MusteriIstatistik).
+
+Tamamlanmış bir satışın müşteri istatistiklerine katkısı
+(musteri_id, tutar, tarih) üçlüsüdür. Satis.save/delete kaydın önceki ve
+yeni katkısını `satis_istatistigi_guncelle`'ye verir; toplam ve adet F()
+ifadeleriyle, ilk/son satış tarihi Least/Greatest ile atomik olarak
+güncellenir. Katkı geri alındığında (iade, iptal, müşteri değişikliği)
+tarihler sadece o müşterinin satışlarından yeniden okunur.
+"""
+from django.db.models import Count, DateTimeField, F, Max, Min, Sum, Value
+from django.db.models.functions import Coalesce, Greatest, Least
+
+from .models import Musteri, MusteriIstatistik, Tahsilat
+
+
+ALANLAR = ('toplam_satis', 'satis_sayisi', 'ilk_satis_tarihi', 'son_satis_tarihi', 'son_tahsilat_tarihi')
+
+
+def satis_katkisi(satis):
+    """Satışın müşteri istatistiklerine katkısı (yoksa None)"""
+    if satis.durum != 'tamamlandi' or not satis.musteri_id or not satis.satis_tarihi:
+        return None
+    return (satis.musteri_id, satis.toplam_tutar, satis.satis_tarihi)
+
+
+def kayitli_satis_katkisi(satis):
+    """Satışın veritabanındaki halinin katkısı (yeni kayıtlar için None)"""
+    if hasattr(satis, '_istatistik_onceki'):
+        return satis._istatistik_onceki
+    if satis._state.adding or satis.pk is None:
+        return None
+    kayitli = type(satis)._base_manager.filter(pk=satis.pk).first()
+    return satis_katkisi(kayitli) if kayitli else None
+
+
+def _satis_ekle(musteri_id, tutar, tarih):
+    tarih_degeri = Value(tarih, output_field=DateTimeField())
+    guncellendi = MusteriIstatistik.objects.filter(musteri_id=musteri_id).update(
+        toplam_satis=F('toplam_satis') + tutar,
+        satis_sayisi=F('satis_sayisi') + 1,
+        ilk_satis_tarihi=Least(Coalesce('ilk_satis_tarihi', tarih_degeri), tarih_degeri),
+        son_satis_tarihi=Greatest(Coalesce('son_satis_tarihi', tarih_degeri), tarih_degeri),
+    )
+    if not guncellendi:
+        # Kayıt hiç oluşturulmamış: satışlardan hesapla (bu satış dahil)
+        istatistikleri_yeniden_olustur([musteri_id])
+
+
+def _satis_cikar(musteri_id, tutar):
+    from satis.models import Satis
+
+    tarihler = Satis.objects.filter(
+        musteri_id=musteri_id, durum='tamamlandi', satis_tarihi__isnull=False
+    ).aggregate(ilk=Min('satis_tarihi'), son=Max('satis_tarihi'))
+    guncellendi = MusteriIstatistik.objects.filter(musteri_id=musteri_id).update(
+        toplam_satis=F('toplam_satis') - tutar,
+        satis_sayisi=F('satis_sayisi') - 1,
+        ilk_satis_tarihi=tarihler['ilk'],
+        son_satis_tarihi=tarihler['son'],
+    )
+    if not guncellendi:
+        istatistikleri_yeniden_olustur([musteri_id])
+
+
+def satis_istatistigi_guncelle(eski, yeni):
+    """Bir satışın müşteri istatistiklerine katkısı eski'den yeni'ye değişti"""
+    if eski == yeni:
+        return
+    if eski:
+        _satis_cikar(eski[0], eski[1])
+    if yeni:
+        _satis_ekle(*yeni)
+
+
+def tahsilat_istatistigi_guncelle(musteri_id):
+    """Müşterinin son tahsilat tarihini tahsilatlarından yeniden oku"""
+    son = Tahsilat.objects.filter(
+        musteri_id=musteri_id, durum='tahsil_edildi'
+    ).aggregate(son=Max('tahsilat_tarihi'))['son']
+    if not MusteriIstatistik.objects.filter(musteri_id=musteri_id).update(son_tahsilat_tarihi=son):
+        istatistikleri_yeniden_olustur([musteri_id])
+
+
+def istatistikleri_yeniden_olustur(musteri_idleri=None):
+    """
+    İstatistikleri satış ve tahsilat tablolarından gruplu sorgularla hesapla.
+
+    `musteri_idleri` verilmezse tüm müşteriler hesaplanır. Hesaplanan
+    müşteri sayısını döndürür.
+    """
+    from satis.models import Satis
+
+    musteriler = Musteri.objects.all()
+    satislar = Satis.objects.filter(durum='tamamlandi', musteri__isnull=False, satis_tarihi__isnull=False)
+    tahsilatlar = Tahsilat.objects.filter(durum='tahsil_edildi')
+    if musteri_idleri is not None:
+        musteriler = musteriler.filter(pk__in=musteri_idleri)
+        satislar = satislar.filter(musteri_id__in=musteri_idleri)
+        tahsilatlar = tahsilatlar.filter(musteri_id__in=musteri_idleri)
+
+    satis_ozetleri = {
+        satir['musteri_id']: satir
+        for satir in satislar.values('musteri_id').annotate(
+            toplam=Sum('toplam_tutar'), adet=Count('id'),
+            ilk=Min('satis_tarihi'), son=Max('satis_tarihi'),
+        )
+    }
+    son_tahsilatlar = dict(
+        tahsilatlar.values('musteri_id').annotate(son=Max('tahsilat_tarihi')).values_list('musteri_id', 'son')
+    )
+
+    kayitlar = []
+    for musteri_id in musteriler.values_list('pk', flat=True).iterator():
+        ozet = satis_ozetleri.get(musteri_id, {})
+        kayitlar.append(MusteriIstatistik(
+            musteri_id=musteri_id,
+            toplam_satis=ozet.get('toplam') or 0,
+            satis_sayisi=ozet.get('adet', 0),
+            ilk_satis_tarihi=ozet.get('ilk'),
+            son_satis_tarihi=ozet.get('son'),
+            son_tahsilat_tarihi=son_tahsilatlar.get(musteri_id),
+        ))
+
+    MusteriIstatistik.objects.bulk_create(
+        kayitlar,
+        batch_size=500,
+        update_conflicts=True,
+        unique_fields=['musteri'],
+        update_fields=list(ALANLAR),
+    )
+    return len(kayitlar)
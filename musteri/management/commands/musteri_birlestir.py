@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+
+from musteri.birlestirme import PARTI_BOYUTU, birlestir, mukerrer_gruplari
+
+
+class Command(BaseCommand):
+    help = 'Mükerrer müşterileri (telefon, vergi no, TC kimlik no) bulur ve --uygula verilirse birleştirir'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--uygula',
+            action='store_true',
+            help='Bulunan grupları birleştir (verilmezse sadece listelenir)',
+        )
+        parser.add_argument(
+            '--parti',
+            type=int,
+            default=PARTI_BOYUTU,
+            help=f'Tek sorguda birleştirilecek kopya sayısı (varsayılan {PARTI_BOYUTU})',
+        )
+
+    def handle(self, *args, **options):
+        gruplar = mukerrer_gruplari()
+        kopya_sayisi = sum(len(grup['kopyalar']) for grup in gruplar)
+
+        for grup in gruplar:
+            self.stdout.write(
+                f"#{grup['ana']} <- {', '.join(f'#{kopya}' for kopya in grup['kopyalar'])} "
+                f"({', '.join(grup['nedenler'])})"
+            )
+
+        if not options['uygula']:
+            self.stdout.write(f'{len(gruplar)} grup, {kopya_sayisi} mükerrer kayıt bulundu (birleştirmek için --uygula)')
+            return
+
+        birlesen = birlestir(gruplar, parti_boyutu=options['parti'])
+        self.stdout.write(
+            self.style.SUCCESS(f'{len(gruplar)} grupta {birlesen} müşteri birleştirildi')
+        )
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from musteri.istatistik import istatistikleri_yeniden_olustur
+
+
+class Command(BaseCommand):
+    help = 'Müşteri istatistiklerini satış ve tahsilat kayıtlarından yeniden hesaplar'
+
+    def handle(self, *args, **options):
+        musteri_sayisi = istatistikleri_yeniden_olustur()
+        self.stdout.write(
+            self.style.SUCCESS(f'Müşteri istatistikleri yeniden oluşturuldu ({musteri_sayisi} müşteri)')
+        )
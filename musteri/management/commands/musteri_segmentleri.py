@@ -0,0 +1,49 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from musteri.segment import SEGMENT_ADLARI, segmentleri_hesapla, son_hesaplama
+
+
+class Command(BaseCommand):
+    help = 'Müşterilerin RFM skorlarını ve segmentlerini hesaplar (zamanlanmış görev olarak çalıştırılabilir)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--gun',
+            type=int,
+            default=None,
+            help='Sadece son bu kadar günün satışlarını say (varsayılan: tüm satışlar)',
+        )
+        parser.add_argument(
+            '--gruplari-esitle',
+            action='store_true',
+            help='Her segment için "RFM: ..." müşteri grubu üyeliklerini eşitle',
+        )
+        parser.add_argument(
+            '--zamanlanmis',
+            action='store_true',
+            help='Son hesaplama --aralik günden yeniyse hiçbir şey yapma (cron her gün çalıştırabilir)',
+        )
+        parser.add_argument(
+            '--aralik',
+            type=int,
+            default=7,
+            help='--zamanlanmis için hesaplama aralığı (gün, varsayılan 7)',
+        )
+
+    def handle(self, *args, **options):
+        if options['zamanlanmis']:
+            son = son_hesaplama()
+            if son and timezone.now() - son < timedelta(days=options['aralik']):
+                self.stdout.write(f'Segmentler {timezone.localtime(son).strftime("%d.%m.%Y %H:%M")} tarihinde hesaplanmış, atlandı')
+                return
+
+        sayilar = segmentleri_hesapla(options['gun'], gruplari_esitle=options['gruplari_esitle'])
+
+        for kod, ad in SEGMENT_ADLARI.items():
+            self.stdout.write(f'{ad}: {sayilar.get(kod, 0)}')
+        self.stdout.write(
+            self.style.SUCCESS(f'{sum(sayilar.values())} müşterinin segmenti hesaplandı')
+        )
@@ -0,0 +1,82 @@
+# Generated by Django 5.2.5 on 2026-10-19 13:16
+
+import django.db.models.deletion
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def acik_kalemleri_doldur(apps, schema_editor):
+    """Mevcut açık hesap ödemelerinden kalemleri oluştur, bakiyeye göre FIFO kapat"""
+    AcikKalem = apps.get_model('musteri', 'AcikKalem')
+    Musteri = apps.get_model('musteri', 'Musteri')
+    Odeme = apps.get_model('satis', 'Odeme')
+
+    simdi = timezone.now()
+    musteri_kalemleri = defaultdict(list)
+    for odeme in Odeme.objects.filter(
+        odeme_tipi='acik_hesap', satis__musteri__isnull=False
+    ).select_related('satis').order_by('satis__satis_tarihi', 'id').iterator():
+        musteri_kalemleri[odeme.satis.musteri_id].append(AcikKalem(
+            musteri_id=odeme.satis.musteri_id,
+            satis_id=odeme.satis_id,
+            odeme_id=odeme.id,
+            tarih=odeme.satis.satis_tarihi or odeme.odeme_tarihi or simdi,
+            tutar=odeme.tutar,
+            kalan_tutar=odeme.tutar,
+        ))
+
+    bakiyeler = dict(Musteri.objects.filter(pk__in=musteri_kalemleri).values_list('id', 'acik_hesap_bakiye'))
+    for musteri_id, kalemler in musteri_kalemleri.items():
+        # Açık kalemlerin toplamı mevcut borca eşit olana kadar eskiler kapanır
+        odenen = sum((kalem.tutar for kalem in kalemler), Decimal('0')) - max(Decimal('0'), bakiyeler[musteri_id])
+        for kalem in kalemler:
+            if odenen <= 0:
+                break
+            kapanan = min(odenen, kalem.tutar)
+            kalem.kalan_tutar = kalem.tutar - kapanan
+            if kalem.kalan_tutar == 0:
+                kalem.kapanma_tarihi = simdi
+            odenen -= kapanan
+        AcikKalem.objects.bulk_create(kalemler, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('musteri', '0001_initial'),
+        ('satis', '0005_auto_20250906_1350'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AcikKalem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tarih', models.DateTimeField(verbose_name='Tarih')),
+                ('tutar', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='Tutar')),
+                ('kalan_tutar', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='Kalan Tutar')),
+                ('kapanma_tarihi', models.DateTimeField(blank=True, null=True, verbose_name='Kapanma Tarihi')),
+                ('musteri', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='acik_kalemler', to='musteri.musteri', verbose_name='Müşteri')),
+                ('odeme', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='acik_kalem', to='satis.odeme', verbose_name='Ödeme')),
+                ('satis', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='acik_kalemler', to='satis.satis', verbose_name='Satış')),
+            ],
+            options={
+                'verbose_name': 'Açık Kalem',
+                'verbose_name_plural': 'Açık Kalemler',
+                'ordering': ['tarih', 'id'],
+            },
+        ),
+        migrations.AddField(
+            model_name='tahsilatdetay',
+            name='acik_kalem',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='tahsilat_detaylari', to='musteri.acikkalem', verbose_name='Açık Kalem'),
+        ),
+        migrations.AddIndex(
+            model_name='acikkalem',
+            index=models.Index(condition=models.Q(('kalan_tutar__gt', 0)), fields=['musteri', 'tarih'], name='musteri_acikkalem_acik_idx'),
+        ),
+        migrations.RunPython(acik_kalemleri_doldur, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 5.2.5 on 2026-10-19 13:19
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Max, Min, Sum
+
+
+def istatistikleri_doldur(apps, schema_editor):
+    """Mevcut satış ve tahsilatlardan müşteri istatistiklerini hesapla"""
+    Musteri = apps.get_model('musteri', 'Musteri')
+    MusteriIstatistik = apps.get_model('musteri', 'MusteriIstatistik')
+    Tahsilat = apps.get_model('musteri', 'Tahsilat')
+    Satis = apps.get_model('satis', 'Satis')
+
+    satis_ozetleri = {
+        satir['musteri_id']: satir
+        for satir in Satis.objects.filter(
+            durum='tamamlandi', musteri__isnull=False, satis_tarihi__isnull=False
+        ).values('musteri_id').annotate(
+            toplam=Sum('toplam_tutar'), adet=Count('id'),
+            ilk=Min('satis_tarihi'), son=Max('satis_tarihi'),
+        )
+    }
+    son_tahsilatlar = dict(
+        Tahsilat.objects.filter(durum='tahsil_edildi').values('musteri_id').annotate(
+            son=Max('tahsilat_tarihi')
+        ).values_list('musteri_id', 'son')
+    )
+
+    kayitlar = []
+    for musteri_id in Musteri.objects.values_list('pk', flat=True).iterator():
+        ozet = satis_ozetleri.get(musteri_id, {})
+        kayitlar.append(MusteriIstatistik(
+            musteri_id=musteri_id,
+            toplam_satis=ozet.get('toplam') or 0,
+            satis_sayisi=ozet.get('adet', 0),
+            ilk_satis_tarihi=ozet.get('ilk'),
+            son_satis_tarihi=ozet.get('son'),
+            son_tahsilat_tarihi=son_tahsilatlar.get(musteri_id),
+        ))
+    MusteriIstatistik.objects.bulk_create(kayitlar, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('musteri', '0002_acikkalem_tahsilatdetay_acik_kalem_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MusteriIstatistik',
+            fields=[
+                ('musteri', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='istatistik', serialize=False, to='musteri.musteri', verbose_name='Müşteri')),
+                ('toplam_satis', models.DecimalField(decimal_places=2, default=0, max_digits=15, verbose_name='Toplam Satış')),
+                ('satis_sayisi', models.IntegerField(default=0, verbose_name='Satış Sayısı')),
+                ('ilk_satis_tarihi', models.DateTimeField(blank=True, null=True, verbose_name='İlk Satış Tarihi')),
+                ('son_satis_tarihi', models.DateTimeField(blank=True, null=True, verbose_name='Son Satış Tarihi')),
+                ('son_tahsilat_tarihi', models.DateTimeField(blank=True, null=True, verbose_name='Son Tahsilat Tarihi')),
+            ],
+            options={
+                'verbose_name': 'Müşteri İstatistiği',
+                'verbose_name_plural': 'Müşteri İstatistikleri',
+            },
+        ),
+        migrations.RunPython(istatistikleri_doldur, migrations.RunPython.noop),
+    ]
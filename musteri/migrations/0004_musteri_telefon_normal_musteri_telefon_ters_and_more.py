@@ -0,0 +1,72 @@
+# Generated by Django 5.2.5 on 2026-10-19 13:21
+
+import re
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+_TURKCE_KUCUK = str.maketrans({'İ': 'i', 'I': 'ı'})
+_ASCII = str.maketrans('ıışğüöçâîû', 'iisguocaiu')
+
+
+def _telefon_normal(telefon):
+    rakamlar = re.sub(r'\D', '', telefon or '').lstrip('0')
+    if len(rakamlar) == 12 and rakamlar.startswith('90'):
+        rakamlar = rakamlar[2:]
+    return rakamlar
+
+
+def arama_indeksini_doldur(apps, schema_editor):
+    """Mevcut müşterilerin normal telefonlarını ve arama terimlerini oluştur"""
+    Musteri = apps.get_model('musteri', 'Musteri')
+    MusteriAramaTerimi = apps.get_model('musteri', 'MusteriAramaTerimi')
+
+    musteriler = []
+    terimler = []
+    for musteri in Musteri.objects.only('id', 'ad', 'soyad', 'firma_adi', 'telefon').iterator():
+        musteri.telefon_normal = _telefon_normal(musteri.telefon)
+        musteri.telefon_ters = musteri.telefon_normal[::-1]
+        musteriler.append(musteri)
+        metin = ' '.join(filter(None, [musteri.ad, musteri.soyad, musteri.firma_adi]))
+        kelimeler = re.findall(r'\w+', metin.translate(_TURKCE_KUCUK).lower().translate(_ASCII))
+        terimler.extend(
+            MusteriAramaTerimi(musteri_id=musteri.id, terim=terim[:100])
+            for terim in dict.fromkeys(kelimeler)
+        )
+    Musteri.objects.bulk_update(musteriler, ['telefon_normal', 'telefon_ters'], batch_size=500)
+    MusteriAramaTerimi.objects.bulk_create(terimler, batch_size=500, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('musteri', '0003_musteriistatistik'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='musteri',
+            name='telefon_normal',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=20, verbose_name='Telefon (Normal)'),
+        ),
+        migrations.AddField(
+            model_name='musteri',
+            name='telefon_ters',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=20, verbose_name='Telefon (Ters)'),
+        ),
+        migrations.CreateModel(
+            name='MusteriAramaTerimi',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('terim', models.CharField(db_index=True, max_length=100, verbose_name='Terim')),
+                ('musteri', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='arama_terimleri', to='musteri.musteri', verbose_name='Müşteri')),
+            ],
+            options={
+                'verbose_name': 'Müşteri Arama Terimi',
+                'verbose_name_plural': 'Müşteri Arama Terimleri',
+                'unique_together': {('musteri', 'terim')},
+            },
+        ),
+        migrations.RunPython(arama_indeksini_doldur, migrations.RunPython.noop),
+    ]
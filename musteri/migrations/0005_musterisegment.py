@@ -0,0 +1,32 @@
+# Generated by Django 5.2.5 on 2026-10-19 13:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('musteri', '0004_musteri_telefon_normal_musteri_telefon_ters_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MusteriSegment',
+            fields=[
+                ('musteri', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='segment', serialize=False, to='musteri.musteri', verbose_name='Müşteri')),
+                ('son_satis_tarihi', models.DateTimeField(blank=True, null=True, verbose_name='Son Satış Tarihi')),
+                ('satis_sayisi', models.IntegerField(default=0, verbose_name='Satış Sayısı')),
+                ('toplam_satis', models.DecimalField(decimal_places=2, default=0, max_digits=15, verbose_name='Toplam Satış')),
+                ('r_skor', models.PositiveSmallIntegerField(default=0, verbose_name='Yenilik Skoru')),
+                ('f_skor', models.PositiveSmallIntegerField(default=0, verbose_name='Sıklık Skoru')),
+                ('m_skor', models.PositiveSmallIntegerField(default=0, verbose_name='Parasal Skor')),
+                ('segment', models.CharField(db_index=True, max_length=30, verbose_name='Segment')),
+                ('hesaplanma_tarihi', models.DateTimeField(verbose_name='Hesaplanma Tarihi')),
+            ],
+            options={
+                'verbose_name': 'Müşteri Segmenti',
+                'verbose_name_plural': 'Müşteri Segmentleri',
+            },
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.5 on 2026-10-19 14:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('musteri', '0005_musterisegment'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SegmentHesaplama',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tarih', models.DateTimeField(verbose_name='Hesaplanma Tarihi')),
+                ('musteri_sayisi', models.IntegerField(default=0, verbose_name='Müşteri Sayısı')),
+                ('degisen_sayisi', models.IntegerField(default=0, verbose_name='Değişen Kayıt Sayısı')),
+            ],
+            options={
+                'verbose_name': 'Segment Hesaplaması',
+                'verbose_name_plural': 'Segment Hesaplamaları',
+            },
+        ),
+    ]
@@ -9,6 +9,9 @@ class Musteri(models.Model):
     ad = models.CharField(max_length=100, verbose_name="Ad")
     soyad = models.CharField(max_length=100, verbose_name="Soyad")
     telefon = models.CharField(max_length=20, unique=True, verbose_name="Telefon")
+    # Arama için rakamlardan oluşan ulusal biçim ve tersi (son hanelerden arama)
+    telefon_normal = models.CharField(max_length=20, blank=True, default='', db_index=True, editable=False, verbose_name="Telefon (Normal)")
+    telefon_ters = models.CharField(max_length=20, blank=True, default='', db_index=True, editable=False, verbose_name="Telefon (Ters)")
     email = models.EmailField(blank=True, null=True, verbose_name="E-posta")
     
     # Adres bilgileri
@@ -60,6 +63,62 @@ class Musteri(models.Model):
             return f"{self.firma_adi} ({self.ad} {self.soyad})"
         return f"{self.ad} {self.soyad}"
 
+    def save(self, *args, **kwargs):
+        from rapor.pano import kayitli_ozet, genel_sayaclari_guncelle
+        from .arama import arama_indeksini_guncelle, musteri_terimleri, telefon_normal
+        self.telefon_normal = telefon_normal(self.telefon)
+        self.telefon_ters = self.telefon_normal[::-1]
+        
+        from log.fark import kayitli_durum, degisiklik_kaydet
+        eski = kayitli_ozet(self)
+        eski_durum = kayitli_durum(self)
+        ilk_kayit = self._state.adding
+        super().save(*args, **kwargs)
+        genel_sayaclari_guncelle(eski, self._pano_ozeti())
+        self._pano_onceki = self._pano_ozeti()
+        degisiklik_kaydet(self, eski_durum)
+        
+        # Ad/soyad/firma değiştiyse arama terimleri yenilenir
+        terimler = musteri_terimleri(self)
+        if getattr(self, '_arama_terimleri', None) != terimler:
+            arama_indeksini_guncelle(self)
+            self._arama_terimleri = terimler
+        
+        # Yeni müşterinin istatistik kaydı boş olarak açılır
+        if ilk_kayit:
+            self.istatistik = MusteriIstatistik.objects.get_or_create(musteri=self)[0]
+
+    def delete(self, *args, **kwargs):
+        from rapor.pano import kayitli_ozet, genel_sayaclari_guncelle
+        from log.fark import kayitli_durum, silme_kaydet
+        eski = kayitli_ozet(self)
+        eski_durum, pk = kayitli_durum(self), self.pk
+        sonuc = super().delete(*args, **kwargs)
+        genel_sayaclari_guncelle(eski, None)
+        silme_kaydet(self, pk, eski_durum)
+        return sonuc
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        from rapor.pano import ozet_sakla
+        from log.fark import onceki_durumu_sakla
+        ozet_sakla(instance, ('aktif', 'acik_hesap_bakiye'))
+        onceki_durumu_sakla(instance, field_names, values)
+        if not instance.get_deferred_fields() & {'ad', 'soyad', 'firma_adi'}:
+            from .arama import musteri_terimleri
+            instance._arama_terimleri = musteri_terimleri(instance)
+        return instance
+
+    def _pano_ozeti(self):
+        """Müşterinin genel dashboard sayaçlarına katkısı (borç = açık alacak)"""
+        from decimal import Decimal
+        bakiye = Decimal(str(self.acik_hesap_bakiye or 0))
+        return {
+            'musteri_sayisi': 1 if self.aktif else 0,
+            'acik_alacak': max(Decimal('0'), bakiye),
+        }
+
     @property
     def tam_ad(self):
         """Tam ad"""
@@ -79,25 +138,31 @@ class Musteri(models.Model):
             adres_parts.append(self.posta_kodu)
         return ", ".join(adres_parts)
 
+    @property
+    def istatistikler(self):
+        """Müşterinin istatistik kaydı (yoksa satışlardan hesaplanır)"""
+        try:
+            return self.istatistik
+        except MusteriIstatistik.DoesNotExist:
+            from .istatistik import istatistikleri_yeniden_olustur
+            istatistikleri_yeniden_olustur([self.pk])
+            self.istatistik = MusteriIstatistik.objects.get(musteri=self)
+            return self.istatistik
+
     @property
     def toplam_satis_tutari(self):
         """Bu müşterinin toplam satış tutarı"""
-        from satis.models import Satis
-        satislar = Satis.objects.filter(musteri=self, durum='tamamlandi')
-        return sum([satis.toplam_tutar for satis in satislar])
+        return self.istatistikler.toplam_satis
 
     @property
     def satis_sayisi(self):
         """Bu müşterinin toplam satış sayısı"""
-        from satis.models import Satis
-        return Satis.objects.filter(musteri=self, durum='tamamlandi').count()
+        return self.istatistikler.satis_sayisi
 
     @property
     def son_satis_tarihi(self):
         """Son satış tarihi"""
-        from satis.models import Satis
-        son_satis = Satis.objects.filter(musteri=self, durum='tamamlandi').first()
-        return son_satis.satis_tarihi if son_satis else None
+        return self.istatistikler.son_satis_tarihi
     
     @property 
     def toplam_borc(self):
@@ -107,24 +172,18 @@ class Musteri(models.Model):
     @property
     def veresiye_satislar(self):
         """Ödenmemiş veresiye satışları"""
-        from satis.models import Satis, Odeme
-        
-        # Açık hesap ödemesi olan satışları bul
-        acik_hesap_satis_ids = Odeme.objects.filter(
-            odeme_tipi='acik_hesap'
-        ).values_list('satis_id', flat=True)
+        from satis.models import Satis
         
         return Satis.objects.filter(
-            id__in=acik_hesap_satis_ids,
-            musteri=self,
+            acik_kalemler__musteri=self,
+            acik_kalemler__kalan_tutar__gt=0,
             durum='tamamlandi'
-        )
+        ).distinct()
     
     @property
     def son_tahsilat_tarihi(self):
         """Son tahsilat tarihi"""
-        son_tahsilat = self.tahsilat_set.filter(durum='tahsil_edildi').first()
-        return son_tahsilat.tahsilat_tarihi if son_tahsilat else None
+        return self.istatistikler.son_tahsilat_tarihi
     
     def borc_hareket_ekle(self, tutar, aciklama, satis_id=None, user=None):
         """Borç hareketi ekle"""
@@ -161,6 +220,97 @@ class Musteri(models.Model):
         )
 
 
+class MusteriAramaTerimi(models.Model):
+    """Müşteri arama indeksi - ad, soyad ve firma adının normalleştirilmiş kelimeleri (bkz. musteri.arama)"""
+    musteri = models.ForeignKey(Musteri, on_delete=models.CASCADE, related_name='arama_terimleri', verbose_name="Müşteri")
+    terim = models.CharField(max_length=100, db_index=True, verbose_name="Terim")
+    
+    class Meta:
+        verbose_name = "Müşteri Arama Terimi"
+        verbose_name_plural = "Müşteri Arama Terimleri"
+        unique_together = ['musteri', 'terim']
+    
+    def __str__(self):
+        return f"{self.musteri_id} - {self.terim}"
+
+
+class MusteriIstatistik(models.Model):
+    """
+    Müşteri satış/tahsilat istatistikleri.
+    
+    Satış tamamlandığında, iade/iptal edildiğinde ve tahsilat yapıldığında
+    artımlı olarak güncellenir (bkz. musteri.istatistik); müşteri ekranları
+    satış tablosuna dokunmadan bu kaydı okur. Kayıt dışı toplu işlemlerden
+    sonra `musteri_istatistiklerini_olustur` komutuyla yeniden hesaplanabilir.
+    """
+    musteri = models.OneToOneField(Musteri, on_delete=models.CASCADE, primary_key=True, related_name='istatistik', verbose_name="Müşteri")
+    toplam_satis = models.DecimalField(max_digits=15, decimal_places=2, default=0, verbose_name="Toplam Satış")
+    satis_sayisi = models.IntegerField(default=0, verbose_name="Satış Sayısı")
+    ilk_satis_tarihi = models.DateTimeField(null=True, blank=True, verbose_name="İlk Satış Tarihi")
+    son_satis_tarihi = models.DateTimeField(null=True, blank=True, verbose_name="Son Satış Tarihi")
+    son_tahsilat_tarihi = models.DateTimeField(null=True, blank=True, verbose_name="Son Tahsilat Tarihi")
+    
+    class Meta:
+        verbose_name = "Müşteri İstatistiği"
+        verbose_name_plural = "Müşteri İstatistikleri"
+    
+    def __str__(self):
+        return f"{self.musteri} - {self.satis_sayisi} satış, {self.toplam_satis}₺"
+    
+    @property
+    def ortalama_sepet(self):
+        """Satış başına ortalama tutar"""
+        if not self.satis_sayisi:
+            return 0
+        return self.toplam_satis / self.satis_sayisi
+
+
+class MusteriSegment(models.Model):
+    """
+    Müşterinin RFM (yenilik, sıklık, parasal) skorları ve segmenti.
+    
+    `musteri_segmentleri` komutuyla toplu olarak hesaplanır (bkz. musteri.segment).
+    """
+    musteri = models.OneToOneField(Musteri, on_delete=models.CASCADE, primary_key=True, related_name='segment', verbose_name="Müşteri")
+    son_satis_tarihi = models.DateTimeField(null=True, blank=True, verbose_name="Son Satış Tarihi")
+    satis_sayisi = models.IntegerField(default=0, verbose_name="Satış Sayısı")
+    toplam_satis = models.DecimalField(max_digits=15, decimal_places=2, default=0, verbose_name="Toplam Satış")
+    r_skor = models.PositiveSmallIntegerField(default=0, verbose_name="Yenilik Skoru")
+    f_skor = models.PositiveSmallIntegerField(default=0, verbose_name="Sıklık Skoru")
+    m_skor = models.PositiveSmallIntegerField(default=0, verbose_name="Parasal Skor")
+    segment = models.CharField(max_length=30, db_index=True, verbose_name="Segment")
+    hesaplanma_tarihi = models.DateTimeField(verbose_name="Hesaplanma Tarihi")
+    
+    class Meta:
+        verbose_name = "Müşteri Segmenti"
+        verbose_name_plural = "Müşteri Segmentleri"
+    
+    def __str__(self):
+        return f"{self.musteri} - {self.get_segment_display()} ({self.rfm_skoru})"
+    
+    @property
+    def rfm_skoru(self):
+        return f"{self.r_skor}{self.f_skor}{self.m_skor}"
+    
+    def get_segment_display(self):
+        from .segment import SEGMENT_ADLARI
+        return SEGMENT_ADLARI.get(self.segment, self.segment)
+
+
+class SegmentHesaplama(models.Model):
+    """Son RFM segment hesaplamasının zamanı (tek kayıt, bkz. musteri.segment)"""
+    tarih = models.DateTimeField(verbose_name="Hesaplanma Tarihi")
+    musteri_sayisi = models.IntegerField(default=0, verbose_name="Müşteri Sayısı")
+    degisen_sayisi = models.IntegerField(default=0, verbose_name="Değişen Kayıt Sayısı")
+    
+    class Meta:
+        verbose_name = "Segment Hesaplaması"
+        verbose_name_plural = "Segment Hesaplamaları"
+    
+    def __str__(self):
+        return f"Segment hesaplaması - {self.tarih:%d.%m.%Y %H:%M}"
+
+
 class MusteriGruplar(models.Model):
     """Müşteri grupları (VIP, Toptan, vb.)"""
     ad = models.CharField(max_length=100, unique=True, verbose_name="Grup Adı")
@@ -260,11 +410,43 @@ class Tahsilat(models.Model):
             self.musteri.save()
         
         super().save(*args, **kwargs)
+        
+        from .istatistik import tahsilat_istatistigi_guncelle
+        tahsilat_istatistigi_guncelle(self.musteri_id)
+
+
+class AcikKalem(models.Model):
+    """
+    Açık hesap (veresiye) satıştan doğan alacak kalemi.
+    
+    Açık hesap ödemesi kaydedildiğinde oluşur; tahsilatlar TahsilatDetay ile
+    kalemlere dağıtıldıkça kalan tutar azalır (bkz. musteri.alacak).
+    """
+    musteri = models.ForeignKey(Musteri, on_delete=models.CASCADE, related_name='acik_kalemler', verbose_name="Müşteri")
+    satis = models.ForeignKey('satis.Satis', on_delete=models.CASCADE, related_name='acik_kalemler', verbose_name="Satış")
+    odeme = models.OneToOneField('satis.Odeme', on_delete=models.CASCADE, related_name='acik_kalem', verbose_name="Ödeme")
+    tarih = models.DateTimeField(verbose_name="Tarih")
+    tutar = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="Tutar")
+    kalan_tutar = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="Kalan Tutar")
+    kapanma_tarihi = models.DateTimeField(null=True, blank=True, verbose_name="Kapanma Tarihi")
+    
+    class Meta:
+        verbose_name = "Açık Kalem"
+        verbose_name_plural = "Açık Kalemler"
+        ordering = ['tarih', 'id']
+        indexes = [
+            # Müşterinin açık kalemleri (FIFO sırasıyla) doğrudan okunur
+            models.Index(fields=['musteri', 'tarih'], condition=models.Q(kalan_tutar__gt=0), name='musteri_acikkalem_acik_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.musteri} - {self.tutar}₺ (kalan {self.kalan_tutar}₺)"
 
 
 class TahsilatDetay(models.Model):
     """Tahsilat hangi satışlara ait"""
     tahsilat = models.ForeignKey(Tahsilat, on_delete=models.CASCADE, related_name='detaylar', verbose_name="Tahsilat")
+    acik_kalem = models.ForeignKey(AcikKalem, on_delete=models.SET_NULL, null=True, blank=True, related_name='tahsilat_detaylari', verbose_name="Açık Kalem")
     satis_id = models.PositiveIntegerField(verbose_name="Satış ID")
     odenen_tutar = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="Ödenen Tutar")
     
@@ -0,0 +1,240 @@
+"""
+Müşteri RFM segmentasyonu.
+
+Her müşteri için son satıştan beri geçen gün (R), satış sayısı (F) ve
+toplam satış tutarı (M) tek gruplu sorguyla okunur. Her ölçüt, tüm
+müşterilerin sıralı değerleri üzerinde ikili aramayla 1-5 arası beşliklere
+ayrılır (eşit değerler aynı skoru alır); skorlardan segment belirlenir.
+MusteriSegment tablosuna sadece değişen kayıtlar toplu upsert ile yazılır;
+kaydın hesaplanma tarihi değerlerinin son değiştiği hesaplamadır. Son
+hesaplamanın zamanı tek satırlık SegmentHesaplama kaydında tutulur
+(`son_hesaplama`). İstenirse her segment için "RFM: ..." müşteri grubu
+tutulur ve grup üyelikleri eşitlenir.
+"""
+from bisect import bisect_left
+from collections import Counter
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Avg, Count, Max, Sum
+from django.utils import timezone
+
+from .models import Musteri, MusteriGruplar, MusteriGrupUyelik, MusteriSegment, SegmentHesaplama
+
+
+BESLIK = 5
+
+# Satışı olmayan müşterilerin segmenti
+ALISVERIS_YOK = 'alisveris_yok'
+
+# (kod, ad, koşul) - ilk uyan segment seçilir
+SEGMENTLER = (
+    ('sampiyon', 'Şampiyonlar', lambda r, f, m: r >= 4 and f >= 4 and m >= 4),
+    ('sadik', 'Sadık Müşteriler', lambda r, f, m: r >= 3 and f >= 4),
+    ('kaybedilmemeli', 'Kaybedilmemeli', lambda r, f, m: r <= 2 and f >= 4 and m >= 4),
+    ('risk_altinda', 'Risk Altında', lambda r, f, m: r <= 2 and f >= 3),
+    ('yeni', 'Yeni Müşteriler', lambda r, f, m: r >= 4 and f == 1),
+    ('potansiyel', 'Potansiyel Sadık', lambda r, f, m: r >= 4),
+    ('ilgi_bekleyen', 'İlgi Bekleyen', lambda r, f, m: r == 3),
+    ('kayip', 'Kayıp', lambda r, f, m: r == 1 and f == 1),
+    ('uykuda', 'Uykuda', lambda r, f, m: True),
+)
+
+SEGMENT_ADLARI = dict([(kod, ad) for kod, ad, _ in SEGMENTLER] + [(ALISVERIS_YOK, 'Alışveriş Yok')])
+
+# Segment grupları bu önekle adlandırılır
+GRUP_ONEKI = 'RFM: '
+
+# SegmentHesaplama tek kaydının birincil anahtarı
+HESAPLAMA_PK = 1
+
+
+def beslik_skorlari(degerler):
+    """
+    Değerlerin 1-5 arası beşlik skorları (büyük değer yüksek skor).
+
+    Skor, değerden küçük olanların oranına göre verilir; eşit değerler
+    aynı skoru alır.
+    """
+    sirali = sorted(degerler)
+    adet = len(sirali)
+    return [1 + bisect_left(sirali, deger) * BESLIK // adet for deger in degerler]
+
+
+def segment_bul(r, f, m):
+    for kod, _ad, kosul in SEGMENTLER:
+        if kosul(r, f, m):
+            return kod
+    return SEGMENTLER[-1][0]
+
+
+def rfm_verisi(gun_sayisi=None, simdi=None):
+    """
+    Müşterilerin RFM ölçütleri ve skorları.
+
+    `gun_sayisi` verilirse sadece son o kadar günün satışları sayılır.
+    {musteri_id: (son_satis_tarihi, adet, toplam, r, f, m, segment)} döndürür.
+    """
+    from satis.models import Satis
+
+    simdi = simdi or timezone.now()
+    satislar = Satis.objects.filter(durum='tamamlandi', musteri__isnull=False, satis_tarihi__isnull=False)
+    if gun_sayisi:
+        satislar = satislar.filter(satis_tarihi__gte=simdi - timedelta(days=gun_sayisi))
+
+    satirlar = list(
+        satislar.order_by().values('musteri_id').annotate(
+            son=Max('satis_tarihi'), adet=Count('id'), toplam=Sum('toplam_tutar'),
+        ).values_list('musteri_id', 'son', 'adet', 'toplam')
+    )
+
+    gunler = [max(0, (simdi - son).days) for _id, son, _adet, _toplam in satirlar]
+    adetler = [adet for _id, _son, adet, _toplam in satirlar]
+    toplamlar = [toplam or 0 for _id, _son, _adet, toplam in satirlar]
+
+    veri = {}
+    if satirlar:
+        # Yenilikte az gün yüksek skor alır
+        r_skorlari = [BESLIK + 1 - skor for skor in beslik_skorlari(gunler)]
+        f_skorlari = beslik_skorlari(adetler)
+        m_skorlari = beslik_skorlari(toplamlar)
+        for i, (musteri_id, *_satir) in enumerate(satirlar):
+            r, f, m = r_skorlari[i], f_skorlari[i], m_skorlari[i]
+            veri[musteri_id] = (satirlar[i][1], adetler[i], toplamlar[i], r, f, m, segment_bul(r, f, m))
+    return veri
+
+
+def segmentleri_hesapla(gun_sayisi=None, gruplari_esitle=False):
+    """
+    Tüm müşterilerin RFM segmentlerini hesapla ve kaydet.
+
+    Segment sayılarını ({segment: adet}) döndürür.
+    """
+    simdi = timezone.now()
+    veri = rfm_verisi(gun_sayisi, simdi)
+
+    alanlar = ['son_satis_tarihi', 'satis_sayisi', 'toplam_satis', 'r_skor', 'f_skor', 'm_skor', 'segment']
+    mevcut = {
+        satir[0]: tuple(satir[1:])
+        for satir in MusteriSegment.objects.values_list('musteri_id', *alanlar).iterator()
+    }
+
+    segmentler = {}
+    degisen = []
+    for musteri_id in Musteri.objects.order_by('pk').values_list('pk', flat=True).iterator():
+        degerler = veri.get(musteri_id, (None, 0, 0, 0, 0, 0, ALISVERIS_YOK))
+        segmentler[musteri_id] = degerler[-1]
+        if mevcut.get(musteri_id) == degerler:
+            continue
+        degisen.append(MusteriSegment(musteri_id=musteri_id, hesaplanma_tarihi=simdi, **dict(zip(alanlar, degerler))))
+
+    with transaction.atomic():
+        MusteriSegment.objects.bulk_create(
+            degisen,
+            batch_size=500,
+            update_conflicts=True,
+            unique_fields=['musteri'],
+            update_fields=alanlar + ['hesaplanma_tarihi'],
+        )
+        SegmentHesaplama.objects.update_or_create(
+            pk=HESAPLAMA_PK,
+            defaults={'tarih': simdi, 'musteri_sayisi': len(segmentler), 'degisen_sayisi': len(degisen)},
+        )
+        if gruplari_esitle:
+            grup_uyeliklerini_esitle(segmentler)
+
+    return Counter(segmentler.values())
+
+
+def son_hesaplama():
+    """
+    Segmentlerin son hesaplandığı an. Kayıt yoksa (bu sürümden önce yapılmış
+    hesaplamalar) en son değişen segment kaydının tarihi.
+    """
+    son = SegmentHesaplama.objects.filter(pk=HESAPLAMA_PK).values_list('tarih', flat=True).first()
+    if son is None:
+        son = MusteriSegment.objects.aggregate(son=Max('hesaplanma_tarihi'))['son']
+    return son
+
+
+def segment_gruplari():
+    """Her segmentin müşteri grubu ({segment: MusteriGruplar}, yoksa oluşturulur)"""
+    gruplar = {}
+    for kod, ad in SEGMENT_ADLARI.items():
+        if kod == ALISVERIS_YOK:
+            continue
+        gruplar[kod], _ = MusteriGruplar.objects.get_or_create(
+            ad=f'{GRUP_ONEKI}{ad}',
+            defaults={'aciklama': 'RFM segmentasyonu ile otomatik güncellenir.'},
+        )
+    return gruplar
+
+
+def grup_uyeliklerini_esitle(segmentler):
+    """
+    Müşterilerin RFM grubu üyeliklerini segmentlerine göre eşitle.
+
+    Yeni/yeniden başlayan üyelikler toplu upsert ile yazılır, artık geçerli
+    olmayanlar toplu UPDATE ile pasifleştirilir.
+    """
+    gruplar = segment_gruplari()
+    grup_idleri = {grup.pk for grup in gruplar.values()}
+    bugun = timezone.localdate()
+
+    istenen = {
+        (musteri_id, gruplar[segment].pk)
+        for musteri_id, segment in segmentler.items()
+        if segment in gruplar
+    }
+    mevcut = dict(
+        ((musteri_id, grup_id), uyelik_id)
+        for uyelik_id, musteri_id, grup_id in MusteriGrupUyelik.objects.filter(
+            grup_id__in=grup_idleri, aktif=True
+        ).values_list('id', 'musteri_id', 'grup_id')
+    )
+
+    eklenecek = istenen - set(mevcut)
+    MusteriGrupUyelik.objects.bulk_create(
+        [
+            MusteriGrupUyelik(musteri_id=musteri_id, grup_id=grup_id, baslama_tarihi=bugun, aktif=True)
+            for musteri_id, grup_id in sorted(eklenecek)
+        ],
+        batch_size=500,
+        update_conflicts=True,
+        unique_fields=['musteri', 'grup'],
+        update_fields=['baslama_tarihi', 'bitis_tarihi', 'aktif'],
+    )
+
+    bitecek = [uyelik_id for anahtar, uyelik_id in mevcut.items() if anahtar not in istenen]
+    for i in range(0, len(bitecek), 500):
+        MusteriGrupUyelik.objects.filter(pk__in=bitecek[i:i + 500]).update(aktif=False, bitis_tarihi=bugun)
+    return len(eklenecek), len(bitecek)
+
+
+def segment_ozeti():
+    """Segment bazında müşteri sayısı, toplam satış ve ortalamalar"""
+    satirlar = {
+        satir['segment']: satir
+        for satir in MusteriSegment.objects.values('segment').annotate(
+            musteri_sayisi=Count('musteri'),
+            toplam=Sum('toplam_satis'),
+            satis_adedi=Sum('satis_sayisi'),
+            ortalama_adet=Avg('satis_sayisi'),
+        ).order_by()
+    }
+    toplam_musteri = sum(satir['musteri_sayisi'] for satir in satirlar.values())
+
+    ozet = []
+    for kod, ad in SEGMENT_ADLARI.items():
+        satir = satirlar.get(kod, {})
+        sayi = satir.get('musteri_sayisi', 0)
+        ozet.append({
+            'kod': kod,
+            'ad': ad,
+            'musteri_sayisi': sayi,
+            'oran': sayi * 100 / toplam_musteri if toplam_musteri else 0,
+            'toplam': satir.get('toplam') or 0,
+            'ortalama_sepet': (satir.get('toplam') or 0) / (satir.get('satis_adedi') or 1),
+            'ortalama_adet': satir.get('ortalama_adet') or 0,
+        })
+    return ozet
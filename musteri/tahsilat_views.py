@@ -2,11 +2,17 @@ from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.http import JsonResponse
-from django.db.models import Q, Sum
+from django.db.models import Count, DecimalField, F, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 from django.core.paginator import Paginator
+from django.db import transaction
 from .models import Musteri, Tahsilat, TahsilatDetay, BorcAlacakHareket
-from satis.models import Satis, Odeme
+from satis.models import Satis
+from kasa.models import KasaHareket
+from kasa.defter import ODEME_KASA_TIPLERI, kasa_bul, kaydet
+from .alacak import acik_kalemler, tahsilat_dagit, tahsilat_dagitimini_geri_al
+from .arama import musteri_bul
 import json
 from decimal import Decimal
 
@@ -22,54 +28,54 @@ def borc_alacak_listesi(request):
     musteriler = Musteri.objects.filter(aktif=True)
     
     if search:
-        musteriler = musteriler.filter(
-            Q(ad__icontains=search) |
-            Q(soyad__icontains=search) |
-            Q(telefon__icontains=search) |
-            Q(firma_adi__icontains=search)
-        )
+        musteriler = musteri_bul(search, musteriler)
     
     if durum == 'borclu':
         musteriler = musteriler.filter(acik_hesap_bakiye__gt=0)
     elif durum == 'alacakli':
         musteriler = musteriler.filter(acik_hesap_bakiye__lt=0)
     
-    # Müşteri bazında istatistikler ekle
-    for musteri in musteriler:
-        # Son 30 günlük satışlar
-        musteri.son_30gun_satis = Satis.objects.filter(
-            musteri=musteri,
-            durum='tamamlandi',
-            satis_tarihi__gte=timezone.now() - timezone.timedelta(days=30)
-        ).aggregate(toplam=Sum('toplam_tutar'))['toplam'] or 0
-        
-        # Son 30 günlük tahsilatlar
-        musteri.son_30gun_tahsilat = Tahsilat.objects.filter(
-            musteri=musteri,
-            durum='tahsil_edildi',
-            tahsilat_tarihi__gte=timezone.now() - timezone.timedelta(days=30)
-        ).aggregate(toplam=Sum('tutar'))['toplam'] or 0
+    # Özet istatistikler (tek gruplu sorgu)
+    ozet = musteriler.aggregate(
+        toplam_borc=Sum('acik_hesap_bakiye', filter=Q(acik_hesap_bakiye__gt=0)),
+        toplam_alacak=Sum('acik_hesap_bakiye', filter=Q(acik_hesap_bakiye__lt=0)),
+        borclu_musteri_sayisi=Count('id', filter=Q(acik_hesap_bakiye__gt=0)),
+        toplam_musteri_sayisi=Count('id'),
+    )
+    
+    # Müşteri bazında istatistikler - alt sorgular sadece listelenen sayfa
+    # için çalışır (sayfalama COUNT sorgusunda kullanılmayan ek alanlar atılır);
+    # son satış/tahsilat tarihleri müşteri istatistiklerinden okunur
+    otuz_gun_once = timezone.now() - timezone.timedelta(days=30)
+    tutar_alani = DecimalField(max_digits=15, decimal_places=2)
+    satislar = Satis.objects.filter(musteri=OuterRef('pk'), durum='tamamlandi').values('musteri')
+    tahsilatlar = Tahsilat.objects.filter(musteri=OuterRef('pk'), durum='tahsil_edildi').values('musteri')
+    musteriler = musteriler.annotate(
+        son_30gun_satis=Coalesce(
+            Subquery(satislar.filter(satis_tarihi__gte=otuz_gun_once).annotate(toplam=Sum('toplam_tutar')).values('toplam')),
+            Value(Decimal('0')), output_field=tutar_alani,
+        ),
+        son_30gun_tahsilat=Coalesce(
+            Subquery(tahsilatlar.filter(tahsilat_tarihi__gte=otuz_gun_once).annotate(toplam=Sum('tutar')).values('toplam')),
+            Value(Decimal('0')), output_field=tutar_alani,
+        ),
+        son_satis=F('istatistik__son_satis_tarihi'),
+        son_tahsilat=F('istatistik__son_tahsilat_tarihi'),
+    )
     
     # Sayfalama
-    paginator = Paginator(musteriler.order_by('-acik_hesap_bakiye'), 20)
+    paginator = Paginator(musteriler.order_by('-acik_hesap_bakiye', 'id'), 20)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     
-    # Özet istatistikler
-    toplam_borc = musteriler.filter(acik_hesap_bakiye__gt=0).aggregate(
-        toplam=Sum('acik_hesap_bakiye'))['toplam'] or 0
-    toplam_alacak = abs(musteriler.filter(acik_hesap_bakiye__lt=0).aggregate(
-        toplam=Sum('acik_hesap_bakiye'))['toplam'] or 0)
-    borclu_musteri_sayisi = musteriler.filter(acik_hesap_bakiye__gt=0).count()
-    
     context = {
         'page_obj': page_obj,
         'search': search,
         'durum': durum,
-        'toplam_borc': toplam_borc,
-        'toplam_alacak': toplam_alacak,
-        'borclu_musteri_sayisi': borclu_musteri_sayisi,
-        'toplam_musteri_sayisi': musteriler.count(),
+        'toplam_borc': ozet['toplam_borc'] or 0,
+        'toplam_alacak': abs(ozet['toplam_alacak'] or 0),
+        'borclu_musteri_sayisi': ozet['borclu_musteri_sayisi'],
+        'toplam_musteri_sayisi': ozet['toplam_musteri_sayisi'],
     }
     
     return render(request, 'musteri/borc_alacak_listesi.html', context)
@@ -78,19 +84,10 @@ def borc_alacak_listesi(request):
 @login_required
 def musteri_borc_detay(request, musteri_id):
     """Müşteri borç detayı"""
-    musteri = get_object_or_404(Musteri, id=musteri_id)
-    
-    # Veresiye satışlar (açık hesap ödemeli)
-    # Açık hesap ödemesi olan satışları bul
-    acik_hesap_satis_ids = Odeme.objects.filter(
-        odeme_tipi='acik_hesap'
-    ).values_list('satis_id', flat=True)
+    musteri = get_object_or_404(Musteri.objects.select_related('istatistik'), id=musteri_id)
     
-    odenmemis_satislar = Satis.objects.filter(
-        id__in=acik_hesap_satis_ids,
-        musteri=musteri,
-        durum='tamamlandi'
-    ).order_by('-satis_tarihi')
+    # Açık kalemler (ödenmemiş veresiye satışlar)
+    kalemler = acik_kalemler(musteri).order_by('-tarih', '-id')
     
     # Son hareketler
     hareketler = BorcAlacakHareket.objects.filter(
@@ -104,7 +101,7 @@ def musteri_borc_detay(request, musteri_id):
     
     context = {
         'musteri': musteri,
-        'odenmemis_satislar': odenmemis_satislar,
+        'acik_kalemler': kalemler,
         'hareketler': hareketler,
         'tahsilatlar': tahsilatlar,
     }
@@ -139,6 +136,12 @@ def tahsilat_formu(request, musteri_id=None):
             # Havale/EFT için
             referans_no = request.POST.get('referans_no') if tahsilat_tipi == 'havale' else None
             
+            # Elle dağıtım: dagit_<kalem_id> alanları
+            dagilim = {}
+            for anahtar, deger in request.POST.items():
+                if anahtar.startswith('dagit_') and deger.strip():
+                    dagilim[int(anahtar[len('dagit_'):])] = Decimal(deger)
+            
             if tutar <= 0:
                 messages.error(request, 'Tahsilat tutarı 0\'dan büyük olmalıdır!')
                 return redirect('musteri:tahsilat_formu', musteri_id=musteri_obj.id)
@@ -146,28 +149,46 @@ def tahsilat_formu(request, musteri_id=None):
             if tutar > musteri_obj.acik_hesap_bakiye:
                 messages.warning(request, f'Tahsilat tutarı müşteri borcundan ({musteri_obj.acik_hesap_bakiye}₺) büyük!')
             
-            # Tahsilat kaydı oluştur
-            tahsilat = Tahsilat.objects.create(
-                musteri=musteri_obj,
-                tutar=tutar,
-                tahsilat_tipi=tahsilat_tipi,
-                vade_tarihi=vade_tarihi,
-                cek_senet_no=cek_senet_no,
-                banka=banka,
-                referans_no=referans_no,
-                aciklama=aciklama,
-                tahsilat_eden=request.user,
-                durum='tahsil_edildi' if tahsilat_tipi not in ['cek', 'senet'] else 'beklemede'
-            )
-            
-            # Müşteri bakiyesini güncelle (Tahsilat.save() metodunda otomatik yapılıyor)
-            # Borç-alacak hareketi ekle
-            musteri_obj.alacak_hareket_ekle(
-                tutar=tutar,
-                aciklama=f'Tahsilat - {tahsilat.tahsilat_no}',
-                tahsilat=tahsilat,
-                user=request.user
-            )
+            with transaction.atomic():
+                # Tahsilat kaydı oluştur
+                tahsilat = Tahsilat.objects.create(
+                    musteri=musteri_obj,
+                    tutar=tutar,
+                    tahsilat_tipi=tahsilat_tipi,
+                    vade_tarihi=vade_tarihi,
+                    cek_senet_no=cek_senet_no,
+                    banka=banka,
+                    referans_no=referans_no,
+                    aciklama=aciklama,
+                    tahsilat_eden=request.user,
+                    durum='tahsil_edildi' if tahsilat_tipi not in ['cek', 'senet'] else 'beklemede'
+                )
+                
+                # Tahsil edilen tutar açık kalemlere dağıtılır (elle seçilenler önce)
+                if tahsilat.durum == 'tahsil_edildi':
+                    tahsilat_dagit(tahsilat, dagilim)
+                
+                # Müşteri bakiyesini güncelle (Tahsilat.save() metodunda otomatik yapılıyor)
+                # Borç-alacak hareketi ekle
+                musteri_obj.alacak_hareket_ekle(
+                    tutar=tutar,
+                    aciklama=f'Tahsilat - {tahsilat.tahsilat_no}',
+                    tahsilat=tahsilat,
+                    user=request.user
+                )
+                
+                # Tahsil edilen tutar ilgili kasaya girer (çek/senet vadesinde)
+                kasa = kasa_bul(ODEME_KASA_TIPLERI.get(tahsilat_tipi))
+                if kasa and tahsilat.durum == 'tahsil_edildi':
+                    kaydet([KasaHareket(
+                        kasa=kasa,
+                        tip='giris',
+                        kaynak='tahsilat',
+                        tutar=tutar,
+                        aciklama=f'Tahsilat - {tahsilat.tahsilat_no} - {musteri_obj}',
+                        tahsilat_id=tahsilat.id,
+                        kullanici=request.user
+                    )])
             
             messages.success(request, f'Tahsilat başarıyla kaydedildi. Tahsilat No: {tahsilat.tahsilat_no}')
             return redirect('musteri:tahsilat_detay', tahsilat_id=tahsilat.id)
@@ -175,23 +196,12 @@ def tahsilat_formu(request, musteri_id=None):
         except Exception as e:
             messages.error(request, f'Tahsilat kaydedilirken hata oluştu: {str(e)}')
     
-    # Ödenmemiş satışlar (veresiye satışlar)
-    odenmemis_satislar = []
-    if musteri:
-        # Açık hesap ödemesi olan satışları bul
-        acik_hesap_satis_ids = Odeme.objects.filter(
-            odeme_tipi='acik_hesap'
-        ).values_list('satis_id', flat=True)
-        
-        odenmemis_satislar = Satis.objects.filter(
-            id__in=acik_hesap_satis_ids,
-            musteri=musteri,
-            durum='tamamlandi'
-        ).order_by('-satis_tarihi')
+    # Açık kalemler (ödenmemiş veresiye satışlar, en eskiden yeniye)
+    kalemler = list(acik_kalemler(musteri)) if musteri else []
     
     context = {
         'musteri': musteri,
-        'odenmemis_satislar': odenmemis_satislar,
+        'acik_kalemler': kalemler,
     }
     
     return render(request, 'musteri/tahsilat_formu.html', context)
@@ -265,13 +275,7 @@ def musteri_arama_ajax(request):
         return JsonResponse({'results': []})
     
     # Önce tüm müşterileri ara (borç filtresiz)
-    musteriler = Musteri.objects.filter(
-        Q(ad__icontains=q) |
-        Q(soyad__icontains=q) |
-        Q(telefon__icontains=q) |
-        Q(firma_adi__icontains=q),
-        aktif=True
-    )[:10]
+    musteriler = musteri_bul(q, Musteri.objects.filter(aktif=True))[:10]
     
     results = []
     for musteri in musteriler:
@@ -297,20 +301,40 @@ def tahsilat_iptal(request, tahsilat_id):
             return redirect('musteri:tahsilat_detay', tahsilat_id=tahsilat.id)
         
         try:
-            # Müşteri bakiyesini eski haline getir
-            tahsilat.musteri.acik_hesap_bakiye += tahsilat.tutar
-            tahsilat.musteri.save()
-            
-            # Tahsilat durumunu iptal et
-            tahsilat.durum = 'iptal'
-            tahsilat.save()
-            
-            # İptal hareketi ekle
-            tahsilat.musteri.borc_hareket_ekle(
-                tutar=tahsilat.tutar,
-                aciklama=f'Tahsilat İptal - {tahsilat.tahsilat_no}',
-                user=request.user
-            )
+            with transaction.atomic():
+                # Müşteri bakiyesini eski haline getir
+                tahsilat.musteri.acik_hesap_bakiye += tahsilat.tutar
+                tahsilat.musteri.save()
+                
+                # Tahsilat durumunu iptal et
+                tahsilat.durum = 'iptal'
+                tahsilat.save()
+                
+                # Kapatılan açık kalemler yeniden açılır
+                tahsilat_dagitimini_geri_al(tahsilat)
+                
+                # İptal hareketi ekle
+                tahsilat.musteri.borc_hareket_ekle(
+                    tutar=tahsilat.tutar,
+                    aciklama=f'Tahsilat İptal - {tahsilat.tahsilat_no}',
+                    user=request.user
+                )
+                
+                # Kasaya giren tutar geri çıkılır
+                kaydet([
+                    KasaHareket(
+                        kasa_id=hareket.kasa_id,
+                        tip='cikis',
+                        kaynak='tahsilat',
+                        tutar=hareket.tutar,
+                        aciklama=f'Tahsilat İptal - {tahsilat.tahsilat_no}',
+                        tahsilat_id=tahsilat.id,
+                        kullanici=request.user
+                    )
+                    for hareket in KasaHareket.objects.filter(
+                        tahsilat_id=tahsilat.id, kaynak='tahsilat', tip='giris'
+                    )
+                ], bakiye_kontrolu=False)
             
             messages.success(request, 'Tahsilat başarıyla iptal edildi!')
             return redirect('musteri:tahsilat_detay', tahsilat_id=tahsilat.id)
@@ -12,6 +12,9 @@ urlpatterns = [
     path('<int:pk>/sil/', views.musteri_sil, name='sil'),
     path('<int:pk>/', views.musteri_detay, name='detay'),
     
+    # Müşteri segmentleri (RFM)
+    path('segmentler/', views.musteri_segmentleri, name='segmentler'),
+
     # Müşteri grupları
     path('grup/', views.musteri_grup_listesi, name='musteri_grup_listesi'),
     path('grup/ekle/', views.musteri_grup_ekle, name='musteri_grup_ekle'),
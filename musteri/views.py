@@ -5,24 +5,19 @@ from django.http import JsonResponse
 from django.core.paginator import Paginator
 from django.db.models import Q
 from django.views.decorators.http import require_http_methods
-from .models import Musteri, MusteriGruplar
+from .models import Musteri, MusteriGruplar, MusteriSegment
+from .arama import musteri_bul, telefon_normal
 
 
 @login_required
 def musteri_listesi(request):
     """Müşteri listesi view'ı"""
-    musteriler = Musteri.objects.filter(aktif=True).order_by('ad', 'soyad')
+    musteriler = Musteri.objects.filter(aktif=True).select_related('istatistik').order_by('ad', 'soyad')
     
-    # Arama
+    # Arama (ilgiye göre sıralı)
     query = request.GET.get('q')
     if query:
-        musteriler = musteriler.filter(
-            Q(ad__icontains=query) | 
-            Q(soyad__icontains=query) |
-            Q(telefon__icontains=query) |
-            Q(email__icontains=query) |
-            Q(firma_adi__icontains=query)
-        )
+        musteriler = musteri_bul(query, musteriler)
     
     # İstatistikler
     toplam_musteri = Musteri.objects.filter(aktif=True)
@@ -209,6 +204,37 @@ def musteri_grup_listesi(request):
     return render(request, 'musteri/grup_listesi.html', context)
 
 
+@login_required
+def musteri_segmentleri(request):
+    """RFM segment özeti; segment seçilirse o segmentteki müşteriler"""
+    from .segment import SEGMENT_ADLARI, segment_ozeti, segmentleri_hesapla, son_hesaplama
+    
+    if request.method == 'POST':
+        segmentleri_hesapla()
+        messages.success(request, 'Müşteri segmentleri yeniden hesaplandı.')
+        return redirect('musteri:segmentler')
+    
+    segment = request.GET.get('segment', '')
+    if segment not in SEGMENT_ADLARI:
+        segment = ''
+    
+    kayitlar = MusteriSegment.objects.select_related('musteri').order_by('-toplam_satis', 'musteri_id')
+    if segment:
+        kayitlar = kayitlar.filter(segment=segment)
+    
+    paginator = Paginator(kayitlar, 50)
+    page_obj = paginator.get_page(request.GET.get('page'))
+    
+    context = {
+        'ozet': segment_ozeti(),
+        'page_obj': page_obj,
+        'segment': segment,
+        'segment_adi': SEGMENT_ADLARI.get(segment, ''),
+        'son_hesaplama': son_hesaplama(),
+    }
+    return render(request, 'musteri/segmentler.html', context)
+
+
 @login_required
 def musteri_grup_ekle(request):
     """Müşteri grup ekleme view'ı"""
@@ -260,7 +286,11 @@ def telefon_kontrol(request):
     telefon = request.GET.get('telefon')
     musteri_id = request.GET.get('musteri_id')  # Düzenleme için
     
-    query = Musteri.objects.filter(telefon=telefon)
+    # Farklı biçimde yazılmış aynı numara da bulunur
+    kosul = Q(telefon=telefon)
+    if telefon_normal(telefon):
+        kosul |= Q(telefon_normal=telefon_normal(telefon))
+    query = Musteri.objects.filter(kosul)
     if musteri_id:
         query = query.exclude(pk=musteri_id)
     
@@ -274,13 +304,7 @@ def musteri_ara(request):
     query = request.GET.get('q', '')
     
     if len(query) >= 2:
-        musteriler = Musteri.objects.filter(
-            Q(ad__icontains=query) | 
-            Q(soyad__icontains=query) | 
-            Q(telefon__icontains=query) |
-            Q(firma_adi__icontains=query),
-            aktif=True
-        )[:10]
+        musteriler = musteri_bul(query, Musteri.objects.filter(aktif=True))[:10]
         
         data = []
         for musteri in musteriler:
@@ -1,3 +1,35 @@
 from django.contrib import admin
+from .models import GunlukPanoSayaci, GenelPanoSayaci, GunSonuRaporu, YaslandirmaRaporu
 
-# Register your models here.
+
+@admin.register(GunlukPanoSayaci)
+class GunlukPanoSayaciAdmin(admin.ModelAdmin):
+    list_display = ('tarih', 'ciro', 'satis_adedi', 'urun_adedi', 'gider', 'surum')
+    date_hierarchy = 'tarih'
+    ordering = ('-tarih',)
+
+
+@admin.register(GenelPanoSayaci)
+class GenelPanoSayaciAdmin(admin.ModelAdmin):
+    list_display = ('urun_sayisi', 'musteri_sayisi', 'dusuk_stok_sayisi', 'acik_alacak', 'surum')
+
+
+@admin.register(GunSonuRaporu)
+class GunSonuRaporuAdmin(admin.ModelAdmin):
+    list_display = ('tarih', 'ciro', 'satis_adedi', 'gider', 'olusturan', 'olusturma_tarihi')
+    date_hierarchy = 'tarih'
+    ordering = ('-tarih',)
+
+    # Z raporu değiştirilemez
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(YaslandirmaRaporu)
+class YaslandirmaRaporuAdmin(admin.ModelAdmin):
+    list_display = ('tarih', 'toplam', 'musteri_sayisi', 'hesaplanma_tarihi')
+    date_hierarchy = 'tarih'
+    ordering = ('-tarih',)
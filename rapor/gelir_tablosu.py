@@ -0,0 +1,97 @@
+"""
+Gelir tablosu (aylık kâr/zarar).
+
+Satış tutarı (KDV hariç kalem toplamı) ve satılan malın maliyeti günlük
+pano sayaçlarından, giderler aylık gider özetinden (gider.ozet) ay bazında
+gruplu okunur. On iki aylık tablo satış kalemleri ve gider kayıtları
+taranmadan birkaç düzine özet satırından oluşur.
+"""
+from decimal import Decimal
+
+from django.db.models import Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from .pano import _sayaclar_hazir_mi, sayaclari_yeniden_olustur
+
+
+def ay_listesi(bitis, ay_sayisi):
+    """`bitis` ayı dahil geriye doğru `ay_sayisi` ayın ilk günleri (eskiden yeniye)"""
+    aylar = []
+    yil, ay = bitis.year, bitis.month
+    for _ in range(ay_sayisi):
+        aylar.append(bitis.replace(year=yil, month=ay, day=1))
+        yil, ay = (yil, ay - 1) if ay > 1 else (yil - 1, 12)
+    return aylar[::-1]
+
+
+def _satir(degerler):
+    return {'aylar': degerler, 'toplam': sum(degerler, Decimal('0'))}
+
+
+def _marj(kar, gelir):
+    return (kar / gelir * 100).quantize(Decimal('0.1')) if gelir else None
+
+
+def gelir_tablosu_verisi(bitis=None, ay_sayisi=12):
+    """`bitis` ayıyla biten `ay_sayisi` aylık gelir tablosu"""
+    from gider.ozet import aylik_ozetler
+    from .models import GunlukPanoSayaci
+
+    if not _sayaclar_hazir_mi():
+        sayaclari_yeniden_olustur()
+
+    aylar = ay_listesi(bitis or timezone.localdate(), ay_sayisi)
+    son = aylar[-1]
+    sonraki_ay = son.replace(year=son.year + 1, month=1) if son.month == 12 else son.replace(month=son.month + 1)
+
+    satislar = {
+        satir['ay']: satir
+        for satir in GunlukPanoSayaci.objects.filter(
+            tarih__gte=aylar[0], tarih__lt=sonraki_ay,
+        ).annotate(ay=TruncMonth('tarih')).values('ay').annotate(
+            gelir=Sum('satis_tutari'), maliyet=Sum('maliyet'),
+        ).order_by()
+    }
+
+    kategoriler = {}
+    for satir in aylik_ozetler(aylar[0], aylar[-1]).values(
+        'ay', 'kategori_id', 'kategori__ad', 'kategori__renk',
+    ).annotate(toplam=Sum('toplam')).order_by():
+        kategori = kategoriler.setdefault(satir['kategori_id'], {
+            'ad': satir['kategori__ad'],
+            'renk': satir['kategori__renk'],
+            'aylar': {},
+        })
+        kategori['aylar'][satir['ay']] = satir['toplam'] or Decimal('0')
+
+    sifir = Decimal('0')
+    gelir = [satislar.get(ay, {}).get('gelir') or sifir for ay in aylar]
+    maliyet = [satislar.get(ay, {}).get('maliyet') or sifir for ay in aylar]
+    brut = [g - m for g, m in zip(gelir, maliyet)]
+    gider_kalemleri = sorted(
+        (
+            {'ad': kategori['ad'], 'renk': kategori['renk'],
+             **_satir([kategori['aylar'].get(ay, sifir) for ay in aylar])}
+            for kategori in kategoriler.values()
+        ),
+        key=lambda kalem: -kalem['toplam'],
+    )
+    toplam_gider = [sum((kalem['aylar'][i] for kalem in gider_kalemleri), sifir) for i in range(len(aylar))]
+    net = [b - g for b, g in zip(brut, toplam_gider)]
+
+    gelir_satiri = _satir(gelir)
+    brut_satiri = _satir(brut)
+    return {
+        'aylar': aylar,
+        'gelir': gelir_satiri,
+        'maliyet': _satir(maliyet),
+        'brut_kar': brut_satiri,
+        'brut_marj': {
+            'aylar': [_marj(b, g) for b, g in zip(brut, gelir)],
+            'toplam': _marj(brut_satiri['toplam'], gelir_satiri['toplam']),
+        },
+        'giderler': gider_kalemleri,
+        'toplam_gider': _satir(toplam_gider),
+        'net_kar': _satir(net),
+    }
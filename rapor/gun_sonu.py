@@ -0,0 +1,251 @@
+"""
+Gün sonu (Z raporu).
+
+Günlük raporun tüm verisi birkaç gruplu sorguyla hesaplanır. Gün kapatıldığında
+bu veri GunSonuRaporu olarak değiştirilemez şekilde saklanır; kapatılmış bir
+günün raporu tek satır okunarak gösterilir.
+"""
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+
+def gun_araligi(gun):
+    """Yerel günün [başlangıç, bitiş) aralığı - indeksli aralık sorguları için"""
+    tz = timezone.get_current_timezone()
+    baslangic = timezone.make_aware(datetime.combine(gun, time.min), tz)
+    bitis = timezone.make_aware(datetime.combine(gun + timedelta(days=1), time.min), tz)
+    return baslangic, bitis
+
+
+def kasa_hareket_toplamlari(kasa_idleri, baslangic, bitis):
+    """
+    Kasaların [başlangıç, bitiş) aralığındaki giriş/çıkış toplamları:
+    {kasa_id: (giriş, çıkış)}. Sorgu (kasa, tarih) indeksiyle sadece
+    aralıktaki hareketleri okur.
+    """
+    from kasa.models import KasaHareket
+
+    toplamlar = {kasa_id: (Decimal('0'), Decimal('0')) for kasa_id in kasa_idleri}
+    satirlar = KasaHareket.objects.filter(
+        kasa_id__in=list(toplamlar), tarih__gte=baslangic, tarih__lt=bitis,
+    ).order_by().values('kasa_id').annotate(
+        giris=Sum('tutar', filter=Q(tip='giris')),
+        cikis=Sum('tutar', filter=Q(tip='cikis')),
+    )
+    for satir in satirlar:
+        toplamlar[satir['kasa_id']] = (satir['giris'] or Decimal('0'), satir['cikis'] or Decimal('0'))
+    return toplamlar
+
+
+def _para(deger):
+    return str(Decimal(deger or 0).quantize(Decimal('0.01')))
+
+
+def gun_sonu_verisi(gun):
+    """Günlük rapor verisini hesapla (JSON'a yazılabilir sözlük)"""
+    from gider.models import Gider
+    from kasa.models import Kasa
+    from satis.models import Satis, SatisDetay, Odeme
+
+    baslangic, bitis = gun_araligi(gun)
+    satislar = Satis.objects.filter(
+        durum='tamamlandi',
+        satis_tarihi__gte=baslangic,
+        satis_tarihi__lt=bitis,
+    )
+    satis_filtresi = Q(
+        satis__durum='tamamlandi',
+        satis__satis_tarihi__gte=baslangic,
+        satis__satis_tarihi__lt=bitis,
+    )
+
+    # Satış toplamları
+    satis_ozeti = satislar.aggregate(toplam=Sum('toplam_tutar'), adet=Count('id'))
+
+    # Ödeme tipi dağılımı
+    odeme_adlari = dict(Odeme.ODEME_TIPLERI)
+    odemeler = [
+        {
+            'odeme_tipi': satir['odeme_tipi'],
+            'display_name': odeme_adlari.get(satir['odeme_tipi'], satir['odeme_tipi']),
+            'islem_sayisi': satir['adet'],
+            'toplam_tutar': _para(satir['toplam']),
+        }
+        for satir in Odeme.objects.filter(satis_filtresi).values('odeme_tipi').annotate(
+            toplam=Sum('tutar'), adet=Count('id')
+        ).order_by('-toplam')
+    ]
+
+    # Ürün bazında satışlar (toplam adet + en çok satan 10 ürün)
+    urun_satirlari = list(
+        SatisDetay.objects.filter(satis_filtresi).values('urun__ad').annotate(
+            toplam_miktar=Sum('miktar'),
+            toplam_ciro=Sum('toplam_fiyat'),
+        ).order_by('-toplam_miktar')
+    )
+    cok_satan_urunler = [
+        {
+            'urun_ad': satir['urun__ad'],
+            'toplam_miktar': satir['toplam_miktar'],
+            'toplam_ciro': _para(satir['toplam_ciro']),
+        }
+        for satir in urun_satirlari[:10]
+    ]
+
+    # Son satışlar
+    son_satislar = [
+        {
+            'siparis_no': satir['siparis_no'],
+            'satis_tarihi': satir['satis_tarihi'].isoformat() if satir['satis_tarihi'] else None,
+            'musteri_ad': satir['musteri__ad'],
+            'toplam_tutar': _para(satir['toplam_tutar']),
+        }
+        for satir in satislar.order_by('-satis_tarihi').values(
+            'siparis_no', 'satis_tarihi', 'musteri__ad', 'toplam_tutar'
+        )[:10]
+    ]
+
+    # Giderler (kategori bazında)
+    gider_kategoriler = list(
+        Gider.objects.filter(tarih=gun, aktif=True).values('kategori__ad').annotate(
+            gider_sayisi=Count('id'),
+            toplam_tutar=Sum('tutar'),
+        ).order_by('-toplam_tutar')
+    )
+    toplam_gider = sum((satir['toplam_tutar'] or Decimal('0') for satir in gider_kategoriler), Decimal('0'))
+    gider_sayisi = sum(satir['gider_sayisi'] for satir in gider_kategoriler)
+    for satir in gider_kategoriler:
+        satir['toplam_tutar'] = _para(satir['toplam_tutar'])
+
+    # Kasalar: günlük giriş/çıkış tek gruplu sorguda, gün sonu bakiyesi
+    # en yakın kontrol noktasından itibaren
+    aktif_kasalar = list(Kasa.objects.filter(aktif=True))
+    gunluk = kasa_hareket_toplamlari([kasa.id for kasa in aktif_kasalar], baslangic, bitis)
+    kasalar = []
+    for kasa in aktif_kasalar:
+        giris, cikis = gunluk[kasa.id]
+        kasalar.append({
+            'kasa_id': kasa.id,
+            'ad': kasa.ad,
+            'tip': kasa.tip,
+            'tip_adi': kasa.get_tip_display(),
+            'gunluk_giris': _para(giris),
+            'gunluk_cikis': _para(cikis),
+            'gunluk_net': _para(giris - cikis),
+            'kapanis_bakiyesi': _para(kasa.bakiye_tarihinde(bitis)),
+        })
+
+    toplam_satis = satis_ozeti['toplam'] or Decimal('0')
+    return {
+        'tarih': gun.isoformat(),
+        'toplam_satis_tutari': _para(toplam_satis),
+        'toplam_satis_sayisi': satis_ozeti['adet'],
+        'urun_adedi': sum(satir['toplam_miktar'] or 0 for satir in urun_satirlari),
+        'toplam_gider_tutari': _para(toplam_gider),
+        'toplam_gider_sayisi': gider_sayisi,
+        'net_kar': _para(toplam_satis - toplam_gider),
+        'odemeler': odemeler,
+        'gider_kategoriler': gider_kategoriler,
+        'kasalar': kasalar,
+        'cok_satan_urunler': cok_satan_urunler,
+        'son_satislar': son_satislar,
+    }
+
+
+def gunluk_rapor_baglami(veri, canli_bakiyeler=None):
+    """
+    gun_sonu_verisi çıktısını gunluk_rapor.html şablonunun beklediği yapıya çevir.
+
+    `canli_bakiyeler` ({kasa_id: bakiye}) verilirse kasalarda gün sonu bakiyesi
+    yerine güncel bakiye gösterilir (henüz kapatılmamış günler için).
+    """
+    toplam_satis = Decimal(veri['toplam_satis_tutari'])
+    satis_sayisi = veri['toplam_satis_sayisi']
+    toplam_gider = Decimal(veri['toplam_gider_tutari'])
+
+    kasa_durumu = []
+    for kasa in veri['kasalar']:
+        bakiye = Decimal(kasa['kapanis_bakiyesi'])
+        if canli_bakiyeler is not None:
+            bakiye = canli_bakiyeler.get(kasa['kasa_id'], bakiye)
+        kasa_durumu.append({
+            'kasa': {'id': kasa['kasa_id'], 'ad': kasa['ad'], 'tip': kasa['tip'], 'get_tip_display': kasa['tip_adi']},
+            'gunluk_giris': Decimal(kasa['gunluk_giris']),
+            'gunluk_cikis': Decimal(kasa['gunluk_cikis']),
+            'gunluk_net': Decimal(kasa['gunluk_net']),
+            'mevcut_bakiye': bakiye,
+        })
+
+    return {
+        'satis_ozeti': {
+            'toplam_satis_tutari': toplam_satis,
+            'toplam_satis_sayisi': satis_sayisi,
+            'ortalama_sepet': toplam_satis / satis_sayisi if satis_sayisi else Decimal('0'),
+            'urun_adedi': veri['urun_adedi'],
+        },
+        'gider_ozeti': {
+            'toplam_gider_tutari': toplam_gider,
+            'toplam_gider_sayisi': veri['toplam_gider_sayisi'],
+        },
+        'toplam_tahsilat': toplam_satis,
+        'brut_kar': Decimal(veri['net_kar']),
+        'net_kar': Decimal(veri['net_kar']),
+        'tahsilat_ozeti': [
+            dict(odeme, toplam_tutar=Decimal(odeme['toplam_tutar'])) for odeme in veri['odemeler']
+        ],
+        'gider_kategoriler': [
+            dict(kategori, toplam_tutar=Decimal(kategori['toplam_tutar'])) for kategori in veri['gider_kategoriler']
+        ],
+        'kasa_durumu': kasa_durumu,
+        'cok_satan_urunler': [
+            {
+                'urun': {'ad': urun['urun_ad']},
+                'toplam_miktar': urun['toplam_miktar'],
+                'toplam_ciro': Decimal(urun['toplam_ciro']),
+            }
+            for urun in veri['cok_satan_urunler']
+        ],
+        'son_satislar': [
+            {
+                'siparis_no': satis['siparis_no'],
+                'satis_tarihi': parse_datetime(satis['satis_tarihi']) if satis['satis_tarihi'] else None,
+                'musteri': {'ad': satis['musteri_ad']} if satis['musteri_ad'] else None,
+                'toplam_tutar': Decimal(satis['toplam_tutar']),
+            }
+            for satis in veri['son_satislar']
+        ],
+    }
+
+
+def gun_sonu_al(gun, kullanici=None):
+    """
+    Günü kapat ve Z raporunu sakla.
+
+    Aynı gün için ikinci kez çağrılırsa ya da gelecek bir gün verilirse
+    ValueError fırlatır.
+    """
+    from .models import GunSonuRaporu
+
+    if gun > timezone.localdate():
+        raise ValueError('Gelecek bir gün için gün sonu alınamaz!')
+    if GunSonuRaporu.objects.filter(tarih=gun).exists():
+        raise ValueError(f'{gun.strftime("%d.%m.%Y")} için gün sonu zaten alınmış!')
+
+    veri = gun_sonu_verisi(gun)
+    try:
+        with transaction.atomic():
+            return GunSonuRaporu.objects.create(
+                tarih=gun,
+                ciro=Decimal(veri['toplam_satis_tutari']),
+                satis_adedi=veri['toplam_satis_sayisi'],
+                gider=Decimal(veri['toplam_gider_tutari']),
+                veri=veri,
+                olusturan=kullanici,
+            )
+    except IntegrityError:
+        raise ValueError(f'{gun.strftime("%d.%m.%Y")} için gün sonu zaten alınmış!')
@@ -0,0 +1,37 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from rapor.gun_sonu import gun_sonu_al
+
+
+class Command(BaseCommand):
+    help = 'Günü kapatır ve gün sonu (Z) raporunu oluşturur'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tarih',
+            help='Kapatılacak gün (YYYY-MM-DD), varsayılan bugün',
+        )
+
+    def handle(self, *args, **options):
+        if options['tarih']:
+            try:
+                gun = datetime.strptime(options['tarih'], '%Y-%m-%d').date()
+            except ValueError:
+                raise CommandError('Tarih YYYY-MM-DD formatında olmalı')
+        else:
+            gun = timezone.localdate()
+
+        try:
+            rapor = gun_sonu_al(gun)
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'{gun.strftime("%d.%m.%Y")} kapatıldı: {rapor.satis_adedi} satış, '
+                f'{rapor.ciro} ₺ ciro, {rapor.gider} ₺ gider'
+            )
+        )
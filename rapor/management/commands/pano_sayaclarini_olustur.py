@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from gider.ozet import aylik_ozetleri_yeniden_olustur
+from rapor.pano import sayaclari_yeniden_olustur
+
+
+class Command(BaseCommand):
+    help = 'Dashboard sayaçlarını ve aylık gider özetlerini satış, gider, ürün ve müşteri kayıtlarından yeniden hesaplar'
+
+    def handle(self, *args, **options):
+        gun_sayisi = sayaclari_yeniden_olustur()
+        ozet_sayisi = aylik_ozetleri_yeniden_olustur()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Dashboard sayaçları ({gun_sayisi} gün) ve aylık gider özetleri ({ozet_sayisi} kayıt) yeniden oluşturuldu'
+            )
+        )
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from rapor.yaslandirma import yaslandirma_olustur
+
+
+class Command(BaseCommand):
+    help = 'Alacak yaşlandırma raporunu hesaplar ve saklar (gece çalıştırılır)'
+
+    def handle(self, *args, **options):
+        rapor = yaslandirma_olustur()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'{rapor.tarih.strftime("%d.%m.%Y")} yaşlandırma raporu: '
+                f'{rapor.musteri_sayisi} müşteri, {rapor.toplam} ₺ açık alacak'
+            )
+        )
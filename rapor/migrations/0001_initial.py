@@ -0,0 +1,51 @@
+# Generated by Django 5.2.5 on 2026-10-19 13:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GenelPanoSayaci',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('urun_sayisi', models.IntegerField(default=0, verbose_name='Aktif Ürün Sayısı')),
+                ('musteri_sayisi', models.IntegerField(default=0, verbose_name='Aktif Müşteri Sayısı')),
+                ('dusuk_stok_sayisi', models.IntegerField(default=0, verbose_name='Düşük Stoklu Varyant Sayısı')),
+                ('acik_alacak', models.DecimalField(decimal_places=2, default=0, max_digits=15, verbose_name='Açık Alacak')),
+                ('surum', models.PositiveBigIntegerField(default=0, verbose_name='Sürüm')),
+            ],
+            options={
+                'verbose_name': 'Genel Pano Sayacı',
+                'verbose_name_plural': 'Genel Pano Sayaçları',
+            },
+        ),
+        migrations.CreateModel(
+            name='GunlukPanoSayaci',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tarih', models.DateField(unique=True, verbose_name='Tarih')),
+                ('ciro', models.DecimalField(decimal_places=2, default=0, max_digits=15, verbose_name='Ciro')),
+                ('satis_adedi', models.IntegerField(default=0, verbose_name='Satış Adedi')),
+                ('urun_adedi', models.IntegerField(default=0, verbose_name='Satılan Ürün Adedi')),
+                ('nakit', models.DecimalField(decimal_places=2, default=0, max_digits=15, verbose_name='Nakit')),
+                ('kart', models.DecimalField(decimal_places=2, default=0, max_digits=15, verbose_name='Kart')),
+                ('havale', models.DecimalField(decimal_places=2, default=0, max_digits=15, verbose_name='Havale')),
+                ('hediye_ceki', models.DecimalField(decimal_places=2, default=0, max_digits=15, verbose_name='Hediye Çeki')),
+                ('acik_hesap', models.DecimalField(decimal_places=2, default=0, max_digits=15, verbose_name='Açık Hesap')),
+                ('gider', models.DecimalField(decimal_places=2, default=0, max_digits=15, verbose_name='Gider')),
+                ('surum', models.PositiveBigIntegerField(default=0, verbose_name='Sürüm')),
+            ],
+            options={
+                'verbose_name': 'Günlük Pano Sayacı',
+                'verbose_name_plural': 'Günlük Pano Sayaçları',
+                'ordering': ['-tarih'],
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.5 on 2026-10-19 13:03
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rapor', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GunSonuRaporu',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tarih', models.DateField(unique=True, verbose_name='Tarih')),
+                ('ciro', models.DecimalField(decimal_places=2, default=0, max_digits=15, verbose_name='Ciro')),
+                ('satis_adedi', models.IntegerField(default=0, verbose_name='Satış Adedi')),
+                ('gider', models.DecimalField(decimal_places=2, default=0, max_digits=15, verbose_name='Gider')),
+                ('veri', models.JSONField(verbose_name='Rapor Verisi')),
+                ('olusturma_tarihi', models.DateTimeField(auto_now_add=True, verbose_name='Oluşturma Tarihi')),
+                ('olusturan', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL, verbose_name='Oluşturan')),
+            ],
+            options={
+                'verbose_name': 'Gün Sonu Raporu',
+                'verbose_name_plural': 'Gün Sonu Raporları',
+                'ordering': ['-tarih'],
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.5 on 2026-10-19 13:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rapor', '0002_gunsonuraporu'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='YaslandirmaRaporu',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tarih', models.DateField(unique=True, verbose_name='Tarih')),
+                ('toplam', models.DecimalField(decimal_places=2, default=0, max_digits=15, verbose_name='Toplam Alacak')),
+                ('musteri_sayisi', models.IntegerField(default=0, verbose_name='Müşteri Sayısı')),
+                ('veri', models.JSONField(verbose_name='Rapor Verisi')),
+                ('hesaplanma_tarihi', models.DateTimeField(auto_now=True, verbose_name='Hesaplanma Tarihi')),
+            ],
+            options={
+                'verbose_name': 'Yaşlandırma Raporu',
+                'verbose_name_plural': 'Yaşlandırma Raporları',
+                'ordering': ['-tarih'],
+            },
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.5 on 2026-10-19 13:39
+
+from django.db import migrations, models
+from django.db.models import F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+
+def sayaclari_doldur(apps, schema_editor):
+    """Var olan günlük sayaçlara kalem tutarı ve maliyeti ekle"""
+    GunlukPanoSayaci = apps.get_model('rapor', 'GunlukPanoSayaci')
+    SatisDetay = apps.get_model('satis', 'SatisDetay')
+
+    for satir in SatisDetay.objects.filter(
+        satis__durum='tamamlandi', satis__satis_tarihi__isnull=False
+    ).annotate(
+        gun=TruncDate('satis__satis_tarihi', tzinfo=timezone.get_current_timezone())
+    ).values('gun').annotate(
+        tutar=Sum('toplam_fiyat'),
+        maliyet=Sum(F('birim_maliyet') * F('miktar')),
+    ):
+        GunlukPanoSayaci.objects.filter(tarih=satir['gun']).update(
+            satis_tutari=satir['tutar'] or 0,
+            maliyet=satir['maliyet'] or 0,
+            surum=F('surum') + 1,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rapor', '0003_yaslandirmaraporu'),
+        ('satis', '0006_satisdetay_birim_maliyet'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='gunlukpanosayaci',
+            name='maliyet',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=15, verbose_name='Satılan Malın Maliyeti'),
+        ),
+        migrations.AddField(
+            model_name='gunlukpanosayaci',
+            name='satis_tutari',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=15, verbose_name='Satış Tutarı'),
+        ),
+        migrations.RunPython(sayaclari_doldur, migrations.RunPython.noop),
+    ]
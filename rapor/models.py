@@ -1,3 +1,104 @@
 from django.db import models
+from django.conf import settings
 
-# Create your models here.
+
+class GunlukPanoSayaci(models.Model):
+    """Dashboard için günlük sayaçlar - yazma işlemlerinde artırılır"""
+    tarih = models.DateField(unique=True, verbose_name="Tarih")
+
+    # Satış sayaçları (sadece tamamlanmış satışlar)
+    ciro = models.DecimalField(max_digits=15, decimal_places=2, default=0, verbose_name="Ciro")
+    satis_adedi = models.IntegerField(default=0, verbose_name="Satış Adedi")
+    urun_adedi = models.IntegerField(default=0, verbose_name="Satılan Ürün Adedi")
+    # Kalem toplamları (KDV hariç) ve satış anındaki alış fiyatıyla maliyet
+    satis_tutari = models.DecimalField(max_digits=15, decimal_places=2, default=0, verbose_name="Satış Tutarı")
+    maliyet = models.DecimalField(max_digits=15, decimal_places=2, default=0, verbose_name="Satılan Malın Maliyeti")
+
+    # Ödeme tipi bazında tahsilatlar
+    nakit = models.DecimalField(max_digits=15, decimal_places=2, default=0, verbose_name="Nakit")
+    kart = models.DecimalField(max_digits=15, decimal_places=2, default=0, verbose_name="Kart")
+    havale = models.DecimalField(max_digits=15, decimal_places=2, default=0, verbose_name="Havale")
+    hediye_ceki = models.DecimalField(max_digits=15, decimal_places=2, default=0, verbose_name="Hediye Çeki")
+    acik_hesap = models.DecimalField(max_digits=15, decimal_places=2, default=0, verbose_name="Açık Hesap")
+
+    # Giderler (aktif)
+    gider = models.DecimalField(max_digits=15, decimal_places=2, default=0, verbose_name="Gider")
+
+    # Her güncellemede artar, ETag olarak kullanılır
+    surum = models.PositiveBigIntegerField(default=0, verbose_name="Sürüm")
+
+    class Meta:
+        verbose_name = "Günlük Pano Sayacı"
+        verbose_name_plural = "Günlük Pano Sayaçları"
+        ordering = ['-tarih']
+
+    def __str__(self):
+        return f"{self.tarih} - {self.ciro} ₺"
+
+
+class GenelPanoSayaci(models.Model):
+    """Güne bağlı olmayan dashboard sayaçları (tek kayıt)"""
+    urun_sayisi = models.IntegerField(default=0, verbose_name="Aktif Ürün Sayısı")
+    musteri_sayisi = models.IntegerField(default=0, verbose_name="Aktif Müşteri Sayısı")
+    dusuk_stok_sayisi = models.IntegerField(default=0, verbose_name="Düşük Stoklu Varyant Sayısı")
+    acik_alacak = models.DecimalField(max_digits=15, decimal_places=2, default=0, verbose_name="Açık Alacak")
+    surum = models.PositiveBigIntegerField(default=0, verbose_name="Sürüm")
+
+    class Meta:
+        verbose_name = "Genel Pano Sayacı"
+        verbose_name_plural = "Genel Pano Sayaçları"
+
+    def __str__(self):
+        return f"Genel sayaçlar (sürüm {self.surum})"
+
+
+class GunSonuRaporu(models.Model):
+    """Gün sonu (Z raporu) - gün kapatıldığında oluşturulur, değiştirilemez"""
+    tarih = models.DateField(unique=True, verbose_name="Tarih")
+
+    # Listeleme için özet alanlar
+    ciro = models.DecimalField(max_digits=15, decimal_places=2, default=0, verbose_name="Ciro")
+    satis_adedi = models.IntegerField(default=0, verbose_name="Satış Adedi")
+    gider = models.DecimalField(max_digits=15, decimal_places=2, default=0, verbose_name="Gider")
+
+    # Rapor verisinin tamamı (rapor.gun_sonu.gun_sonu_verisi)
+    veri = models.JSONField(verbose_name="Rapor Verisi")
+
+    olusturan = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, verbose_name="Oluşturan")
+    olusturma_tarihi = models.DateTimeField(auto_now_add=True, verbose_name="Oluşturma Tarihi")
+
+    class Meta:
+        verbose_name = "Gün Sonu Raporu"
+        verbose_name_plural = "Gün Sonu Raporları"
+        ordering = ['-tarih']
+
+    def __str__(self):
+        return f"Z Raporu {self.tarih} - {self.ciro} ₺"
+
+    def save(self, *args, **kwargs):
+        # Z raporu kapatıldıktan sonra değiştirilemez
+        if not self._state.adding:
+            raise ValueError("Gün sonu raporu değiştirilemez!")
+        super().save(*args, **kwargs)
+
+
+class YaslandirmaRaporu(models.Model):
+    """Alacak yaşlandırma raporu - her gece önceden hesaplanır, gün içinde yenilenebilir"""
+    tarih = models.DateField(unique=True, verbose_name="Tarih")
+
+    # Listeleme için özet alanlar
+    toplam = models.DecimalField(max_digits=15, decimal_places=2, default=0, verbose_name="Toplam Alacak")
+    musteri_sayisi = models.IntegerField(default=0, verbose_name="Müşteri Sayısı")
+
+    # Rapor verisinin tamamı (rapor.yaslandirma.yaslandirma_verisi)
+    veri = models.JSONField(verbose_name="Rapor Verisi")
+
+    hesaplanma_tarihi = models.DateTimeField(auto_now=True, verbose_name="Hesaplanma Tarihi")
+
+    class Meta:
+        verbose_name = "Yaşlandırma Raporu"
+        verbose_name_plural = "Yaşlandırma Raporları"
+        ordering = ['-tarih']
+
+    def __str__(self):
+        return f"Yaşlandırma {self.tarih} - {self.toplam} ₺"
@@ -0,0 +1,128 @@
+"""
+Rapor sonuç önbelleği.
+
+Kapanmış günlere ait raporlar değişmez; sonuçlar rapor adı, parametreler ve
+tarih aralığı ile anahtarlanarak saklanır. Her gün için önbellekte bir sürüm
+numarası tutulur ve anahtar, aralıktaki günlerin sürümlerini de içerir. Geriye
+dönük bir yazma (iade, iptal, eski tarihli gider) sadece ilgili günün sürümünü
+artırır; o günü kapsamayan kayıtlar geçerliliğini korur.
+
+Yerel bellek (LocMemCache) ve dosya tabanlı (FileBasedCache) arka uçlarla
+çalışır; atomik sayaç gerektirmez.
+"""
+import hashlib
+import json
+import time
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import InvalidCacheBackendError
+from django.db import transaction
+from django.utils import timezone
+
+
+# Bugünü (veya geleceği) kapsayan sonuçlar bu süre kadar saklanır (saniye)
+ACIK_DONEM_SURESI = 300
+
+
+def onbellek_getir():
+    """Rapor önbelleğini döndür (tanımlı değilse varsayılan önbellek); diğer modüller de kullanır"""
+    alias = getattr(settings, 'RAPOR_ONBELLEK', 'raporlar')
+    try:
+        return caches[alias]
+    except InvalidCacheBackendError:
+        return caches['default']
+
+
+def _gun(deger):
+    """Tarih/tarih-saat değerini yerel güne çevir"""
+    if isinstance(deger, datetime):
+        if timezone.is_aware(deger):
+            return timezone.localtime(deger).date()
+        return deger.date()
+    return deger
+
+
+def _surum_anahtari(gun):
+    return f'rapor:surum:{gun.isoformat()}'
+
+
+def _yeni_surum():
+    # Sürüm anahtarı önbellekten düşerse eski sonuçlar tekrar geçerli
+    # sayılmasın diye sıfır yerine zamana bağlı bir değer kullanılır
+    return time.time_ns()
+
+
+def _gun_surumleri(baslangic, bitis):
+    """Aralıktaki her günün sürüm numarasını getir (tek get_many ile)"""
+    onbellek = onbellek_getir()
+    anahtarlar = []
+    gun = baslangic
+    while gun <= bitis:
+        anahtarlar.append(_surum_anahtari(gun))
+        gun += timedelta(days=1)
+
+    mevcut = onbellek.get_many(anahtarlar)
+    eksik = {anahtar: _yeni_surum() for anahtar in anahtarlar if anahtar not in mevcut}
+    if eksik:
+        onbellek.set_many(eksik, timeout=None)
+        mevcut.update(eksik)
+
+    return [mevcut[anahtar] for anahtar in anahtarlar]
+
+
+def rapor_onbellegi(ad, parametreler, baslangic, bitis, hesapla):
+    """
+    Rapor sonucunu önbellekten getir, yoksa hesapla ve sakla.
+
+    `hesapla` parametresiz çağrılır ve pickle edilebilir bir değer döndürmelidir.
+    Model nesneleri saklanmaz (ilişkili kayıtlar değişince bayatlarlar); id ya
+    da values() satırları saklanıp gerekirse tekrar sorgulanır.
+    Tamamen geçmişte kalan aralıklar süresiz, bugünü kapsayanlar
+    ACIK_DONEM_SURESI kadar saklanır.
+    """
+    baslangic, bitis = _gun(baslangic), _gun(bitis)
+    bugun = timezone.localdate()
+
+    surumler = []
+    if baslangic <= bitis:
+        surumler = _gun_surumleri(baslangic, min(bitis, bugun))
+
+    imza = json.dumps(
+        [ad, parametreler, baslangic.isoformat(), bitis.isoformat(), surumler],
+        sort_keys=True, default=str
+    )
+    anahtar = f'rapor:sonuc:{ad}:{hashlib.sha256(imza.encode()).hexdigest()}'
+
+    onbellek = onbellek_getir()
+    sonuc = onbellek.get(anahtar)
+    if sonuc is None:
+        sonuc = hesapla()
+        sure = None if bitis < bugun else ACIK_DONEM_SURESI
+        onbellek.set(anahtar, sonuc, timeout=sure)
+
+    return sonuc
+
+
+def rapor_gunlerini_gecersiz_kil(*tarihler):
+    """
+    Verilen günleri kapsayan tüm rapor sonuçlarını geçersiz kıl.
+
+    Sürümler transaction commit edildikten sonra artırılır (transaction
+    dışında hemen). Commit'ten önce artırılsaydı arada gelen bir istek eski
+    veriyi yeni sürüm anahtarıyla, kapanmış dönemlerde süresiz saklayabilirdi.
+    """
+    gunler = {_gun(tarih) for tarih in tarihler if tarih}
+    if gunler:
+        transaction.on_commit(lambda: _surumleri_artir(gunler))
+
+
+def _surumleri_artir(gunler):
+    onbellek = onbellek_getir()
+    for gun in gunler:
+        anahtar = _surum_anahtari(gun)
+        try:
+            onbellek.incr(anahtar)
+        except ValueError:
+            onbellek.set(anahtar, _yeni_surum(), timeout=None)
@@ -0,0 +1,240 @@
+"""
+Dashboard sayaçları.
+
+Dashboard her açılışta satış/gider tablolarını toplamak yerine
+GunlukPanoSayaci ve GenelPanoSayaci kayıtlarını okur. Sayaçlar modellerin
+save/delete metotlarında, kaydın önceki ve yeni katkısı arasındaki fark
+kadar F() ifadeleriyle (atomik olarak) güncellenir. Her güncelleme sürümü
+artırır; JSON uç noktası bu sürümleri ETag olarak kullanır.
+
+Sayaçlar ilk ihtiyaç anında mevcut veriden bir kez hesaplanır.
+
+Katkı, (gün, {alan: değer}) ikilisidir; güne bağlı olmayan sayaçlar için
+sadece {alan: değer} sözlüğü kullanılır. Kayıt dışı toplu işlemlerden sonra
+sayaçlar `pano_sayaclarini_olustur` komutuyla yeniden hesaplanabilir.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .onbellek import _gun
+
+
+# Bu miktar ve altında stoğu olan aktif varyantlar düşük stoklu sayılır
+# (stok raporundaki "kritik" eşiğiyle aynı, tükenenler dahil)
+DUSUK_STOK_SEVIYESI = 5
+
+GUNLUK_ALANLAR = (
+    'ciro', 'satis_adedi', 'urun_adedi', 'satis_tutari', 'maliyet',
+    'nakit', 'kart', 'havale', 'hediye_ceki', 'acik_hesap',
+    'gider',
+)
+GENEL_ALANLAR = ('urun_sayisi', 'musteri_sayisi', 'dusuk_stok_sayisi', 'acik_alacak')
+
+GENEL_PK = 1
+
+
+def ozet_sakla(nesne, alanlar):
+    """from_db içinde çağrılır: kaydın sayaçlarla ilgili ilk halini sakla"""
+    # Ertelenmiş (only/defer) alanlara erişmek ek sorgu yapacağından
+    # kısmi yüklenen kayıtlarda özet, kaydetme anında okunur
+    if not nesne.get_deferred_fields() & set(alanlar):
+        nesne._pano_onceki = nesne._pano_ozeti()
+
+
+def kayitli_ozet(nesne):
+    """Kaydın veritabanındaki halinin özeti (yeni kayıtlar için None)"""
+    if hasattr(nesne, '_pano_onceki'):
+        return nesne._pano_onceki
+    if nesne._state.adding or nesne.pk is None:
+        return None
+    kayitli = type(nesne)._base_manager.filter(pk=nesne.pk).first()
+    return kayitli._pano_ozeti() if kayitli else None
+
+
+def katki_gunu(katki):
+    return _gun(katki[0]) if katki else None
+
+
+def katki_birlestir(*katkilar):
+    """Aynı güne ait katkıları tek katkıda topla (None'ları atla)"""
+    gun, toplam = None, defaultdict(int)
+    for katki in katkilar:
+        if not katki:
+            continue
+        gun = katki[0]
+        for alan, deger in katki[1].items():
+            toplam[alan] += deger
+    return (gun, dict(toplam)) if gun is not None else None
+
+
+def _farklar(eski, yeni):
+    """Eski ve yeni katkı arasındaki farkı {gün: {alan: fark}} olarak döndür"""
+    sonuc = defaultdict(lambda: defaultdict(int))
+    for isaret, katki in ((-1, eski), (1, yeni)):
+        if not katki or katki[0] is None:
+            continue
+        gun, degerler = katki
+        for alan, deger in degerler.items():
+            sonuc[_gun(gun)][alan] += isaret * deger
+
+    return {
+        gun: {alan: fark for alan, fark in farklar.items() if fark}
+        for gun, farklar in sonuc.items()
+        if any(farklar.values())
+    }
+
+
+def _artir(model, filtre, farklar):
+    """Sayaç kaydını F() ile artır; kayıt yoksa False döndür"""
+    guncelleme = {alan: F(alan) + fark for alan, fark in farklar.items()}
+    guncelleme['surum'] = F('surum') + 1
+    return bool(model.objects.filter(**filtre).update(**guncelleme))
+
+
+def _sayaclar_hazir_mi():
+    from .models import GenelPanoSayaci
+    return GenelPanoSayaci.objects.filter(pk=GENEL_PK).exists()
+
+
+def gunluk_sayaclari_guncelle(eski, yeni):
+    """Bir kaydın günlük sayaçlara katkısı eski'den yeni'ye değişti"""
+    from .models import GunlukPanoSayaci
+
+    for gun, farklar in _farklar(eski, yeni).items():
+        if _artir(GunlukPanoSayaci, {'tarih': gun}, farklar):
+            continue
+
+        if not _sayaclar_hazir_mi():
+            # Sayaçlar hiç oluşturulmamış: mevcut veriden bir kez hesapla
+            # (bu kaydın etkisi de veritabanında olduğu için dahil olur)
+            sayaclari_yeniden_olustur()
+            return
+
+        try:
+            with transaction.atomic():
+                GunlukPanoSayaci.objects.create(tarih=gun, surum=1, **farklar)
+        except IntegrityError:
+            # Aynı anda başka bir işlem oluşturdu
+            _artir(GunlukPanoSayaci, {'tarih': gun}, farklar)
+
+
+def genel_sayaclari_guncelle(eski, yeni):
+    """Bir kaydın genel sayaçlara katkısı eski'den yeni'ye değişti"""
+    from .models import GenelPanoSayaci
+
+    # Genel sayaçlar tek bir "gün"e yazılmış gibi işlenir
+    farklar = _farklar(
+        ('genel', eski) if eski else None,
+        ('genel', yeni) if yeni else None,
+    ).get('genel')
+    if farklar and not _artir(GenelPanoSayaci, {'pk': GENEL_PK}, farklar):
+        sayaclari_yeniden_olustur()
+
+
+def pano_surumu(gun=None):
+    """Dashboard verisinin sürümü (ETag için) - iki indeksli okuma"""
+    from .models import GunlukPanoSayaci, GenelPanoSayaci
+
+    gun = gun or timezone.localdate()
+    gunluk = GunlukPanoSayaci.objects.filter(tarih=gun).values_list('surum', flat=True).first() or 0
+    genel = GenelPanoSayaci.objects.filter(pk=GENEL_PK).values_list('surum', flat=True).first() or 0
+    return f'{gun.isoformat()}-{gunluk}-{genel}'
+
+
+def pano_verisi(gun=None):
+    """Dashboard sayaçlarını sözlük olarak döndür (veri hacminden bağımsız)"""
+    from .models import GunlukPanoSayaci, GenelPanoSayaci
+
+    gun = gun or timezone.localdate()
+    genel = GenelPanoSayaci.objects.filter(pk=GENEL_PK).first()
+    if genel is None:
+        sayaclari_yeniden_olustur()
+        genel = GenelPanoSayaci.objects.get(pk=GENEL_PK)
+    gunluk = GunlukPanoSayaci.objects.filter(tarih=gun).first() or GunlukPanoSayaci(tarih=gun)
+
+    veri = {'tarih': gun.isoformat()}
+    for alan in GUNLUK_ALANLAR:
+        veri[alan] = getattr(gunluk, alan)
+    for alan in GENEL_ALANLAR:
+        veri[alan] = getattr(genel, alan)
+    veri['net'] = Decimal(veri['ciro']) - Decimal(veri['gider'])
+    veri['surum'] = f'{gun.isoformat()}-{gunluk.surum}-{genel.surum}'
+    return veri
+
+
+def sayaclari_yeniden_olustur():
+    """
+    Tüm sayaçları kaynak tablolardan gruplu sorgularla yeniden hesapla.
+
+    Sürümler artırılarak korunur, böylece tarayıcıdaki ETag'ler geçersiz olur.
+    """
+    from django.db.models import Count, F, Q, Sum
+    from django.db.models.functions import TruncDate
+
+    from gider.models import Gider
+    from musteri.models import Musteri
+    from satis.models import Satis, SatisDetay, Odeme
+    from urun.models import Urun, UrunVaryanti
+    from .models import GunlukPanoSayaci, GenelPanoSayaci
+
+    gunler = defaultdict(lambda: defaultdict(int))
+    tz = timezone.get_current_timezone()
+
+    for satir in Satis.objects.filter(durum='tamamlandi', satis_tarihi__isnull=False).annotate(
+        gun=TruncDate('satis_tarihi', tzinfo=tz)
+    ).values('gun').annotate(ciro=Sum('toplam_tutar'), adet=Count('id')):
+        gunler[satir['gun']]['ciro'] += satir['ciro'] or 0
+        gunler[satir['gun']]['satis_adedi'] += satir['adet']
+
+    for satir in SatisDetay.objects.filter(
+        satis__durum='tamamlandi', satis__satis_tarihi__isnull=False
+    ).annotate(
+        gun=TruncDate('satis__satis_tarihi', tzinfo=tz)
+    ).values('gun').annotate(
+        adet=Sum('miktar'),
+        tutar=Sum('toplam_fiyat'),
+        maliyet=Sum(F('birim_maliyet') * F('miktar')),
+    ):
+        gunler[satir['gun']]['urun_adedi'] += satir['adet'] or 0
+        gunler[satir['gun']]['satis_tutari'] += satir['tutar'] or 0
+        gunler[satir['gun']]['maliyet'] += satir['maliyet'] or 0
+
+    for satir in Odeme.objects.filter(
+        satis__durum='tamamlandi', satis__satis_tarihi__isnull=False
+    ).annotate(
+        gun=TruncDate('satis__satis_tarihi', tzinfo=tz)
+    ).values('gun', 'odeme_tipi').annotate(toplam=Sum('tutar')):
+        if satir['odeme_tipi'] in GUNLUK_ALANLAR:
+            gunler[satir['gun']][satir['odeme_tipi']] += satir['toplam'] or 0
+
+    for satir in Gider.objects.filter(aktif=True).values('tarih').annotate(toplam=Sum('tutar')):
+        gunler[satir['tarih']]['gider'] += satir['toplam'] or 0
+
+    genel = Urun.objects.aggregate(urun_sayisi=Count('id', filter=Q(aktif=True)))
+    genel.update(Musteri.objects.aggregate(
+        musteri_sayisi=Count('id', filter=Q(aktif=True)),
+        acik_alacak=Sum('acik_hesap_bakiye', filter=Q(acik_hesap_bakiye__gt=0)),
+    ))
+    genel['dusuk_stok_sayisi'] = UrunVaryanti.objects.filter(
+        aktif=True, stok_miktari__lte=DUSUK_STOK_SEVIYESI
+    ).count()
+    genel['acik_alacak'] = genel['acik_alacak'] or 0
+
+    with transaction.atomic():
+        eski_surumler = dict(GunlukPanoSayaci.objects.values_list('tarih', 'surum'))
+        GunlukPanoSayaci.objects.all().delete()
+        GunlukPanoSayaci.objects.bulk_create([
+            GunlukPanoSayaci(tarih=gun, surum=eski_surumler.get(gun, 0) + 1, **degerler)
+            for gun, degerler in gunler.items()
+        ])
+
+        eski_genel = GenelPanoSayaci.objects.filter(pk=GENEL_PK).values_list('surum', flat=True).first() or 0
+        GenelPanoSayaci.objects.update_or_create(
+            pk=GENEL_PK, defaults=dict(genel, surum=eski_genel + 1)
+        )
+
+    return len(gunler)
@@ -10,7 +10,10 @@ urlpatterns = [
     path('stok-hareketleri/<int:varyant_id>/', views.stok_hareketleri, name='stok_hareketleri'),
     path('cok-satan-urunler/', views.cok_satan_urunler, name='cok_satan_urunler'),
     path('kar-zarar/', views.kar_zarar, name='kar_zarar'),
+    path('gelir-tablosu/', views.gelir_tablosu, name='gelir_tablosu'),
     path('musteri-raporu/', views.musteri_raporu, name='musteri_raporu'),
+    path('yaslandirma/', views.yaslandirma, name='yaslandirma'),
+    path('yaslandirma/<int:musteri_id>/', views.yaslandirma_detay, name='yaslandirma_detay'),
     
     # Rapor export
     path('export/gunluk-satis-excel/', views.gunluk_satis_excel, name='gunluk_satis_excel'),
@@ -19,4 +22,5 @@ urlpatterns = [
     path('export/stok-pdf/', views.stok_pdf, name='stok_pdf'),
     path('export/kar-zarar-excel/', views.kar_zarar_excel, name='kar_zarar_excel'),
     path('export/kar-zarar-pdf/', views.kar_zarar_pdf, name='kar_zarar_pdf'),
+    path('export/yaslandirma-excel/', views.yaslandirma_excel, name='yaslandirma_excel'),
 ]
@@ -1,5 +1,7 @@
-from django.shortcuts import render
+from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
+from django.core.paginator import Paginator
+from django.utils import timezone
 from django.http import HttpResponse
 from django.db.models import Sum, Count, F
 from datetime import date, datetime, timedelta
@@ -8,6 +10,10 @@ from reportlab.pdfgen import canvas
 from satis.models import Satis, SatisDetay
 from urun.models import Urun
 from musteri.models import Musteri
+from .onbellek import rapor_onbellegi
+from .models import YaslandirmaRaporu
+from .yaslandirma import DILIMLER, kalem_dilimi, yaslandirma_baglami, yaslandirma_olustur
+from .gelir_tablosu import gelir_tablosu_verisi
 
 
 @login_required
@@ -25,36 +31,59 @@ def gunluk_satis(request):
     satislar = Satis.objects.filter(
         satis_tarihi__date=secili_tarih,
         durum='tamamlandi'
-    ).select_related('musteri', 'satici').prefetch_related('satisdetay_set__varyant__urun__kategori', 'satisdetay_set__varyant__urun__marka')
+    )
     
     # Günlük satış detayları - ürün bazında
     satis_detaylari = SatisDetay.objects.filter(
         satis__satis_tarihi__date=secili_tarih,
         satis__durum='tamamlandi'
-    ).select_related(
-        'satis', 'satis__musteri', 'satis__satici',
-        'varyant', 'varyant__urun', 
-        'varyant__urun__kategori', 'varyant__urun__marka',
-        'varyant__renk', 'varyant__beden'
     ).order_by('-satis__satis_tarihi')
     
-    # İstatistikler
-    toplam_satis = satislar.aggregate(
-        toplam=Sum('toplam_tutar'),
-        adet=Count('id')
-    )
-    
-    toplam_urun_sayisi = satis_detaylari.aggregate(
-        toplam_adet=Sum('miktar')
-    )['toplam_adet'] or 0
-    
+    def hesapla():
+        # İstatistikler
+        toplam_satis = satislar.aggregate(
+            toplam=Sum('toplam_tutar'),
+            adet=Count('id')
+        )
+        
+        toplam_urun_sayisi = satis_detaylari.aggregate(
+            toplam_adet=Sum('miktar')
+        )['toplam_adet'] or 0
+        
+        # Kayıtların kendisi değil id'leri saklanır; müşteri, ürün vb.
+        # adları değişince önbellekteki sonuç bayatlamasın
+        return {
+            'satis_idleri': list(satislar.values_list('pk', flat=True)),
+            'detay_idleri': list(satis_detaylari.values_list('pk', flat=True)),
+            'toplam_satis': toplam_satis['toplam'] or 0,
+            'satis_sayisi': toplam_satis['adet'] or 0,
+            'toplam_urun_sayisi': toplam_urun_sayisi,
+        }
+    
+    # Kapanmış günlerin sonuçları değişmez, önbellekten okunur
+    rapor = rapor_onbellegi('gunluk_satis_idleri', {}, secili_tarih, secili_tarih, hesapla)
+    satis_sirasi = {pk: sira for sira, pk in enumerate(rapor['satis_idleri'])}
+    detay_sirasi = {pk: sira for sira, pk in enumerate(rapor['detay_idleri'])}
     context = {
-        'satislar': satislar,
-        'satis_detaylari': satis_detaylari,
+        'satislar': sorted(
+            Satis.objects.filter(pk__in=satis_sirasi).select_related('musteri', 'satici').prefetch_related(
+                'satisdetay_set__varyant__urun__kategori', 'satisdetay_set__varyant__urun__marka'
+            ),
+            key=lambda satis: satis_sirasi[satis.pk],
+        ),
+        'satis_detaylari': sorted(
+            SatisDetay.objects.filter(pk__in=detay_sirasi).select_related(
+                'satis', 'satis__musteri', 'satis__satici',
+                'varyant', 'varyant__urun',
+                'varyant__urun__kategori', 'varyant__urun__marka',
+                'varyant__renk', 'varyant__beden'
+            ),
+            key=lambda detay: detay_sirasi[detay.pk],
+        ),
+        'toplam_satis': rapor['toplam_satis'],
+        'satis_sayisi': rapor['satis_sayisi'],
+        'toplam_urun_sayisi': rapor['toplam_urun_sayisi'],
         'tarih': secili_tarih.strftime('%Y-%m-%d'),
-        'toplam_satis': toplam_satis['toplam'] or 0,
-        'satis_sayisi': toplam_satis['adet'] or 0,
-        'toplam_urun_sayisi': toplam_urun_sayisi,
     }
     return render(request, 'rapor/gunluk_satis.html', context)
 
@@ -159,18 +188,23 @@ def cok_satan_urunler(request):
     else:
         bitis = datetime.strptime(bitis, '%Y-%m-%d').date()
     
-    # En çok satan ürünler
-    cok_satanlar = SatisDetay.objects.filter(
-        satis__satis_tarihi__date__range=[baslangic, bitis],
-        satis__durum='tamamlandi'
-    ).values('urun').annotate(
-        toplam_miktar=Sum('miktar'),
-        toplam_ciro=Sum('toplam_fiyat')
-    ).order_by('-toplam_miktar')[:20]
+    def hesapla():
+        # En çok satan ürünler
+        cok_satanlar = list(SatisDetay.objects.filter(
+            satis__satis_tarihi__date__range=[baslangic, bitis],
+            satis__durum='tamamlandi'
+        ).values('urun').annotate(
+            toplam_miktar=Sum('miktar'),
+            toplam_ciro=Sum('toplam_fiyat')
+        ).order_by('-toplam_miktar')[:20])
+        
+        return cok_satanlar
     
-    # Ürün bilgilerini ekle
+    # Ürün bilgileri önbellekten sonra eklenir (tek sorguda), adlar güncel kalır
+    cok_satanlar = [dict(item) for item in rapor_onbellegi('cok_satanlar', {}, baslangic, bitis, hesapla)]
+    urunler = Urun.objects.select_related('kategori').in_bulk([item['urun'] for item in cok_satanlar])
     for item in cok_satanlar:
-        item['urun_obj'] = Urun.objects.get(pk=item['urun'])
+        item['urun_obj'] = urunler.get(item['urun'])
     
     context = {
         'cok_satanlar': cok_satanlar,
@@ -225,6 +259,27 @@ def kar_zarar(request):
     return render(request, 'rapor/kar_zarar.html', context)
 
 
+@login_required
+def gelir_tablosu(request):
+    """Aylık gelir tablosu: satış, satılan malın maliyeti, giderler ve net kâr"""
+    try:
+        bitis = datetime.strptime(request.GET.get('bitis', ''), '%Y-%m').date()
+    except ValueError:
+        bitis = date.today()
+    
+    try:
+        ay_sayisi = min(max(int(request.GET.get('ay_sayisi', 12)), 1), 24)
+    except ValueError:
+        ay_sayisi = 12
+    
+    context = {
+        'tablo': gelir_tablosu_verisi(bitis, ay_sayisi),
+        'bitis': bitis,
+        'ay_sayisi': ay_sayisi,
+    }
+    return render(request, 'rapor/gelir_tablosu.html', context)
+
+
 @login_required
 def musteri_raporu(request):
     """Müşteri raporu view'ı"""
@@ -254,7 +309,106 @@ def musteri_raporu(request):
     return render(request, 'rapor/musteri_raporu.html', context)
 
 
+def _yaslandirma_raporu(yenile=False):
+    """Bugünün yaşlandırma raporu (gece hesaplanmadıysa şimdi hesaplanır)"""
+    bugun = timezone.localdate()
+    rapor = None if yenile else YaslandirmaRaporu.objects.filter(tarih=bugun).first()
+    return rapor or yaslandirma_olustur(bugun)
+
+
+@login_required
+def yaslandirma(request):
+    """Alacak yaşlandırma raporu (0-30 / 31-60 / 61-90 / 90+ gün)"""
+    if request.method == 'POST':
+        _yaslandirma_raporu(yenile=True)
+        return redirect('rapor:yaslandirma')
+    
+    dilim = request.GET.get('dilim', '')
+    if dilim not in dict((alan, baslik) for alan, baslik, *_ in DILIMLER):
+        dilim = ''
+    
+    rapor = _yaslandirma_raporu()
+    baglam = yaslandirma_baglami(rapor.veri, dilim)
+    
+    paginator = Paginator(baglam['musteriler'], 50)
+    page_obj = paginator.get_page(request.GET.get('page'))
+    
+    context = {
+        'rapor': rapor,
+        'dilimler': baglam['dilimler'],
+        'toplam': baglam['toplam'],
+        'page_obj': page_obj,
+        'dilim': dilim,
+    }
+    return render(request, 'rapor/yaslandirma.html', context)
+
+
+@login_required
+def yaslandirma_detay(request, musteri_id):
+    """Müşterinin açık kalemleri ve yaşları"""
+    from musteri.alacak import acik_kalemler
+    
+    musteri = get_object_or_404(Musteri, id=musteri_id)
+    bugun = timezone.localdate()
+    basliklar = dict((alan, baslik) for alan, baslik, *_ in DILIMLER)
+    
+    kalemler = []
+    dilim_toplamlari = dict.fromkeys(basliklar, 0)
+    for kalem in acik_kalemler(musteri):
+        yas, alan = kalem_dilimi(kalem.tarih, bugun)
+        dilim_toplamlari[alan] += kalem.kalan_tutar
+        kalemler.append({'kalem': kalem, 'yas': yas, 'dilim': basliklar[alan]})
+    
+    context = {
+        'musteri': musteri,
+        'kalemler': kalemler,
+        'dilimler': [
+            {'baslik': basliklar[alan], 'toplam': toplam}
+            for alan, toplam in dilim_toplamlari.items()
+        ],
+        'toplam': sum(dilim_toplamlari.values()),
+    }
+    return render(request, 'rapor/yaslandirma_detay.html', context)
+
+
 # Excel Export Views
+@login_required
+def yaslandirma_excel(request):
+    """Yaşlandırma raporu Excel export"""
+    rapor = _yaslandirma_raporu()
+    baglam = yaslandirma_baglami(rapor.veri, request.GET.get('dilim'))
+    
+    workbook = Workbook()
+    worksheet = workbook.active
+    worksheet.title = "Yaşlandırma"
+    
+    # Başlıklar
+    headers = ['Müşteri', 'Telefon', 'Kalem Sayısı', 'En Eski (Gün)'] + [baslik for _, baslik, *_ in DILIMLER] + ['Toplam']
+    for col, header in enumerate(headers, 1):
+        worksheet.cell(row=1, column=col, value=header)
+    
+    # Veriler
+    for row, musteri in enumerate(baglam['musteriler'], 2):
+        degerler = [musteri['ad'], musteri['telefon'], musteri['kalem_sayisi'], musteri['en_eski_gun']]
+        degerler += [float(tutar) for tutar in musteri['dilimler']] + [float(musteri['toplam'])]
+        for col, deger in enumerate(degerler, 1):
+            worksheet.cell(row=row, column=col, value=deger)
+    
+    # Dilim toplamları
+    row = len(baglam['musteriler']) + 2
+    worksheet.cell(row=row, column=1, value='TOPLAM')
+    for col, satir in enumerate(baglam['dilimler'], 5):
+        worksheet.cell(row=row, column=col, value=float(satir['toplam']))
+    worksheet.cell(row=row, column=5 + len(DILIMLER), value=float(baglam['toplam']))
+    
+    response = HttpResponse(
+        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    )
+    response['Content-Disposition'] = f'attachment; filename="yaslandirma_{rapor.tarih}.xlsx"'
+    workbook.save(response)
+    return response
+
+
 @login_required
 def gunluk_satis_excel(request):
     """Günlük satış Excel export"""
@@ -0,0 +1,150 @@
+"""
+Alacak yaşlandırma raporu.
+
+Müşterilerin açık kalemleri (musteri.AcikKalem) kalem tarihine göre 0-30,
+31-60, 61-90 ve 90+ gün dilimlerine ayrılır. Tüm müşterilerin dilim
+toplamları tek gruplu sorguyla (filtreli Sum) hesaplanır. Sonuç her gece
+`yaslandirma_raporu` komutuyla YaslandirmaRaporu olarak saklanır; rapor
+ekranı saklanan kaydı tek satır okuyarak gösterir.
+"""
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db.models import Count, Min, Q, Sum
+from django.utils import timezone
+
+from .gun_sonu import gun_araligi
+
+
+# (alan, başlık, alt sınır, üst sınır) - sınırlar gün cinsinden yaş
+DILIMLER = (
+    ('gun_0_30', '0-30 Gün', None, 30),
+    ('gun_31_60', '31-60 Gün', 30, 60),
+    ('gun_61_90', '61-90 Gün', 60, 90),
+    ('gun_90_ustu', '90+ Gün', 90, None),
+)
+
+
+def _para(deger):
+    return str(Decimal(deger or 0).quantize(Decimal('0.01')))
+
+
+def dilim_filtreleri(gun):
+    """Her dilim için kalem tarihine göre filtre ({alan: Q})"""
+    filtreler = {}
+    for alan, _baslik, alt, ust in DILIMLER:
+        filtre = Q()
+        if ust is not None:
+            filtre &= Q(tarih__gte=gun_araligi(gun - timedelta(days=ust))[0])
+        if alt is not None:
+            filtre &= Q(tarih__lt=gun_araligi(gun - timedelta(days=alt))[0])
+        filtreler[alan] = filtre
+    return filtreler
+
+
+def kalem_dilimi(kalem_tarihi, gun):
+    """Kalemin yaşı (gün) ve dilim alanı"""
+    yas = (gun - timezone.localtime(kalem_tarihi).date()).days
+    for alan, _baslik, alt, ust in DILIMLER:
+        if (alt is None or yas > alt) and (ust is None or yas <= ust):
+            return yas, alan
+    return yas, DILIMLER[0][0]
+
+
+def yaslandirma_verisi(gun=None):
+    """Yaşlandırma verisini hesapla (JSON'a yazılabilir sözlük)"""
+    from musteri.models import AcikKalem
+
+    gun = gun or timezone.localdate()
+    satirlar = AcikKalem.objects.filter(
+        kalan_tutar__gt=0,
+        satis__durum='tamamlandi',
+    ).values(
+        'musteri_id', 'musteri__ad', 'musteri__soyad', 'musteri__firma_adi',
+        'musteri__tip', 'musteri__telefon',
+    ).annotate(
+        toplam=Sum('kalan_tutar'),
+        kalem_sayisi=Count('id'),
+        en_eski=Min('tarih'),
+        **{
+            alan: Sum('kalan_tutar', filter=filtre)
+            for alan, filtre in dilim_filtreleri(gun).items()
+        }
+    ).order_by('-toplam', 'musteri_id')
+
+    toplamlar = {alan: Decimal('0') for alan, *_ in DILIMLER}
+    musteriler = []
+    for satir in satirlar:
+        ad = f"{satir['musteri__ad']} {satir['musteri__soyad']}"
+        if satir['musteri__tip'] == 'kurumsal' and satir['musteri__firma_adi']:
+            ad = satir['musteri__firma_adi']
+        musteri = {
+            'musteri_id': satir['musteri_id'],
+            'ad': ad,
+            'telefon': satir['musteri__telefon'],
+            'kalem_sayisi': satir['kalem_sayisi'],
+            'en_eski_gun': (gun - timezone.localtime(satir['en_eski']).date()).days,
+            'toplam': _para(satir['toplam']),
+        }
+        for alan, *_ in DILIMLER:
+            toplamlar[alan] += satir[alan] or 0
+            musteri[alan] = _para(satir[alan])
+        musteriler.append(musteri)
+
+    return {
+        'tarih': gun.isoformat(),
+        'dilimler': [
+            {'alan': alan, 'baslik': baslik, 'toplam': _para(toplamlar[alan])}
+            for alan, baslik, *_ in DILIMLER
+        ],
+        'toplam': _para(sum(toplamlar.values(), Decimal('0'))),
+        'musteriler': musteriler,
+    }
+
+
+def yaslandirma_baglami(veri, dilim=None):
+    """
+    yaslandirma_verisi çıktısını şablonun beklediği yapıya çevir.
+
+    `dilim` verilirse sadece o dilimde alacağı olan müşteriler listelenir.
+    """
+    musteriler = []
+    for musteri in veri['musteriler']:
+        if dilim and not Decimal(musteri.get(dilim, '0')):
+            continue
+        musteriler.append(dict(
+            musteri,
+            toplam=Decimal(musteri['toplam']),
+            dilimler=[Decimal(musteri[alan]) for alan, *_ in DILIMLER],
+        ))
+
+    toplam = Decimal(veri['toplam'])
+    return {
+        'dilimler': [
+            dict(
+                satir,
+                toplam=Decimal(satir['toplam']),
+                oran=Decimal(satir['toplam']) * 100 / toplam if toplam else Decimal('0'),
+            )
+            for satir in veri['dilimler']
+        ],
+        'toplam': toplam,
+        'musteriler': musteriler,
+    }
+
+
+def yaslandirma_olustur(gun=None):
+    """Yaşlandırma raporunu hesapla ve sakla (aynı günün kaydı yenilenir)"""
+    from .models import YaslandirmaRaporu
+
+    gun = gun or timezone.localdate()
+    veri = yaslandirma_verisi(gun)
+    rapor, _ = YaslandirmaRaporu.objects.update_or_create(
+        tarih=gun,
+        defaults={
+            'toplam': Decimal(veri['toplam']),
+            'musteri_sayisi': len(veri['musteriler']),
+            'veri': veri,
+        },
+    )
+    return rapor
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.5 on 2026-10-19 13:39
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def maliyetleri_doldur(apps, schema_editor):
+    """Mevcut kalemlerin maliyeti ürünün güncel alış fiyatından alınır"""
+    SatisDetay = apps.get_model('satis', 'SatisDetay')
+    Urun = apps.get_model('urun', 'Urun')
+    SatisDetay.objects.filter(birim_maliyet__isnull=True).update(
+        birim_maliyet=Subquery(Urun.objects.filter(pk=OuterRef('urun_id')).values('alis_fiyati')[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('satis', '0005_auto_20250906_1350'),
+        ('urun', '0009_auto_20250906_1049'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='satisdetay',
+            name='birim_maliyet',
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, max_digits=10, null=True, verbose_name='Birim Maliyet'),
+        ),
+        migrations.RunPython(maliyetleri_doldur, migrations.RunPython.noop),
+    ]
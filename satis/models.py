@@ -167,7 +167,79 @@ class Satis(models.Model):
         self.kdv_tutari = self.ara_toplam * (self.kdv_orani / 100)
         self.toplam_tutar = self.ara_toplam + self.kdv_tutari
         
+        from rapor.pano import kayitli_ozet, katki_gunu, katki_birlestir, gunluk_sayaclari_guncelle
+        from musteri.istatistik import kayitli_satis_katkisi, satis_katkisi, satis_istatistigi_guncelle
+        eski = kayitli_ozet(self)
+        eski_istatistik = kayitli_satis_katkisi(self)
+        ilk_kayit = self._state.adding
+        
         super().save(*args, **kwargs)
+        
+        # Müşteri istatistikleri (satış tamamlandı, iade/iptal edildi)
+        satis_istatistigi_guncelle(eski_istatistik, satis_katkisi(self))
+        self._istatistik_onceki = satis_katkisi(self)
+        
+        # Bu günü kapsayan rapor önbelleklerini geçersiz kıl
+        from rapor.onbellek import rapor_gunlerini_gecersiz_kil
+        rapor_gunlerini_gecersiz_kil(self.satis_tarihi)
+        
+        # Dashboard sayaçları: satış tamamlandı/iptal edildi ya da günü
+        # değiştiyse kalem ve ödemelerin katkısı da taşınır
+        yeni = self._pano_ozeti()
+        if not ilk_kayit and katki_gunu(eski) != katki_gunu(yeni):
+            kalemler = self._pano_kalem_degerleri()
+            eski = katki_birlestir(eski, eski and (eski[0], kalemler))
+            yeni = katki_birlestir(yeni, yeni and (yeni[0], kalemler))
+        gunluk_sayaclari_guncelle(eski, yeni)
+        self._pano_onceki = self._pano_ozeti()
+
+    def delete(self, *args, **kwargs):
+        satis_tarihi = self.satis_tarihi
+        
+        from rapor.pano import kayitli_ozet, katki_birlestir, gunluk_sayaclari_guncelle
+        from musteri.istatistik import kayitli_satis_katkisi, satis_istatistigi_guncelle
+        eski = kayitli_ozet(self)
+        eski_istatistik = kayitli_satis_katkisi(self)
+        if eski:
+            # Kalem ve ödemeler cascade ile silinir, katkıları burada düşülür
+            eski = katki_birlestir(eski, (eski[0], self._pano_kalem_degerleri()))
+        
+        sonuc = super().delete(*args, **kwargs)
+        
+        from rapor.onbellek import rapor_gunlerini_gecersiz_kil
+        rapor_gunlerini_gecersiz_kil(satis_tarihi)
+        gunluk_sayaclari_guncelle(eski, None)
+        satis_istatistigi_guncelle(eski_istatistik, None)
+        return sonuc
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        from rapor.pano import ozet_sakla
+        ozet_sakla(instance, ('durum', 'satis_tarihi', 'toplam_tutar'))
+        if not instance.get_deferred_fields() & {'durum', 'satis_tarihi', 'toplam_tutar', 'musteri_id'}:
+            from musteri.istatistik import satis_katkisi
+            instance._istatistik_onceki = satis_katkisi(instance)
+        return instance
+
+    def _pano_ozeti(self):
+        """Satışın günlük dashboard sayaçlarına katkısı"""
+        if self.durum != 'tamamlandi' or not self.satis_tarihi:
+            return None
+        return (self.satis_tarihi, {'ciro': self.toplam_tutar, 'satis_adedi': 1})
+
+    def _pano_kalem_degerleri(self):
+        """Satış kalemleri ve ödemelerinin sayaç değerleri"""
+        from django.db.models import F, Sum
+        kalemler = self.satisdetay_set.aggregate(
+            urun_adedi=Sum('miktar'),
+            satis_tutari=Sum('toplam_fiyat'),
+            maliyet=Sum(F('birim_maliyet') * F('miktar')),
+        )
+        degerler = {alan: deger or 0 for alan, deger in kalemler.items()}
+        for satir in self.odeme_set.values('odeme_tipi').annotate(toplam=Sum('tutar')):
+            degerler[satir['odeme_tipi']] = satir['toplam'] or 0
+        return degerler
 
     @property
     def toplam_urun_adedi(self):
@@ -273,7 +345,49 @@ class Odeme(models.Model):
         if self.odeme_tipi == 'kart' and self.taksit_sayisi and self.taksit_sayisi > 1:
             self.taksit_tutari = self.tutar / self.taksit_sayisi
         
+        from rapor.pano import kayitli_ozet, gunluk_sayaclari_guncelle
+        eski = kayitli_ozet(self)
+        
         super().save(*args, **kwargs)
+        
+        from rapor.onbellek import rapor_gunlerini_gecersiz_kil
+        rapor_gunlerini_gecersiz_kil(self.satis.satis_tarihi)
+        
+        gunluk_sayaclari_guncelle(self._pano_katkisi(eski), self._pano_katkisi(self._pano_ozeti()))
+        self._pano_onceki = self._pano_ozeti()
+        
+        # Açık hesap ödemesi müşterinin açık kalemidir
+        if self.odeme_tipi == 'acik_hesap' or (eski and eski[0] == 'acik_hesap'):
+            from musteri.alacak import odeme_kalemini_guncelle
+            odeme_kalemini_guncelle(self)
+    
+    def delete(self, *args, **kwargs):
+        from rapor.pano import kayitli_ozet, gunluk_sayaclari_guncelle
+        eski = self._pano_katkisi(kayitli_ozet(self))
+        satis_tarihi = self.satis.satis_tarihi
+        sonuc = super().delete(*args, **kwargs)
+        
+        from rapor.onbellek import rapor_gunlerini_gecersiz_kil
+        rapor_gunlerini_gecersiz_kil(satis_tarihi)
+        gunluk_sayaclari_guncelle(eski, None)
+        return sonuc
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        from rapor.pano import ozet_sakla
+        ozet_sakla(instance, ('odeme_tipi', 'tutar'))
+        return instance
+    
+    def _pano_ozeti(self):
+        return (self.odeme_tipi, self.tutar)
+    
+    def _pano_katkisi(self, ozet):
+        """Ödemenin günlük sayaçlara katkısı (sadece tamamlanmış satışlarda)"""
+        if not ozet or self.satis.durum != 'tamamlandi' or not self.satis.satis_tarihi:
+            return None
+        odeme_tipi, tutar = ozet
+        return (self.satis.satis_tarihi, {odeme_tipi: tutar})
 
 
 class SatisDetay(models.Model):
@@ -288,6 +402,9 @@ class SatisDetay(models.Model):
     # İndirim bilgisi (isteğe bağlı)
     indirim_orani = models.DecimalField(max_digits=5, decimal_places=2, default=0, verbose_name="İndirim Oranı (%)")
     indirim_tutari = models.DecimalField(max_digits=10, decimal_places=2, default=0, verbose_name="İndirim Tutarı")
+    
+    # Satış anındaki alış fiyatı (satılan malın maliyeti için)
+    birim_maliyet = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, editable=False, verbose_name="Birim Maliyet")
 
     class Meta:
         verbose_name = "Satış Detay"
@@ -309,9 +426,52 @@ class SatisDetay(models.Model):
         
         self.toplam_fiyat = toplam_without_discount - self.indirim_tutari
         
+        if self.birim_maliyet is None:
+            self.birim_maliyet = self.urun.alis_fiyati
+        
+        from rapor.pano import kayitli_ozet, gunluk_sayaclari_guncelle
+        eski = kayitli_ozet(self)
+        
         super().save(*args, **kwargs)
         
         # Stok güncelleme işlemi view'de yapılıyor, burada yapmıyoruz
+        
+        from rapor.onbellek import rapor_gunlerini_gecersiz_kil
+        rapor_gunlerini_gecersiz_kil(self.satis.satis_tarihi)
+        
+        gunluk_sayaclari_guncelle(self._pano_katkisi(eski), self._pano_katkisi(self._pano_ozeti()))
+        self._pano_onceki = self._pano_ozeti()
+
+    def delete(self, *args, **kwargs):
+        from rapor.pano import kayitli_ozet, gunluk_sayaclari_guncelle
+        eski = self._pano_katkisi(kayitli_ozet(self))
+        satis_tarihi = self.satis.satis_tarihi
+        sonuc = super().delete(*args, **kwargs)
+        
+        from rapor.onbellek import rapor_gunlerini_gecersiz_kil
+        rapor_gunlerini_gecersiz_kil(satis_tarihi)
+        gunluk_sayaclari_guncelle(eski, None)
+        return sonuc
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        from rapor.pano import ozet_sakla
+        ozet_sakla(instance, ('miktar', 'toplam_fiyat', 'birim_maliyet'))
+        return instance
+
+    def _pano_ozeti(self):
+        return {
+            'urun_adedi': self.miktar,
+            'satis_tutari': self.toplam_fiyat,
+            'maliyet': (self.birim_maliyet or 0) * self.miktar,
+        }
+
+    def _pano_katkisi(self, degerler):
+        """Kalemin günlük sayaçlara katkısı (sadece tamamlanmış satışlarda)"""
+        if not degerler or self.satis.durum != 'tamamlandi' or not self.satis.satis_tarihi:
+            return None
+        return (self.satis.satis_tarihi, degerler)
 
     @property
     def ara_toplam(self):
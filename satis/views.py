@@ -3,12 +3,17 @@ from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.http import JsonResponse
 from django.core.paginator import Paginator
+from django.db import transaction
 from django.db.models import Q
 from django.views.decorators.csrf import csrf_exempt
 from .models import Satis, SatisDetay, Odeme, SiparisNumarasi
 from urun.models import Urun, UrunVaryanti
 from musteri.models import Musteri
-from kasa.models import Kasa, KasaHareket
+from musteri.alacak import AcikHesapLimitiAsildi, acik_hesap_borclandir
+from musteri.arama import musteri_bul
+from kasa.models import KasaHareket
+from kasa.defter import ODEME_KASA_TIPLERI, kasa_bul, kaydet
+from hediye.kullanim import cekleri_kullan
 
 
 # @login_required  # TEST İÇİN GEÇİCİ OLARAK KALDIRILDI
@@ -155,8 +160,36 @@ def satis_detay(request, pk):
     return render(request, 'satis/satis_detay.html', context)
 
 
+def _satis_hatasi(mesaj):
+    """Satış tamamlanamadı: yarım kalan satış, stok ve kasa kayıtlarını geri al"""
+    transaction.set_rollback(True)
+    return JsonResponse({'success': False, 'message': mesaj})
+
+
+def _hediye_ceki_kullanimlari(data, tutar):
+    """
+    İstekteki hediye çeki kullanımları [(kod, tutar)].
+    
+    Birden fazla çek `hediye_cekleri` listesiyle ({kod, kullanilacak_tutar}),
+    tek çek `hediye_ceki` ile gönderilir; tek çekten `tutar`ın tamamı düşülür.
+    """
+    from decimal import Decimal
+    
+    cekler = data.get('hediye_cekleri') or ([data['hediye_ceki']] if data.get('hediye_ceki') else [])
+    if not cekler:
+        raise ValueError('Hediye çeki seçilmedi!')
+    if len(cekler) == 1:
+        return [(cekler[0].get('kod'), tutar)]
+    
+    kullanimlar = [(cek.get('kod'), Decimal(str(cek.get('kullanilacak_tutar', 0)))) for cek in cekler]
+    if abs(sum(t for _, t in kullanimlar) - tutar) > Decimal('0.01'):
+        raise ValueError(f'Hediye çeki tutarları eşleşmiyor! Beklenen: {tutar}')
+    return kullanimlar
+
+
 @csrf_exempt
 @login_required
+@transaction.atomic
 def satis_tamamla(request):
     """Satış tamamlama view'ı"""
     if request.method == 'POST':
@@ -221,6 +254,7 @@ def satis_tamamla(request):
             aciklama = data.get('aciklama', '').strip() if data else ''
             
             # Satış oluştur
+            kasa_hareketleri = []
             satis = Satis.objects.create(
                 musteri=musteri,
                 ara_toplam=ara_toplam,  # İndirim öncesi ara toplam
@@ -258,25 +292,13 @@ def satis_tamamla(request):
                     try:
                         varyant = UrunVaryanti.objects.get(pk=varyant_id, aktif=True)
                         if varyant.stok_miktari < miktar:
-                            satis.delete()  # Satışı iptal et
-                            return JsonResponse({
-                                'success': False, 
-                                'message': f'{urun.ad} ({varyant.varyasyon_adi}) için yeterli stok yok! Mevcut: {varyant.stok_miktari}'
-                            })
+                            return _satis_hatasi(f'{urun.ad} ({varyant.varyasyon_adi}) için yeterli stok yok! Mevcut: {varyant.stok_miktari}')
                     except UrunVaryanti.DoesNotExist:
-                        satis.delete()  # Satışı iptal et
-                        return JsonResponse({
-                            'success': False, 
-                            'message': f'{urun.ad} için geçerli varyant bulunamadı!'
-                        })
+                        return _satis_hatasi(f'{urun.ad} için geçerli varyant bulunamadı!')
                 else:
                     # Toplam stok kontrolü
                     if urun.toplam_stok < miktar:
-                        satis.delete()  # Satışı iptal et
-                        return JsonResponse({
-                            'success': False, 
-                            'message': f'{urun.ad} için yeterli stok yok! Mevcut: {urun.toplam_stok}'
-                        })
+                        return _satis_hatasi(f'{urun.ad} için yeterli stok yok! Mevcut: {urun.toplam_stok}')
                 
                 # Satış detayı oluştur
                 SatisDetay.objects.create(
@@ -311,11 +333,7 @@ def satis_tamamla(request):
                 # Karma ödeme validasyonu
                 toplam_odeme = nakit_tutar + kart_tutar + havale_tutar + hediye_ceki_tutar
                 if abs(toplam_odeme - genel_toplam) > Decimal('0.01'):
-                    satis.delete()
-                    return JsonResponse({
-                        'success': False, 
-                        'message': f'Ödeme tutarları eşleşmiyor! Toplam: {genel_toplam}, Ödenen: {toplam_odeme}'
-                    })
+                    return _satis_hatasi(f'Ödeme tutarları eşleşmiyor! Toplam: {genel_toplam}, Ödenen: {toplam_odeme}')
                 
                 # Nakit ödeme kaydı
                 if nakit_tutar > 0:
@@ -325,9 +343,9 @@ def satis_tamamla(request):
                         tutar=nakit_tutar,
                     )
                     # Kasa hareketi - nakit kasasına giriş
-                    nakit_kasa = Kasa.objects.filter(tip='nakit', aktif=True).first()
+                    nakit_kasa = kasa_bul(ODEME_KASA_TIPLERI['nakit'])
                     if nakit_kasa:
-                        KasaHareket.objects.create(
+                        kasa_hareketleri.append(KasaHareket(
                             kasa=nakit_kasa,
                             tip='giris',
                             kaynak='satis',
@@ -335,7 +353,7 @@ def satis_tamamla(request):
                             aciklama=f'Satış #{satis.satis_no} - Nakit Ödeme',
                             satis_id=satis.id,
                             kullanici=request.user
-                        )
+                        ))
                 
                 # Kart ödeme kaydı
                 if kart_tutar > 0:
@@ -345,9 +363,9 @@ def satis_tamamla(request):
                         tutar=kart_tutar,
                     )
                     # Kasa hareketi - POS kasasına giriş
-                    pos_kasa = Kasa.objects.filter(tip='pos', aktif=True).first()
+                    pos_kasa = kasa_bul(ODEME_KASA_TIPLERI['kart'])
                     if pos_kasa:
-                        KasaHareket.objects.create(
+                        kasa_hareketleri.append(KasaHareket(
                             kasa=pos_kasa,
                             tip='giris',
                             kaynak='satis',
@@ -355,7 +373,7 @@ def satis_tamamla(request):
                             aciklama=f'Satış #{satis.satis_no} - Kart Ödeme',
                             satis_id=satis.id,
                             kullanici=request.user
-                        )
+                        ))
                 
                 # Havale ödeme kaydı
                 if havale_tutar > 0:
@@ -365,9 +383,9 @@ def satis_tamamla(request):
                         tutar=havale_tutar,
                     )
                     # Kasa hareketi - banka kasasına giriş
-                    banka_kasa = Kasa.objects.filter(tip='banka', aktif=True).first()
+                    banka_kasa = kasa_bul(ODEME_KASA_TIPLERI['havale'])
                     if banka_kasa:
-                        KasaHareket.objects.create(
+                        kasa_hareketleri.append(KasaHareket(
                             kasa=banka_kasa,
                             tip='giris',
                             kaynak='satis',
@@ -375,57 +393,36 @@ def satis_tamamla(request):
                             aciklama=f'Satış #{satis.satis_no} - Havale Ödeme',
                             satis_id=satis.id,
                             kullanici=request.user
-                        )
+                        ))
                 
-                # Hediye çeki ödemesi
-                if hediye_ceki_tutar > 0 and data.get('hediye_ceki'):
-                    from hediye.models import HediyeCeki, HediyeCekiKullanim
-                    
-                    hediye_ceki_data = data.get('hediye_ceki')
+                # Hediye çeki ödemesi (birden fazla çek kullanılabilir)
+                if hediye_ceki_tutar > 0:
                     try:
-                        hediye_ceki = HediyeCeki.objects.get(
-                            kod=hediye_ceki_data['kod'],
-                            durum='aktif'
-                        )
-                        
-                        # Hediye çeki kullanım kaydı oluştur
-                        HediyeCekiKullanim.objects.create(
-                            hediye_ceki=hediye_ceki,
-                            kullanilan_tutar=hediye_ceki_tutar,
-                            satis_id=satis.id,
+                        cekleri_kullan(
+                            _hediye_ceki_kullanimlari(data, hediye_ceki_tutar),
+                            satis,
                             kullanan=request.user,
-                            aciklama=f'Satış #{satis.satis_no} - Karma Ödeme'
+                            aciklama=f'Satış #{satis.satis_no} - Karma Ödeme',
                         )
-                        
-                        # Hediye çeki bakiyesini güncelle
-                        hediye_ceki.kalan_tutar -= hediye_ceki_tutar
-                        if hediye_ceki.kalan_tutar <= 0:
-                            hediye_ceki.durum = 'kullanilmis'
-                        hediye_ceki.save()
-                        
-                        # Ödeme kaydı oluştur
-                        Odeme.objects.create(
-                            satis=satis,
-                            odeme_tipi='hediye_ceki',
-                            tutar=hediye_ceki_tutar,
-                            hediye_ceki_kodu=hediye_ceki.kod
-                        )
-                        
-                    except HediyeCeki.DoesNotExist:
-                        satis.delete()
-                        return JsonResponse({
-                            'success': False, 
-                            'message': f'Hediye çeki bulunamadı: {hediye_ceki_data["kod"]}'
-                        })
+                    except ValueError as e:
+                        return _satis_hatasi(str(e))
                         
             elif odeme_detaylari.get('odeme_yontemi') == 'acik_hesap':
                 # Açık hesap - müşteri gerekli
                 if not musteri:
-                    return JsonResponse({'success': False, 'message': 'Açık hesap satışı için müşteri seçmelisiniz!'})
+                    return _satis_hatasi('Açık hesap satışı için müşteri seçmelisiniz!')
                 
-                # Açık hesap bakiyesini güncelle (borç ekle)
-                musteri.acik_hesap_bakiye = (musteri.acik_hesap_bakiye or Decimal('0')) + genel_toplam
-                musteri.save()
+                # Açık hesap bakiyesine borç ekle (limit kontrolü atomik)
+                try:
+                    acik_hesap_borclandir(
+                        musteri,
+                        genel_toplam,
+                        aciklama=f'Veresiye Satış - {satis.satis_no}',
+                        satis_id=satis.id,
+                        user=request.user,
+                    )
+                except AcikHesapLimitiAsildi as e:
+                    return _satis_hatasi(str(e))
                 
                 # Ödeme kaydı oluştur
                 Odeme.objects.create(
@@ -451,19 +448,34 @@ def satis_tamamla(request):
                     odeme_tipi = 'acik_hesap'
                     # Veresiye satış - müşteri borcunu artır
                     if satis.musteri:
-                        satis.musteri.borc_hareket_ekle(
-                            tutar=genel_toplam,
-                            aciklama=f'Veresiye Satış - {satis.satis_no}',
-                            satis_id=satis.id,
-                            user=request.user
-                        )
+                        try:
+                            acik_hesap_borclandir(
+                                satis.musteri,
+                                genel_toplam,
+                                aciklama=f'Veresiye Satış - {satis.satis_no}',
+                                satis_id=satis.id,
+                                user=request.user,
+                            )
+                        except AcikHesapLimitiAsildi as e:
+                            return _satis_hatasi(str(e))
                         # Açık hesap satışları veresiye olarak işaretlenir
                         # Ödeme durumu Odeme modeli üzerinden takip edilir
                 else:
                     odeme_tipi = 'nakit'
                 
+                # Hediye çeki bakiyeleri düşülür, ödeme kayıtları çek başına yazılır
+                if odeme_tipi == 'hediye_ceki':
+                    try:
+                        cekleri_kullan(
+                            _hediye_ceki_kullanimlari(data, genel_toplam),
+                            satis,
+                            kullanan=request.user,
+                        )
+                    except ValueError as e:
+                        return _satis_hatasi(str(e))
+                
                 # Veresiye satış değilse ödeme kaydı oluştur
-                if odeme_tipi != 'acik_hesap':
+                elif odeme_tipi != 'acik_hesap':
                     Odeme.objects.create(
                         satis=satis,
                         odeme_tipi=odeme_tipi,
@@ -472,27 +484,20 @@ def satis_tamamla(request):
                     )
                     
                     # Kasa hareketi oluştur
-                    kasa = None
-                    if odeme_tipi == 'nakit':
-                        kasa = Kasa.objects.filter(tip='nakit', aktif=True).first()
-                        aciklama = f'Satış #{satis.satis_no} - Nakit Ödeme'
-                    elif odeme_tipi == 'kart':
-                        kasa = Kasa.objects.filter(tip='pos', aktif=True).first()
-                        aciklama = f'Satış #{satis.satis_no} - Kart Ödeme'
-                    elif odeme_tipi == 'havale':
-                        kasa = Kasa.objects.filter(tip='banka', aktif=True).first()
-                        aciklama = f'Satış #{satis.satis_no} - Havale Ödeme'
-                    
+                    kasa = kasa_bul(ODEME_KASA_TIPLERI.get(odeme_tipi))
                     if kasa:
-                        KasaHareket.objects.create(
+                        kasa_hareketleri.append(KasaHareket(
                             kasa=kasa,
                             tip='giris',
                             kaynak='satis',
                             tutar=genel_toplam,
-                            aciklama=aciklama,
+                            aciklama=f'Satış #{satis.satis_no} - {odeme_tipi.capitalize()} Ödeme',
                             satis_id=satis.id,
                             kullanici=request.user
-                        )
+                        ))
+            
+            # Kasa hareketleri tek seferde işlenir
+            kaydet(kasa_hareketleri)
             
             # Session'ı temizle
             if 'sepet' in request.session:
@@ -508,7 +513,7 @@ def satis_tamamla(request):
             })
             
         except Exception as e:
-            return JsonResponse({'success': False, 'message': f'Hata: {str(e)}'})
+            return _satis_hatasi(f'Hata: {str(e)}')
     
     return JsonResponse({'success': False, 'message': 'Geçersiz istek!'})
 
@@ -571,11 +576,9 @@ def iade_ana_sayfa(request):
 @login_required
 def satis_iade(request, pk):
     """Satış iade view'ı - Basit ve stabil versiyon"""
-    from hediye.models import HediyeCeki
+    from hediye.uretim import cekleri_olustur
     from django.utils import timezone
     from datetime import timedelta
-    import string
-    import random
     from decimal import Decimal
     
     satis = get_object_or_404(Satis, pk=pk)
@@ -634,20 +637,15 @@ def satis_iade(request, pk):
             
             print(f"✅ {len(iade_edilecek_urunler)} ürün iade edilecek, toplam: {toplam_iade_tutari} ₺")
             
-            # Hediye çeki oluştur
-            hediye_kodu = ''.join(random.choices(string.ascii_uppercase + string.digits, k=8))
-            
-            hediye_ceki = HediyeCeki.objects.create(
-                kod=hediye_kodu,
-                tutar=toplam_iade_tutari,
-                kalan_tutar=toplam_iade_tutari,
-                gecerlilik_tarihi=timezone.now().date() + timedelta(days=365),
+            # Hediye çeki oluştur (çakışmasız kod)
+            hediye_ceki = cekleri_olustur(
+                1,
+                toplam_iade_tutari,
+                timezone.now().date() + timedelta(days=365),
                 olusturan=request.user,
                 musteri=satis.musteri,
-                durum='aktif',
-                aktif=True,
                 aciklama=f'İade - Satış #{satis.satis_no} ({satis.siparis_tarihi.strftime("%d.%m.%Y")})'
-            )
+            )[0]
             
             print(f"✅ Hediye çeki oluşturuldu: {hediye_ceki.kod}")
             
@@ -1057,13 +1055,7 @@ def musteri_ara(request):
     query = request.GET.get('q', '')
     
     if len(query) >= 2:
-        musteriler = Musteri.objects.filter(
-            Q(ad__icontains=query) | 
-            Q(soyad__icontains=query) | 
-            Q(telefon__icontains=query) |
-            Q(firma_adi__icontains=query),
-            aktif=True
-        )[:10]
+        musteriler = musteri_bul(query, Musteri.objects.filter(aktif=True))[:10]
         
         data = []
         for musteri in musteriler:
@@ -0,0 +1,191 @@
+"""
+İçerik adresli medya deposu.
+
+Yüklenen dosyalar içeriklerinin SHA-256 özetiyle adlandırılır
+(icerik/ab/abcd...jpg); aynı dosya kaç kez yüklenirse yüklensin diskte tek
+kopya durur. Resimler kaydedilmeden önce EXIF yönüne göre döndürülür, üst
+verileri (konum vb.) atılır, uzun kenarı EN_BUYUK_KENAR'a küçültülür ve
+yeniden sıkıştırılır.
+
+Liste ve detay sayfaları orijinal yerine BOYUTLAR'daki küçültülmüş
+kopyaları kullanır (`medya` şablon etiketi). Kopyalar ilk istendiğinde
+üretilip boyutlar/ altında saklanır; dosya adı içerikten türediği için
+adresleri değişmez ve tarayıcıda süresiz önbelleklenebilir.
+
+Açıldığında belleği dolduracak kadar büyük resimler (decompression bomb)
+işlenmeden saklanmaz: alan doğrulayıcısı (`resim_boyutu_dogrula`) formda
+hata verir, depo da bu resimleri ResimCokBuyuk ile reddeder.
+
+Aynı dosya birden fazla kayıt tarafından kullanılabileceğinden depo
+dosya silmez.
+"""
+import hashlib
+import io
+import os
+import warnings
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation, ValidationError
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+
+ICERIK_DIZINI = 'icerik'
+BOYUT_DIZINI = 'boyutlar'
+
+# Saklanan orijinallerin en uzun kenarı (piksel)
+EN_BUYUK_KENAR = 2000
+JPEG_KALITESI = 85
+
+# Ad -> en uzun kenar (piksel)
+BOYUTLAR = {
+    'kucuk': 160,
+    'liste': 400,
+    'detay': 1000,
+}
+
+
+class ResimCokBuyuk(SuspiciousFileOperation):
+    """Resmin piksel sayısı PIL'in güvenli sınırını (MAX_IMAGE_PIXELS) aşıyor"""
+
+
+def _piksel_siniri_asildi_mi(dosya):
+    """Resim başlığına göre piksel sınırı aşılıyor mu (resim değilse False)"""
+    from PIL import Image
+
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', Image.DecompressionBombWarning)
+            with Image.open(dosya) as resim:
+                pikseller = resim.width * resim.height
+    except Image.DecompressionBombError:
+        return True
+    except Exception:
+        return False
+    return bool(Image.MAX_IMAGE_PIXELS) and pikseller > Image.MAX_IMAGE_PIXELS
+
+
+def resim_boyutu_dogrula(deger):
+    """Depodaki dosya alanları için: yeni yüklenen aşırı büyük resimleri reddet"""
+    if getattr(deger, '_committed', True):
+        return
+    dosya = deger.file
+    dosya.seek(0)
+    try:
+        if _piksel_siniri_asildi_mi(dosya):
+            raise ValidationError('Resim çok büyük, lütfen daha küçük çözünürlüklü bir resim yükleyin.')
+    finally:
+        dosya.seek(0)
+
+
+def _resim_kaydet(resim, hedef):
+    """Resmi saydamlığı varsa PNG, yoksa JPEG olarak yaz; uzantıyı döndür"""
+    if resim.mode in ('RGBA', 'LA') or (resim.mode == 'P' and 'transparency' in resim.info):
+        resim.convert('RGBA').save(hedef, format='PNG', optimize=True)
+        return '.png'
+    if resim.mode != 'RGB':
+        resim = resim.convert('RGB')
+    resim.save(hedef, format='JPEG', quality=JPEG_KALITESI, optimize=True, progressive=True)
+    return '.jpg'
+
+
+def resmi_isle(veri):
+    """
+    Resmi döndür, üst verisini at, küçült ve yeniden sıkıştır.
+
+    (yeni veri, uzantı) döndürür; resim değilse ya da hareketli bir
+    resimse None. Piksel sınırını aşan resimler için ResimCokBuyuk.
+    """
+    from PIL import Image, ImageOps, UnidentifiedImageError
+
+    try:
+        resim = Image.open(io.BytesIO(veri))
+        resim.load()
+    except Image.DecompressionBombError:
+        raise ResimCokBuyuk('Resim çok büyük, işlenmeden saklanmaz.')
+    except (UnidentifiedImageError, OSError):
+        return None
+    if getattr(resim, 'is_animated', False):
+        return None
+
+    resim = ImageOps.exif_transpose(resim)
+    resim.thumbnail((EN_BUYUK_KENAR, EN_BUYUK_KENAR), Image.LANCZOS)
+    hedef = io.BytesIO()
+    uzanti = _resim_kaydet(resim, hedef)
+    return hedef.getvalue(), uzanti
+
+
+@deconstructible
+class IcerikDeposu(FileSystemStorage):
+    """Dosyaları içerik özetiyle adlandıran, resimleri sıkıştıran depo"""
+
+    def __init__(self, **kwargs):
+        # Aynı ad her zaman aynı içeriktir, üzerine yazmak zararsızdır
+        kwargs.setdefault('allow_overwrite', True)
+        super().__init__(**kwargs)
+
+    def _save(self, name, content):
+        content.seek(0)
+        veri = content.read()
+        uzanti = os.path.splitext(name)[1].lower()
+
+        islenmis = resmi_isle(veri)
+        if islenmis:
+            veri, uzanti = islenmis
+
+        ozet = hashlib.sha256(veri).hexdigest()
+        name = f'{ICERIK_DIZINI}/{ozet[:2]}/{ozet}{uzanti}'
+        if self.exists(name):
+            return name
+        return super()._save(name, ContentFile(veri))
+
+    def delete(self, name):
+        # Dosya başka kayıtlarca da kullanılıyor olabilir
+        pass
+
+
+icerik_deposu = IcerikDeposu()
+boyut_deposu = FileSystemStorage(
+    location=os.path.join(settings.MEDIA_ROOT, BOYUT_DIZINI),
+    base_url=f'{settings.MEDIA_URL}{BOYUT_DIZINI}/',
+    allow_overwrite=True,
+)
+
+
+def boyut_adi(boyut, name):
+    """Küçültülmüş kopyanın boyut deposundaki adı"""
+    return f'{boyut}/{name}'
+
+
+def boyut_olustur(boyut, name):
+    """
+    `name` dosyasının `boyut` kopyasını (yoksa) üret; kopyanın adını döndür.
+
+    Kopya orijinalle aynı biçimde saklanır. Resim olmayan dosyalar için None.
+    """
+    from PIL import Image, ImageOps, UnidentifiedImageError
+
+    hedef_adi = boyut_adi(boyut, name)
+    if boyut_deposu.exists(hedef_adi):
+        return hedef_adi
+
+    try:
+        with icerik_deposu.open(name) as dosya:
+            resim = Image.open(dosya)
+            resim.load()
+    except (FileNotFoundError, UnidentifiedImageError, OSError, Image.DecompressionBombError):
+        return None
+
+    resim = ImageOps.exif_transpose(resim)
+    kenar = BOYUTLAR[boyut]
+    resim.thumbnail((kenar, kenar), Image.LANCZOS)
+
+    hedef = io.BytesIO()
+    bicim = Image.registered_extensions().get(os.path.splitext(name)[1].lower(), 'JPEG')
+    if bicim == 'JPEG':
+        resim.convert('RGB').save(hedef, format='JPEG', quality=JPEG_KALITESI, optimize=True)
+    else:
+        resim.save(hedef, format=bicim)
+    boyut_deposu.save(hedef_adi, ContentFile(hedef.getvalue()))
+    return hedef_adi
@@ -92,6 +92,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'kullanici.middleware.UserSessionMiddleware',  # Oturum kontrolü
     'kullanici.middleware.PermissionCheckMiddleware',  # Yetki kontrolü
+    'log.middleware.DenetimMiddleware',  # Denetim logları için istek bilgisi
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -188,6 +189,36 @@ SESSION_COOKIE_AGE = 86400  # 24 hours
 SESSION_SAVE_EVERY_REQUEST = True
 SESSION_EXPIRE_AT_BROWSER_CLOSE = False
 
+# Cache settings
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Rapor sonuçları (rapor/onbellek.py) - süreçler arası paylaşılır
+    'raporlar': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache' / 'raporlar',
+        'TIMEOUT': None,
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    },
+}
+RAPOR_ONBELLEK = 'raporlar'
+
+# Aktivite logları kuyruğa alınıp arka planda toplu yazılır (log/yazici.py).
+# Testlerde AKTIVITE_LOG_SENKRON = True ile kayıtlar hemen yazılır.
+AKTIVITE_LOG_TOPLU_ADET = 100
+AKTIVITE_LOG_BEKLEME_MS = 200
+AKTIVITE_LOG_SENKRON = False
+# Bu boyuttan (bayt) büyük eski/yeni değer farkları zlib ile sıkıştırılır (log/fark.py)
+AKTIVITE_LOG_SIKISTIRMA_ESIGI = 4096
+# Süresi dolan loglar silinmeden önce aylık gzip JSONL olarak arşivlenir (log/arsiv.py)
+LOG_ARSIV_DIZINI = BASE_DIR / 'log_arsivi'
+LOG_TEMIZLEME_PARCA = 1000
+# Log istatistikleri en fazla bu kadar saniye önbellekten okunur (log/istatistik.py)
+LOG_ISTATISTIK_SURESI = 60
+
 # Development optimizations for auto-reload
 if DEBUG:
     # Auto-reload optimizations
@@ -199,10 +230,9 @@ if DEBUG:
     os.environ.setdefault('DJANGO_AUTORELOAD_EXTRA_FILES', '')
     
     # Cache ayarları - development için disable
-    CACHES = {
-        'default': {
-            'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
-        }
+    # (rapor önbelleği sürümlü geçersiz kılındığı için açık kalır)
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
     }
     
     # Template cache'i devre dışı bırak
@@ -0,0 +1,15 @@
+from django import template
+from django.urls import reverse
+
+register = template.Library()
+
+
+@register.filter
+def boyut(dosya, ad='liste'):
+    """
+    Yüklenen resmin küçültülmüş kopyasının adresi (bkz. stoktakip.depolama)
+    Örnek: {{ urun.resim|boyut:'kucuk' }}
+    """
+    if not dosya:
+        return ''
+    return reverse('resim_boyutu', args=[ad, dosya.name])
@@ -44,9 +44,14 @@ urlpatterns = [
     # Ana sayfa
     path('', redirect_to_dashboard, name='home'),
     path('dashboard/', login_required(views.dashboard_view), name='dashboard'),
+    path('dashboard/veri/', login_required(views.dashboard_veri_view), name='dashboard_veri'),
     path('gunluk-rapor/', login_required(views.gunluk_rapor_view), name='gunluk_rapor'),
+    path('gunluk-rapor/gun-sonu/', login_required(views.gun_sonu_al_view), name='gun_sonu_al'),
     path('gunluk-rapor/pdf/', login_required(views.gunluk_rapor_pdf_view), name='gunluk_rapor_pdf'),
     
+    # Yüklenen resimlerin küçültülmüş kopyaları
+    path('medya/<str:boyut>/<path:ad>', views.resim_boyutu_view, name='resim_boyutu'),
+    
     # Authentication
     path('kullanici/', include('kullanici.urls', namespace='kullanici')),
     
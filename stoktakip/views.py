@@ -1,5 +1,10 @@
-﻿from django.shortcuts import render
-from django.http import HttpResponse
+﻿from django.shortcuts import render, redirect
+from django.contrib import messages
+from django.urls import reverse
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse
+from django.utils.http import quote_etag
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_GET, require_POST
 from datetime import date, datetime
 from django.db.models import Sum, Count, Q
 from satis.models import Satis, SatisDetay, Odeme
@@ -7,11 +12,38 @@ from urun.models import UrunVaryanti
 from musteri.models import Musteri
 from gider.models import Gider
 from kasa.models import Kasa, KasaHareket
+from rapor.onbellek import rapor_onbellegi
+from rapor.pano import pano_verisi, pano_surumu
+from rapor.gun_sonu import gun_sonu_verisi, gunluk_rapor_baglami, gun_sonu_al
+from rapor.models import GunSonuRaporu
 
 def dashboard_view(request):
-    context = {'bugun': date.today(), 'toplam_urun': 0, 'toplam_musteri': 0, 'bugunki_satis': 0, 'bugunki_gider_toplam': 0}
+    # Sayaçlar yazma işlemlerinde güncellenir, burada sadece okunur
+    pano = pano_verisi()
+    context = {
+        'bugun': date.today(),
+        'pano': pano,
+        'toplam_urun': pano['urun_sayisi'],
+        'toplam_musteri': pano['musteri_sayisi'],
+        'bugunki_satis': pano['ciro'],
+        'bugunki_gider_toplam': pano['gider'],
+    }
     return render(request, 'dashboard.html', context)
 
+def _dashboard_etag(request):
+    return pano_surumu()
+
+@require_GET
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=_dashboard_etag)
+def dashboard_veri_view(request):
+    """Dashboard sayaçları (JSON) - değişiklik yoksa 304 döner"""
+    pano = pano_verisi()
+    response = JsonResponse(pano)
+    # Okuma sırasında sayaç değiştiyse ETag gönderilen veriye ait olmalı
+    response['ETag'] = quote_etag(pano['surum'])
+    return response
+
 def gunluk_rapor_view(request):
     # Tarih parametresi
     tarih = request.GET.get('tarih', date.today().strftime('%Y-%m-%d'))
@@ -21,143 +53,59 @@ def gunluk_rapor_view(request):
     except ValueError:
         secili_tarih = date.today()
     
-    # Günlük satışlar
-    gunluk_satislar = Satis.objects.filter(
-        satis_tarihi__date=secili_tarih,
-        durum='tamamlandi'
-    )
-    
-    # Satış istatistikleri
-    toplam_satis = gunluk_satislar.aggregate(
-        toplam_tutar=Sum('toplam_tutar'),
-        satis_adedi=Count('id')
-    )
-    
-    # Ödeme yöntemi bazında satışlar
-    nakit_satislar = Odeme.objects.filter(
-        satis__satis_tarihi__date=secili_tarih,
-        satis__durum='tamamlandi',
-        odeme_tipi='nakit'
-    ).aggregate(
-        toplam=Sum('tutar'), 
-        adet=Count('id')
-    )
-    
-    kart_satislar = Odeme.objects.filter(
-        satis__satis_tarihi__date=secili_tarih,
-        satis__durum='tamamlandi',
-        odeme_tipi='kart'
-    ).aggregate(
-        toplam=Sum('tutar'), 
-        adet=Count('id')
-    )
-    
-    hediye_ceki_satislar = Odeme.objects.filter(
-        satis__satis_tarihi__date=secili_tarih,
-        satis__durum='tamamlandi',
-        odeme_tipi='hediye_ceki'
-    ).aggregate(
-        toplam=Sum('tutar'), 
-        adet=Count('id')
-    )
+    # Kapatılmış günler saklanan Z raporundan tek satır okunarak gösterilir
+    gun_sonu = GunSonuRaporu.objects.filter(tarih=secili_tarih).select_related('olusturan').first()
     
-    # En çok satan ürünler
-    cok_satan_urunler = SatisDetay.objects.filter(
-        satis__satis_tarihi__date=secili_tarih,
-        satis__durum='tamamlandi'
-    ).values(
-        'urun__ad'
-    ).annotate(
-        toplam_miktar=Sum('miktar'),
-        toplam_ciro=Sum('toplam_fiyat')
-    ).order_by('-toplam_miktar')[:10]
-    
-    # Template için uygun format
-    cok_satan_urunler = [{
-        'urun': {'ad': item['urun__ad']},
-        'toplam_miktar': item['toplam_miktar'],
-        'toplam_ciro': item['toplam_ciro']
-    } for item in cok_satan_urunler]
-    
-    # Son satışlar
-    son_satislar = Satis.objects.filter(
-        satis_tarihi__date=secili_tarih,
-        durum='tamamlandi'
-    ).select_related('musteri').order_by('-satis_tarihi')[:10]
-    
-    # Günlük giderler
-    gunluk_giderler = Gider.objects.filter(tarih=secili_tarih)
-    toplam_gider = gunluk_giderler.aggregate(toplam=Sum('tutar'))
-    
-    # Kar hesaplama
-    toplam_satis_tutari = toplam_satis['toplam_tutar'] or 0
-    toplam_gider_tutari = toplam_gider['toplam'] or 0
-    net_kar = toplam_satis_tutari - toplam_gider_tutari
-    
-    # Kasa bilgileri
-    kasalar = Kasa.objects.filter(aktif=True)
-    kasa_durumu = []
-    
-    for kasa in kasalar:
-        # Günlük kasa hareketleri
-        gunluk_hareketler = KasaHareket.objects.filter(
-            kasa=kasa,
-            tarih__date=secili_tarih
+    if gun_sonu:
+        rapor = gunluk_rapor_baglami(gun_sonu.veri)
+    else:
+        # Henüz kapatılmamış gün: birkaç gruplu sorgu (kapanmış günler önbellekten)
+        veri = rapor_onbellegi(
+            'gun_sonu_verisi', {}, secili_tarih, secili_tarih,
+            lambda: gun_sonu_verisi(secili_tarih)
         )
-        
-        gunluk_giris = gunluk_hareketler.filter(
-            tip='giris'
-        ).aggregate(toplam=Sum('tutar'))['toplam'] or 0
-        
-        gunluk_cikis = gunluk_hareketler.filter(
-            tip='cikis'
-        ).aggregate(toplam=Sum('tutar'))['toplam'] or 0
-        
-        gunluk_net = gunluk_giris - gunluk_cikis
-        
-        kasa_durumu.append({
-            'kasa': kasa,
-            'gunluk_giris': gunluk_giris,
-            'gunluk_cikis': gunluk_cikis,
-            'gunluk_net': gunluk_net,
-            'mevcut_bakiye': kasa.bakiye()
-        })
-    
-    # Template için uyumlu değişken adları
-    satis_ozeti = {
-        'toplam_satis_tutari': toplam_satis_tutari,
-        'toplam_satis_sayisi': toplam_satis['satis_adedi'] or 0
-    }
-    
-    gider_ozeti = {
-        'toplam_gider_tutari': toplam_gider_tutari,
-        'toplam_gider_sayisi': gunluk_giderler.count()
-    }
-    
-    toplam_tahsilat = toplam_satis_tutari
-    brut_kar = net_kar
+        canli_bakiyeler = {kasa.id: kasa.bakiye() for kasa in Kasa.objects.filter(aktif=True)}
+        rapor = gunluk_rapor_baglami(veri, canli_bakiyeler=canli_bakiyeler)
     
     context = {
         'secili_tarih': secili_tarih,
-        'toplam_satis': toplam_satis,
-        'nakit_satislar': nakit_satislar,
-        'kart_satislar': kart_satislar,
-        'hediye_ceki_satislar': hediye_ceki_satislar,
-        'cok_satan_urunler': cok_satan_urunler,
-        'son_satislar': son_satislar,
-        'gunluk_giderler': gunluk_giderler,
-        'toplam_gider': toplam_gider,
-        'net_kar': net_kar,
-        'gunluk_satislar': gunluk_satislar,
-        'kasa_durumu': kasa_durumu,
-        # Template uyumlu değişkenler
-        'satis_ozeti': satis_ozeti,
-        'gider_ozeti': gider_ozeti,
-        'toplam_tahsilat': toplam_tahsilat,
-        'brut_kar': brut_kar,
+        'gun_sonu': gun_sonu,
+        'gun_sonu_alinabilir': gun_sonu is None and secili_tarih <= date.today(),
+        **rapor,
     }
     
     return render(request, 'gunluk_rapor.html', context)
 
+@require_POST
+def gun_sonu_al_view(request):
+    """Seçili günü kapat (Z raporu oluştur)"""
+    tarih = request.POST.get('tarih', '')
+    try:
+        secili_tarih = datetime.strptime(tarih, '%Y-%m-%d').date()
+    except ValueError:
+        secili_tarih = date.today()
+    
+    try:
+        gun_sonu_al(secili_tarih, request.user)
+        messages.success(request, f'{secili_tarih.strftime("%d.%m.%Y")} günü kapatıldı, Z raporu oluşturuldu.')
+    except ValueError as e:
+        messages.error(request, str(e))
+    
+    return redirect(f"{reverse('gunluk_rapor')}?tarih={secili_tarih.strftime('%Y-%m-%d')}")
+
 def gunluk_rapor_pdf_view(request):
     return HttpResponse('PDF not available')
+
+
+@require_GET
+@cache_control(private=True, max_age=31536000, immutable=True)
+def resim_boyutu_view(request, boyut, ad):
+    """Yüklenen resmin küçültülmüş kopyası (ilk istekte üretilir)"""
+    from stoktakip.depolama import BOYUTLAR, boyut_deposu, boyut_olustur
+
+    if boyut not in BOYUTLAR:
+        raise Http404
+    kopya = boyut_olustur(boyut, ad)
+    if kopya is None:
+        raise Http404
+    return FileResponse(boyut_deposu.open(kopya))
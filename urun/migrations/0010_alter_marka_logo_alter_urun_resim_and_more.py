@@ -0,0 +1,29 @@
+# Generated by Django 5.2.5 on 2026-10-19 13:43
+
+import stoktakip.depolama
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('urun', '0009_auto_20250906_1049'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='marka',
+            name='logo',
+            field=models.ImageField(blank=True, null=True, storage=stoktakip.depolama.IcerikDeposu(), upload_to='marka_logolari/', verbose_name='Marka Logosu'),
+        ),
+        migrations.AlterField(
+            model_name='urun',
+            name='resim',
+            field=models.ImageField(blank=True, null=True, storage=stoktakip.depolama.IcerikDeposu(), upload_to='urun_resimleri/', verbose_name='Ana Ürün Resmi'),
+        ),
+        migrations.AlterField(
+            model_name='urunvaryanti',
+            name='resim',
+            field=models.ImageField(blank=True, null=True, storage=stoktakip.depolama.IcerikDeposu(), upload_to='varyant_resimleri/', verbose_name='Varyant Resmi'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.5 on 2026-10-19 14:13
+
+import stoktakip.depolama
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('urun', '0010_alter_marka_logo_alter_urun_resim_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='marka',
+            name='logo',
+            field=models.ImageField(blank=True, null=True, storage=stoktakip.depolama.IcerikDeposu(), upload_to='marka_logolari/', validators=[stoktakip.depolama.resim_boyutu_dogrula], verbose_name='Marka Logosu'),
+        ),
+        migrations.AlterField(
+            model_name='urun',
+            name='resim',
+            field=models.ImageField(blank=True, null=True, storage=stoktakip.depolama.IcerikDeposu(), upload_to='urun_resimleri/', validators=[stoktakip.depolama.resim_boyutu_dogrula], verbose_name='Ana Ürün Resmi'),
+        ),
+        migrations.AlterField(
+            model_name='urunvaryanti',
+            name='resim',
+            field=models.ImageField(blank=True, null=True, storage=stoktakip.depolama.IcerikDeposu(), upload_to='varyant_resimleri/', validators=[stoktakip.depolama.resim_boyutu_dogrula], verbose_name='Varyant Resmi'),
+        ),
+    ]
@@ -4,6 +4,8 @@ from decimal import Decimal
 from django.core.validators import MinValueValidator, MaxValueValidator
 import uuid
 
+from stoktakip.depolama import icerik_deposu, resim_boyutu_dogrula
+
 
 class UrunKategoriUst(models.Model):
     """Üst kategori modeli"""
@@ -65,7 +67,7 @@ class Marka(models.Model):
     """Ürün markaları için model"""
     ad = models.CharField(max_length=100, unique=True, verbose_name="Marka Adı")
     aciklama = models.TextField(blank=True, null=True, verbose_name="Açıklama")
-    logo = models.ImageField(upload_to='marka_logolari/', blank=True, null=True, verbose_name="Marka Logosu")
+    logo = models.ImageField(upload_to='marka_logolari/', storage=icerik_deposu, validators=[resim_boyutu_dogrula], blank=True, null=True, verbose_name="Marka Logosu")
     aktif = models.BooleanField(default=True, verbose_name="Aktif")
     olusturma_tarihi = models.DateTimeField(auto_now_add=True)
     guncelleme_tarihi = models.DateTimeField(auto_now=True)
@@ -116,7 +118,7 @@ class Urun(models.Model):
     satis_fiyati = models.DecimalField(max_digits=10, decimal_places=2, default=0.00, verbose_name="Satış Fiyatı")
     
     # Ürün resmi
-    resim = models.ImageField(upload_to='urun_resimleri/', blank=True, null=True, verbose_name="Ana Ürün Resmi")
+    resim = models.ImageField(upload_to='urun_resimleri/', storage=icerik_deposu, validators=[resim_boyutu_dogrula], blank=True, null=True, verbose_name="Ana Ürün Resmi")
     
     # Durum bilgisi
     aktif = models.BooleanField(default=True, verbose_name="Aktif")
@@ -143,7 +145,42 @@ class Urun(models.Model):
             else:
                 yeni_kod = '00001'
             self.urun_kodu = yeni_kod
+        
+        from rapor.pano import kayitli_ozet, genel_sayaclari_guncelle
+        from log.fark import kayitli_durum, degisiklik_kaydet
+        eski = kayitli_ozet(self)
+        eski_durum = kayitli_durum(self)
         super().save(*args, **kwargs)
+        genel_sayaclari_guncelle(eski, self._pano_ozeti())
+        self._pano_onceki = self._pano_ozeti()
+        degisiklik_kaydet(self, eski_durum)
+
+    def delete(self, *args, **kwargs):
+        from rapor.pano import kayitli_ozet, genel_sayaclari_guncelle, DUSUK_STOK_SEVIYESI
+        from log.fark import kayitli_durum, silme_kaydet
+        eski = kayitli_ozet(self) or {}
+        eski_durum, pk = kayitli_durum(self), self.pk
+        # Varyantlar cascade ile silinir, düşük stok sayacından düşülür
+        dusuk_stoklu = self.varyantlar.filter(aktif=True, stok_miktari__lte=DUSUK_STOK_SEVIYESI).count()
+        if dusuk_stoklu:
+            eski = dict(eski, dusuk_stok_sayisi=dusuk_stoklu)
+        sonuc = super().delete(*args, **kwargs)
+        genel_sayaclari_guncelle(eski, None)
+        silme_kaydet(self, pk, eski_durum)
+        return sonuc
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        from rapor.pano import ozet_sakla
+        from log.fark import onceki_durumu_sakla
+        ozet_sakla(instance, ('aktif',))
+        onceki_durumu_sakla(instance, field_names, values)
+        return instance
+
+    def _pano_ozeti(self):
+        """Ürünün genel dashboard sayaçlarına katkısı"""
+        return {'urun_sayisi': 1} if self.aktif else None
 
     def __str__(self):
         return f"{self.urun_kodu} - {self.ad}"
@@ -196,7 +233,7 @@ class UrunVaryanti(models.Model):
     
     # Ek bilgiler
     ek_aciklama = models.TextField(blank=True, null=True, verbose_name="Ek Açıklama")
-    resim = models.ImageField(upload_to='varyant_resimleri/', blank=True, null=True, verbose_name="Varyant Resmi")
+    resim = models.ImageField(upload_to='varyant_resimleri/', storage=icerik_deposu, validators=[resim_boyutu_dogrula], blank=True, null=True, verbose_name="Varyant Resmi")
     
     # Durum
     aktif = models.BooleanField(default=True, verbose_name="Aktif")
@@ -213,7 +250,33 @@ class UrunVaryanti(models.Model):
         # Barkod otomatik oluştur
         if not self.barkod:
             self.barkod = self.olustur_barkod()
+        
+        from rapor.pano import kayitli_ozet, genel_sayaclari_guncelle
+        eski = kayitli_ozet(self)
         super().save(*args, **kwargs)
+        genel_sayaclari_guncelle(eski, self._pano_ozeti())
+        self._pano_onceki = self._pano_ozeti()
+
+    def delete(self, *args, **kwargs):
+        from rapor.pano import kayitli_ozet, genel_sayaclari_guncelle
+        eski = kayitli_ozet(self)
+        sonuc = super().delete(*args, **kwargs)
+        genel_sayaclari_guncelle(eski, None)
+        return sonuc
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        from rapor.pano import ozet_sakla
+        ozet_sakla(instance, ('aktif', 'stok_miktari'))
+        return instance
+
+    def _pano_ozeti(self):
+        """Varyantın düşük stok sayacına katkısı"""
+        from rapor.pano import DUSUK_STOK_SEVIYESI
+        if self.aktif and self.stok_miktari <= DUSUK_STOK_SEVIYESI:
+            return {'dusuk_stok_sayisi': 1}
+        return None
 
     def olustur_barkod(self):
         """Akıllı barkod algoritması ile barkod oluştur"""